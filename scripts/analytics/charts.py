@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rendu des graphiques des rapports par lots.
+
+Chaque graphique est décrit par une spécification (type, titre, données,
+format, résolution). Le rendu utilise l'API orientée objet de matplotlib
+(`Figure`, backend Agg), sans l'état global de pyplot, ce qui permet de
+répartir un lot de graphiques sur un pool de processus. Chaque fichier est
+mis en cache d'après l'empreinte de sa spécification: un graphique dont la
+spécification et les données n'ont pas changé n'est pas redessiné.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts import tracing
+
+# Configuration
+CHART_FORMAT = os.environ.get('CHART_FORMAT', 'png')
+CHART_DPI = int(os.environ.get('CHART_DPI', '300'))
+CACHE_FILE = '.charts_cache.json'
+MAX_WORKERS = os.cpu_count() or 1
+# Les processus de rendu ne sont pas créés par fork: la chaîne (pipeline.py)
+# appelle ce module depuis des fils, dont les verrous seraient copiés tels quels.
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+# Version du rendu: à incrémenter pour forcer le redessin de tous les graphiques
+RENDER_VERSION = 1
+
+COLORS = ['#4CAF50', '#3F51B5', '#FF9800', '#9C27B0', '#00BCD4', '#F44336']
+
+
+def chart_filename(spec):
+    """
+    Nom du fichier produit pour une spécification.
+    """
+    return f"{spec['name']}.{spec.get('format', CHART_FORMAT)}"
+
+
+def spec_digest(spec):
+    """
+    Empreinte d'une spécification de graphique (données comprises).
+    """
+    payload = json.dumps({"spec": spec, "version": RENDER_VERSION}, sort_keys=True,
+                         ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _draw(ax, spec):
+    data = spec['data']
+    kind = spec['kind']
+    if kind == 'pie':
+        ax.pie(data['values'], labels=data['labels'], colors=data.get('colors', COLORS),
+               autopct='%1.1f%%', startangle=90)
+        ax.axis('equal')
+    elif kind == 'line':
+        for i, series in enumerate(data['series']):
+            ax.plot(data['x'], series['values'], label=series['label'], color=COLORS[i % len(COLORS)])
+        ax.set_ylabel(data.get('ylabel', ''))
+        ax.legend()
+        ax.tick_params(axis='x', labelrotation=45)
+    elif kind == 'bar':
+        ax.bar(data['labels'], data['values'], color=data.get('colors', COLORS))
+        ax.set_ylabel(data.get('ylabel', ''))
+    else:
+        raise ValueError(f"Type de graphique inconnu: {kind}")
+    ax.set_title(spec.get('title', ''))
+
+
+def render_chart(spec, output_dir):
+    """
+    Dessine un graphique et l'écrit de manière atomique dans `output_dir`.
+    Retourne le nom du fichier produit.
+    """
+    # Import différé: matplotlib n'est chargé que dans les processus de rendu
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    fmt = spec.get('format', CHART_FORMAT)
+    # Sortie SVG reproductible: identifiants et métadonnées stables
+    matplotlib.rcParams['svg.hashsalt'] = spec['name']
+    figure = Figure(figsize=tuple(spec.get('size', (10, 6))))
+    _draw(figure.add_subplot(), spec)
+
+    filename = chart_filename(spec)
+    path = os.path.join(output_dir, filename)
+    tmp_path = path + '.tmp'
+    metadata = {'Date': None} if fmt == 'svg' else None
+    figure.savefig(tmp_path, format=fmt, dpi=spec.get('dpi', CHART_DPI), bbox_inches='tight',
+                   metadata=metadata)
+    os.replace(tmp_path, path)
+    return filename
+
+
+def _load_cache(output_dir):
+    path = os.path.join(output_dir, CACHE_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Cache des graphiques illisible, rendu complet: {e}")
+    return {}
+
+
+def _save_cache(output_dir, cache):
+    with open(os.path.join(output_dir, CACHE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def render_charts(specs, output_dir, force=False, max_workers=MAX_WORKERS):
+    """
+    Dessine un lot de graphiques, en parallèle sur un pool de processus
+    lorsque plusieurs sont à produire. Les graphiques dont l'empreinte n'a
+    pas changé (et dont le fichier existe) sont ignorés, sauf si `force`.
+
+    Retourne un dictionnaire {fichier: empreinte} des graphiques à jour.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cache = _load_cache(output_dir)
+    digests = {chart_filename(spec): spec_digest(spec) for spec in specs}
+    stale = [
+        spec for spec in specs
+        if force or cache.get(chart_filename(spec)) != digests[chart_filename(spec)]
+        or not os.path.exists(os.path.join(output_dir, chart_filename(spec)))
+    ]
+    for filename in sorted(set(digests) - {chart_filename(spec) for spec in stale}):
+        print(f"Graphique inchangé: {output_dir}/{filename}")
+        tracing.count('charts.cached')
+
+    rendered = []
+    with tracing.span('charts.render', 'charts', charts=len(stale)):
+        if len(stale) > 1 and max_workers > 1:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(stale)),
+                                     mp_context=multiprocessing.get_context(START_METHOD)) as executor:
+                futures = {executor.submit(render_chart, spec, output_dir): spec for spec in stale}
+                for future, spec in futures.items():
+                    try:
+                        rendered.append(future.result())
+                    except Exception as e:
+                        print(f"Erreur lors de la génération du graphique {spec['name']}: {e}")
+        else:
+            for spec in stale:
+                try:
+                    rendered.append(render_chart(spec, output_dir))
+                except Exception as e:
+                    print(f"Erreur lors de la génération du graphique {spec['name']}: {e}")
+
+    for filename in rendered:
+        cache[filename] = digests[filename]
+        print(f"Graphique généré: {output_dir}/{filename}")
+        tracing.count('charts.rendered')
+    _save_cache(output_dir, cache)
+    return {filename: cache.get(filename) for filename in digests if filename in cache}
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Analyse des séries temporelles de dons.
+
+Les dons individuels du journal d'événements sont lus par blocs et agrégés
+par jour et par source; les agrégats sont conservés avec la position de
+lecture, de sorte que seuls les nouveaux dons sont traités à chaque exécution.
+Les indicateurs (vitesse quotidienne, moyennes glissantes, répartition par
+source, date prévisionnelle d'atteinte de l'objectif) sont ensuite calculés
+de manière vectorisée avec pandas et NumPy.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import json
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from scripts.fundraising import donation_store
+from scripts.fundraising import funding_history
+
+# Configuration
+CHUNK_ROWS = 100000
+AGGREGATES_FILE = 'daily_aggregates.json'
+# Version du calcul des agrégats: à incrémenter pour forcer un recalcul complet
+AGGREGATES_VERSION = 2
+ROLLING_WINDOW_DAYS = 7
+# Durée prévue de la campagne, à partir du premier don, si aucune date cible n'est fixée
+CAMPAIGN_DURATION_DAYS = 90
+CAMPAIGN_TARGET_DATE = os.environ.get('CAMPAIGN_TARGET_DATE')
+# Écart toléré entre progression réelle et progression attendue
+PACE_TOLERANCE = 0.05
+
+PACE_AHEAD = 'en avance'
+PACE_ON_TRACK = 'conforme'
+PACE_BEHIND = 'en retard'
+
+# Mise à jour des agrégats: une seule à la fois dans le processus
+_aggregates_lock = threading.Lock()
+
+
+def _aggregate_chunk(timestamps, amounts, sources):
+    """
+    Agrège un bloc de dons par jour et par source (somme et nombre).
+    Les jours sont découpés comme dans l'historique du financement
+    (funding_history.to_epoch): un horodatage sans fuseau est en heure locale.
+    """
+    epochs = np.fromiter((funding_history.to_epoch(timestamp) for timestamp in timestamps),
+                         dtype='int64', count=len(timestamps))
+    frame = pd.DataFrame({
+        "date": pd.to_datetime(epochs, unit='s').normalize(),
+        "source": sources,
+        "amount": np.asarray(amounts, dtype='float64')
+    })
+    return frame.groupby(['date', 'source'])['amount'].agg(['sum', 'count'])
+
+
+def iter_donation_chunks(events, chunk_rows=CHUNK_ROWS):
+    """
+    Regroupe un flux d'événements en blocs de dons agrégés par jour et source.
+
+    Génère des couples (agrégat du bloc, position après le bloc).
+    """
+    timestamps, amounts, sources = [], [], []
+    position = None
+    for event, position in events:
+        if event.get('type') != donation_store.EVENT_DONATION:
+            continue
+        timestamps.append(event.get('timestamp') or event.get('recorded_at'))
+        amounts.append(event.get('amount', 0))
+        sources.append(donation_store.event_source(event))
+        if len(amounts) >= chunk_rows:
+            yield _aggregate_chunk(timestamps, amounts, sources), position
+            timestamps, amounts, sources = [], [], []
+    if amounts:
+        yield _aggregate_chunk(timestamps, amounts, sources), position
+    elif position is not None:
+        yield None, position
+
+
+def _load_aggregates(path):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('version') != AGGREGATES_VERSION:
+                print("Agrégats quotidiens d'une version précédente, recalcul complet")
+                return None, (0, 0)
+            rows = saved['rows']
+            daily = pd.DataFrame(rows, columns=['date', 'source', 'sum', 'count'])
+            daily['date'] = pd.to_datetime(daily['date'])
+            return daily.set_index(['date', 'source']), tuple(saved['position'])
+        except Exception as e:
+            print(f"Agrégats quotidiens illisibles, recalcul complet: {e}")
+    return None, (0, 0)
+
+
+def _save_aggregates(path, daily, position):
+    rows = [[date.strftime('%Y-%m-%d'), source, float(total), int(count)]
+            for (date, source), total, count in zip(daily.index, daily['sum'], daily['count'])]
+    # Fichier temporaire propre à chaque écriture (plusieurs processus possibles)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=AGGREGATES_FILE, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"version": AGGREGATES_VERSION, "position": list(position), "rows": rows}, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_daily_aggregates(events_dir=donation_store.EVENTS_DIR, chunk_rows=CHUNK_ROWS):
+    """
+    Retourne les dons agrégés par (jour, source), en ne lisant que les
+    événements ajoutés depuis le dernier calcul. Retourne None s'il n'y a
+    aucun don individuel dans le journal.
+
+    Les appels simultanés (étapes parallèles de la chaîne) sont sérialisés:
+    chacun repart des agrégats enregistrés par le précédent.
+    """
+    with _aggregates_lock:
+        return _update_daily_aggregates(events_dir, chunk_rows)
+
+
+def _update_daily_aggregates(events_dir, chunk_rows):
+    path = os.path.join(events_dir, AGGREGATES_FILE)
+    daily, position = _load_aggregates(path)
+    partials = [daily] if daily is not None else []
+    changed = False
+
+    for chunk, position in iter_donation_chunks(donation_store.iter_events(events_dir, position), chunk_rows):
+        changed = True
+        if chunk is not None:
+            partials.append(chunk)
+
+    if not partials:
+        if changed:
+            _save_aggregates(path, pd.DataFrame(columns=['sum', 'count'],
+                                                index=pd.MultiIndex.from_tuples([], names=['date', 'source'])),
+                             position)
+        return None
+
+    daily = pd.concat(partials).groupby(level=['date', 'source']).sum() if len(partials) > 1 else partials[0]
+    if changed:
+        _save_aggregates(path, daily, position)
+    return daily
+
+
+def compute_analytics(daily, goal_amount, current_amount=None, today=None, target_date=None):
+    """
+    Calcule les indicateurs de collecte à partir des agrégats (jour, source).
+
+    Retourne un dictionnaire sérialisable en JSON.
+    """
+    today = pd.Timestamp(today or datetime.now()).normalize()
+    by_day = daily['sum'].groupby(level='date').sum()
+    full_range = pd.date_range(by_day.index.min(), max(by_day.index.max(), today), freq='D')
+    series = by_day.reindex(full_range, fill_value=0.0)
+    values = series.to_numpy()
+
+    rolling = series.rolling(ROLLING_WINDOW_DAYS, min_periods=1).mean().to_numpy()
+    total_amount = float(values.sum())
+    current_amount = total_amount if current_amount is None else current_amount
+    velocity_7d = float(values[-ROLLING_WINDOW_DAYS:].mean())
+    velocity_30d = float(values[-30:].mean())
+
+    by_source = daily.groupby(level='source').sum().sort_values('sum', ascending=False)
+    totals = by_source['sum'].to_numpy()
+    shares = totals / totals.sum() if totals.sum() > 0 else np.zeros_like(totals)
+    sources = [
+        {"source": source, "amount": round(float(amount), 2), "count": int(count), "share": round(float(share), 4)}
+        for source, amount, count, share in zip(by_source.index, totals, by_source['count'], shares)
+    ]
+
+    remaining = goal_amount - current_amount
+    if remaining <= 0:
+        projected = today
+    elif velocity_7d > 0:
+        projected = today + pd.Timedelta(days=int(np.ceil(remaining / velocity_7d)))
+    else:
+        projected = None
+
+    start = full_range[0]
+    target = pd.Timestamp(target_date or CAMPAIGN_TARGET_DATE or start + timedelta(days=CAMPAIGN_DURATION_DAYS))
+    duration = max((target - start).days, 1)
+    expected_progress = float(np.clip((today - start).days / duration, 0.0, 1.0))
+    actual_progress = current_amount / goal_amount if goal_amount > 0 else 0.0
+    if actual_progress > expected_progress + PACE_TOLERANCE:
+        pace = PACE_AHEAD
+    elif actual_progress < expected_progress - PACE_TOLERANCE:
+        pace = PACE_BEHIND
+    else:
+        pace = PACE_ON_TRACK
+
+    return {
+        "first_day": start.strftime('%Y-%m-%d'),
+        "days": len(full_range),
+        "active_days": int(np.count_nonzero(values)),
+        "donation_count": int(daily['count'].sum()),
+        "total_amount": round(total_amount, 2),
+        "velocity_7d": round(velocity_7d, 2),
+        "velocity_30d": round(velocity_30d, 2),
+        "rolling_7d": [round(float(v), 2) for v in rolling[-30:]],
+        "best_day": full_range[int(values.argmax())].strftime('%Y-%m-%d'),
+        "best_day_amount": round(float(values.max()), 2),
+        "sources": sources,
+        "projected_completion": projected.strftime('%Y-%m-%d') if projected is not None else None,
+        "target_date": target.strftime('%Y-%m-%d'),
+        "expected_progress": round(expected_progress, 4),
+        "actual_progress": round(actual_progress, 4),
+        "pace": pace
+    }
+
+
+def analyze_donations(goal_amount, current_amount=None, events_dir=donation_store.EVENTS_DIR, today=None):
+    """
+    Analyse les dons du journal; retourne None en l'absence de dons individuels.
+    """
+    daily = load_daily_aggregates(events_dir)
+    if daily is None or daily.empty:
+        return None
+    return compute_analytics(daily, goal_amount, current_amount, today)
@@ -8,23 +8,127 @@ Note: Ce projet est 100% réel. Toute simulation ou action fictive est stricteme
 """
 
 import os
+import sys
 import json
-import pandas as pd
+import hashlib
+import argparse
+import threading
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+# Ajout de la racine du dépôt au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts import tracing
+from scripts.fundraising import donation_store
+from scripts.fundraising import donor_sketch
+from scripts.fundraising import expense_ledger
+from scripts.fundraising import funding_history
+from scripts.fundraising import update_fundraising_data
+from scripts.shelter import animal_registry
+from scripts.social import tiktok_metrics
 
 # Configuration
 GOFUNDME_API_KEY = os.environ.get('GOFUNDME_API_KEY')
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 REPORTS_DIR = 'reports'
 DATA_DIR = 'docs/campaign/data'
+MANIFEST_FILE = '.manifest.json'
+# Période couverte par l'historique des rapports et graphiques, en jours
+HISTORY_DAYS = 90
+
+# Versions des gabarits: à incrémenter à chaque modification du rendu
+# pour forcer la régénération des artefacts concernés.
+FUNDING_REPORT_VERSION = 5
+SOCIAL_REPORT_VERSION = 2
+EXPENSES_REPORT_VERSION = 1
+
+# Protège le manifeste lorsque plusieurs rapports sont générés en parallèle
+_manifest_lock = threading.Lock()
+
+def hash_inputs(inputs):
+    """
+    Calcule l'empreinte SHA-256 d'un ensemble d'entrées sérialisables en JSON.
+    Les champs volatils (horodatages `last_updated`, latences) sont exclus,
+    comme pour l'empreinte de l'étape fetch de la chaîne: un nouveau relevé
+    sans changement significatif ne rend pas les rapports périmés.
+    """
+    payload = json.dumps(update_fundraising_data.meaningful_fields(inputs), sort_keys=True,
+                         ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_manifest():
+    """
+    Charge le manifeste des artefacts générés (empreintes des entrées et
+    versions des gabarits pour chaque fichier de sortie).
+    """
+    manifest_file = os.path.join(REPORTS_DIR, MANIFEST_FILE)
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Manifeste illisible, régénération complète: {e}")
+    return {}
+
+def save_manifest(manifest):
+    """
+    Enregistre le manifeste des artefacts générés.
+    """
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    manifest_file = os.path.join(REPORTS_DIR, MANIFEST_FILE)
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+def is_up_to_date(output, inputs, version, force=False):
+    """
+    Indique si un artefact existe déjà avec les mêmes entrées et la même
+    version de gabarit, auquel cas sa régénération peut être évitée.
+    """
+    up_to_date = (not force and os.path.exists(os.path.join(REPORTS_DIR, output))
+                  and load_manifest().get(output) == {"inputs": hash_inputs(inputs), "version": version})
+    tracing.count('reports.cached' if up_to_date else 'reports.stale')
+    return up_to_date
+
+def record_artifact(output, inputs, version):
+    """
+    Enregistre dans le manifeste l'empreinte des entrées d'un artefact généré.
+    """
+    record_artifacts([(output, inputs, version)])
+
+def record_artifacts(artifacts):
+    """
+    Enregistre en une seule écriture du manifeste une liste
+    d'artefacts (sortie, entrées, version).
+    """
+    with _manifest_lock:
+        manifest = load_manifest()
+        for output, inputs, version in artifacts:
+            manifest[output] = {"inputs": hash_inputs(inputs), "version": version}
+        save_manifest(manifest)
+
+def site_title(site):
+    """
+    Nom affiché d'un site ('khon-kaen' -> 'Khon Kaen').
+    """
+    return site.replace('-', ' ').replace('_', ' ').title()
 
 def load_funding_data():
     """
-    Charge les données de financement, soit depuis le fichier JSON existant,
-    soit génère des données d'exemple si le fichier n'existe pas encore.
+    Charge les données de financement, dans l'ordre de préférence:
+    le journal d'événements de dons (mis à jour depuis le dernier point de
+    contrôle), le fichier JSON existant, ou des données d'exemple si aucune
+    donnée n'existe encore.
     """
+    if donation_store.has_events():
+        try:
+            state = donation_store.refresh_state()
+            if state['last_updated'] is None:
+                state['last_updated'] = datetime.now().isoformat()
+            sketches, _ = donor_sketch.load_sketches(os.path.join(DATA_DIR, donor_sketch.SKETCHES_FILE))
+            return donor_sketch.attach_unique_donors(state, donor_sketch.summarize(sketches))
+        except Exception as e:
+            print(f"Erreur lors de la lecture du journal de dons: {e}")
+
     funding_file = os.path.join(DATA_DIR, 'funding_data.json')
     
     if os.path.exists(funding_file):
@@ -44,14 +148,275 @@ def load_funding_data():
         "status": "En attente de lancement"
     }
 
-def generate_funding_report(data):
+def load_funding_history(days=HISTORY_DAYS, site=None):
     """
-    Génère un rapport sur l'état du financement.
+    Lit dans l'historique en colonnes les relevés quotidiens des `days`
+    derniers jours: total de la campagne, ou somme des plateformes d'un site.
+    Retourne {'timestamps', 'dates', 'amounts', 'donors', 'goal'}, ou None
+    si l'historique est vide.
+    """
+    try:
+        with funding_history.open_history(funding_history.DAILY) as history:
+            if site is None:
+                series = [history.series()]
+            else:
+                series = history.select(site=site)
+            series = [s for s in series if s is not None and len(s)]
+            if not series:
+                return None
+            rows = [list(zip(*s.last(days))) for s in series]
+    except Exception as e:
+        print(f"Erreur lors de la lecture de l'historique du financement: {e}")
+        return None
+    # Sommes par jour. Les plateformes d'un site n'ont pas forcément les mêmes
+    # jours: une plateforme sans relevé un jour compte pour son dernier
+    # montant connu, pour que la somme ne chute pas artificiellement.
+    timestamps = sorted({row[0] for series_rows in rows for row in series_rows})[-days:]
+    days_totals = {timestamp: [0.0, 0.0, 0] for timestamp in timestamps}
+    for series_rows in rows:
+        index, last = 0, None
+        for timestamp in timestamps:
+            while index < len(series_rows) and series_rows[index][0] <= timestamp:
+                last = series_rows[index]
+                index += 1
+            if last is not None:
+                total = days_totals[timestamp]
+                total[0] += last[1]
+                total[1] += last[2]
+                total[2] += last[3]
+    return {
+        "timestamps": timestamps,
+        "dates": [funding_history.format_date(t) for t in timestamps],
+        "amounts": [days_totals[t][0] for t in timestamps],
+        "donors": [days_totals[t][2] for t in timestamps],
+        "goal": days_totals[timestamps[-1]][1]
+    }
+
+def load_animal_summary(site=None, registry=None):
+    """
+    Indicateurs du registre des animaux pour la campagne ou pour un site,
+    ou None si aucun animal n'est enregistré.
+    """
+    try:
+        if registry is None:
+            with tracing.span('animal_registry', 'analytics'):
+                registry = animal_registry.load_registry()
+        if not len(registry):
+            return None
+        return registry.summary(site=site)
+    except Exception as e:
+        print(f"Erreur lors de la lecture du registre des animaux: {e}")
+        return None
+
+def load_donation_analytics(data):
+    """
+    Calcule les indicateurs de collecte à partir des dons individuels du
+    journal, ou retourne None si aucun don n'est disponible (le journal ne
+    contient alors que des relevés de campagne).
+    """
+    if not donation_store.has_donations():
+        return None
+    try:
+        # Import différé: pandas et NumPy ne sont chargés que pour l'analyse
+        from scripts.analytics import donation_analytics
+        with tracing.span('donation_analytics', 'analytics'):
+            return donation_analytics.analyze_donations(data['goal_amount'], data['current_amount'])
+    except Exception as e:
+        print(f"Erreur lors de l'analyse des dons: {e}")
+        return None
+
+def generate_funding_report(data, force=False, chart=True, analytics=None):
+    """
+    Génère un rapport sur l'état du financement, ainsi que le graphique de
+    progression si `chart` est vrai. Les indicateurs de collecte sont
+    calculés si `analytics` n'est pas fourni.
+
+    Le rapport et le graphique ne sont régénérés que si leurs entrées ou
+    leur gabarit ont changé depuis la dernière exécution, sauf si `force`.
     """
     os.makedirs(REPORTS_DIR, exist_ok=True)
     
+    if analytics is None:
+        analytics = load_donation_analytics(data)
+    history = load_funding_history()
+    animals = load_animal_summary()
+    inputs = {"data": data, "analytics": analytics, "history": history, "animals": animals}
+    if is_up_to_date('funding_report.md', inputs, FUNDING_REPORT_VERSION, force):
+        print(f"Rapport de financement inchangé: {REPORTS_DIR}/funding_report.md")
+    else:
+        _write_funding_report(data, analytics, history, animals)
+        record_artifact('funding_report.md', inputs, FUNDING_REPORT_VERSION)
+    
+    if chart:
+        generate_funding_chart(data, force, analytics, history)
+
+def build_funding_chart_specs(data, analytics=None, history=None):
+    """
+    Construit les spécifications des graphiques de financement: progression
+    de la campagne, évolution du montant collecté si l'historique contient
+    plusieurs relevés, et si des dons individuels sont disponibles, dons
+    quotidiens (moyenne glissante) et répartition par source.
+    """
+    specs = []
+    if data['current_amount'] > 0:
+        specs.append({
+            "name": "funding_progress",
+            "kind": "pie",
+            "title": "Progression de la Campagne de Financement",
+            "data": {
+                "labels": ['Collecté', 'Restant'],
+                "values": [data['current_amount'], max(0, data['goal_amount'] - data['current_amount'])],
+                "colors": ['#4CAF50', '#F5F5F5']
+            }
+        })
+    if history and len(history['timestamps']) > 1:
+        last = history['timestamps'][-1]
+        specs.append({
+            "name": "funding_history",
+            "kind": "line",
+            "title": f"Montant collecté ({history['dates'][0]} - {history['dates'][-1]})",
+            "data": {
+                "x": [(t - last) // 86400 for t in history['timestamps']],
+                "series": [{"label": "Collecté", "values": history['amounts']},
+                           {"label": "Objectif", "values": [history['goal']] * len(history['amounts'])}],
+                "ylabel": "€"
+            }
+        })
+    if analytics:
+        rolling = analytics['rolling_7d']
+        specs.append({
+            "name": "donations_daily",
+            "kind": "line",
+            "title": "Dons quotidiens (moyenne glissante sur 7 jours)",
+            "data": {
+                "x": list(range(-len(rolling) + 1, 1)),
+                "series": [{"label": "€/jour", "values": rolling}],
+                "ylabel": "€"
+            }
+        })
+        specs.append({
+            "name": "donations_by_source",
+            "kind": "bar",
+            "title": "Répartition des dons par source",
+            "data": {
+                "labels": [s['source'] for s in analytics['sources']],
+                "values": [s['amount'] for s in analytics['sources']],
+                "ylabel": "€"
+            }
+        })
+    return specs
+
+def generate_funding_chart(data, force=False, analytics=None, history=None):
+    """
+    Génère les graphiques de financement qui ont changé, en parallèle.
+    Retourne un dictionnaire {fichier: empreinte} des graphiques à jour.
+    """
+    if analytics is None:
+        analytics = load_donation_analytics(data)
+    if history is None:
+        history = load_funding_history()
+    specs = build_funding_chart_specs(data, analytics, history)
+    if not specs:
+        return {}
+    
+    # Import différé: le module de rendu n'est chargé que s'il y a des graphiques
+    from scripts.analytics import charts
+    return charts.render_charts(specs, REPORTS_DIR, force=force)
+
+def _format_analysis(data, analytics):
+    """
+    Rédige la section d'analyse à partir des indicateurs calculés.
+    """
+    recommendations = (
+        "Lancer la campagne dès que possible",
+        "Intensifier la communication sur les réseaux sociaux",
+        "Contacter des influenceurs spécialisés dans la cause animale"
+    )
+    if data['current_amount'] == 0:
+        recommendation = recommendations[0]
+    elif analytics and analytics['pace'] == 'en retard':
+        recommendation = recommendations[2]
+    else:
+        recommendation = recommendations[1]
+    
+    if not analytics:
+        return f"""- Le rythme du financement n'est pas encore évaluable (aucun don individuel enregistré).
+- Les principales sources de dons proviennent de N/A (données non disponibles)
+- Recommandations: {recommendation}"""
+    
+    sources = ', '.join(f"{s['source']} ({s['share'] * 100:.1f}%, {s['count']} dons)" for s in analytics['sources'])
+    projection = (f"le {analytics['projected_completion']}" if analytics['projected_completion']
+                  else "non estimable (aucun don sur les 7 derniers jours)")
+    return f"""- Le financement est actuellement {analytics['pace']} par rapport aux objectifs ({analytics['actual_progress'] * 100:.1f}% collectés pour {analytics['expected_progress'] * 100:.1f}% attendus, échéance au {analytics['target_date']}).
+- Vitesse de collecte: {analytics['velocity_7d']:.2f} €/jour sur 7 jours, {analytics['velocity_30d']:.2f} €/jour sur 30 jours ({analytics['donation_count']} dons depuis le {analytics['first_day']}).
+- Meilleure journée: {analytics['best_day']} avec {analytics['best_day_amount']:.2f} €.
+- Les principales sources de dons proviennent de {sources}
+- Objectif atteint au rythme actuel: {projection}
+- Recommandations: {recommendation}"""
+
+def _format_history(history):
+    """
+    Évolution du financement sur la période de l'historique.
+    """
+    if not history or len(history['timestamps']) < 2:
+        return "- Pas encore assez de relevés pour retracer l'évolution du financement."
+    gained = history['amounts'][-1] - history['amounts'][0]
+    donors = history['donors'][-1] - history['donors'][0]
+    best = max(range(1, len(history['amounts'])), key=lambda i: history['amounts'][i] - history['amounts'][i - 1])
+    return f"""- Du {history['dates'][0]} au {history['dates'][-1]}: {gained:+.2f} € et {donors:+d} donateurs ({len(history['dates'])} relevés quotidiens).
+- Plus forte progression entre deux relevés: {history['amounts'][best] - history['amounts'][best - 1]:+.2f} € (jusqu'au {history['dates'][best]})."""
+
+def write_report(output, content, reports_dir=None):
+    """
+    Écrit un rapport dans REPORTS_DIR (`output` peut comporter un
+    sous-répertoire, par exemple `rayong/funding_report.md`).
+
+    Le rapport est remplacé de manière atomique, jamais réécrit sur place:
+    une copie de la documentation liée physiquement au rapport précédent
+    (LINK_MODE 'hardlink' de update_docs_with_reports) n'est pas modifiée.
+    """
+    path = os.path.join(reports_dir or REPORTS_DIR, output)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    if tracing.enabled:
+        tracing.count('bytes_written', os.path.getsize(path))
+    return path
+
+def _format_animals(animals):
+    """
+    Ligne de l'analyse consacrée aux animaux pris en charge (registre des animaux).
+    """
+    if not animals:
+        return "\n- Prise en charge: aucun animal n'est encore enregistré dans le registre des refuges."
+    return f"\n- Prise en charge: {animal_registry.format_summary(animals)}"
+
+def render_funding_report(data, analytics=None, history=None, site=None, animals=None):
+    """
+    Rédige le rapport de financement au format Markdown, pour la campagne
+    entière ou pour un site. `animals` est le résumé du registre des animaux
+    (voir load_animal_summary).
+    """
+    next_steps = (
+        "Finaliser la page GoFundMe avec des images et descriptions détaillées",
+        "Remercier personnellement les donateurs importants",
+        "Publier des mises à jour sur l'utilisation des fonds"
+    )
+    
+    # Les séjours prolongés en soins passent avant le tableau de bord
+    third_step = "Mettre en place un tableau de bord en temps réel pour suivre la progression"
+    if animals and animals['long_stay']:
+        third_step = (f"Trouver une famille d'adoption ou d'accueil pour les {animals['long_stay']} animaux "
+                      f"en soins depuis plus de {animals['long_stay_days']} jours")
+    
+    unique_donors = ''
+    if 'unique_donor_count' in data:
+        unique_donors = f"- **Donateurs uniques (toutes plateformes)**: {donor_sketch.format_unique_donors(data)}\n"
+    
     # Création du rapport en Markdown
-    report_content = f"""# Rapport de Financement PattesThai
+    return f"""# Rapport de Financement PattesThai{f' - {site_title(site)}' if site else ''}
 
 *Généré le {datetime.now().strftime('%d/%m/%Y %H:%M')}*
 
@@ -61,80 +426,97 @@ def generate_funding_report(data):
 - **Objectif**: {data['goal_amount']} €
 - **Montant actuel**: {data['current_amount']} €
 - **Nombre de donateurs**: {data['donor_count']}
-- **Pourcentage atteint**: {(data['current_amount'] / data['goal_amount']) * 100 if data['goal_amount'] > 0 else 0:.2f}%
+{unique_donors}- **Pourcentage atteint**: {(data['current_amount'] / data['goal_amount']) * 100 if data['goal_amount'] > 0 else 0:.2f}%
 - **Dernière mise à jour**: {data['last_updated']}
 - **Statut**: {data['status']}
 
 ## Analyse
 
-- Le financement est actuellement {"en avance", "conforme", "en retard"}[1] par rapport aux objectifs.
-- Les principales sources de dons proviennent de {"N/A (données non disponibles)"}
-- Recommandations: {"Lancer la campagne dès que possible", "Intensifier la communication sur les réseaux sociaux", "Contacter des influenceurs spécialisés dans la cause animale"}[0 if data['current_amount'] == 0 else 1]
+{_format_analysis(data, analytics)}{_format_animals(animals)}
+
+## Évolution
+
+{_format_history(history)}
 
 ## Prochaines Étapes
 
-1. {"Finaliser la page GoFundMe avec des images et descriptions détaillées", "Remercier personnellement les donateurs importants", "Publier des mises à jour sur l'utilisation des fonds"}[0 if data['current_amount'] == 0 else 2]
+1. {next_steps[0 if data['current_amount'] == 0 else 2]}
 2. Préparer du contenu vidéo pour TikTok montrant l'impact des dons
-3. Mettre en place un tableau de bord en temps réel pour suivre la progression
+3. {third_step}
 
 """
-    
-    with open(f"{REPORTS_DIR}/funding_report.md", 'w', encoding='utf-8') as f:
-        f.write(report_content)
-    
-    # Génération d'un graphique simple (simulation)
-    if data['current_amount'] > 0:
-        try:
-            plt.figure(figsize=(10, 6))
-            labels = ['Collecté', 'Restant']
-            sizes = [data['current_amount'], max(0, data['goal_amount'] - data['current_amount'])]
-            colors = ['#4CAF50', '#F5F5F5']
-            
-            plt.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-            plt.axis('equal')
-            plt.title('Progression de la Campagne de Financement')
-            plt.savefig(f"{REPORTS_DIR}/funding_progress.png", dpi=300, bbox_inches='tight')
-            plt.close()
-        except Exception as e:
-            print(f"Erreur lors de la génération du graphique: {e}")
-    
-    print(f"Rapport de financement généré dans {REPORTS_DIR}/funding_report.md")
 
-def generate_social_media_report():
+def _write_funding_report(data, analytics=None, history=None, animals=None):
+    """
+    Écrit le rapport de financement au format Markdown.
+    """
+    path = write_report('funding_report.md', render_funding_report(data, analytics, history, animals=animals))
+    print(f"Rapport de financement généré dans {path}")
+
+def _format_top_content(tiktok):
+    """
+    Tableau Markdown des publications les plus performantes.
+    """
+    if not tiktok['top_performing_content']:
+        return "*La campagne sur TikTok n'a pas encore démarré. Cette section sera mise à jour automatiquement dès que du contenu sera publié.*"
+    lines = ["| Publication | Date | Vues | Likes | Partages | Commentaires |",
+             "|---|---|---|---|---|---|"]
+    for post in tiktok['top_performing_content']:
+        title = (post.get('title') or 'Sans titre').replace('|', '/').replace('\n', ' ')
+        if post.get('url'):
+            title = f"[{title}]({post['url']})"
+        lines.append(f"| {title} | {post.get('published') or '-'} | {post['views']} | {post['likes']} "
+                     f"| {post['shares']} | {post['comments']} |")
+    return "\n".join(lines)
+
+def generate_social_media_report(force=False):
     """
-    Génère un rapport sur la performance des réseaux sociaux.
-    À développer avec des données réelles quand disponibles.
+    Génère un rapport sur la performance des réseaux sociaux à partir des
+    exports de statistiques TikTok (voir tiktok_metrics), sous-répertoires
+    des sites compris.
+
+    Le rapport n'est régénéré que si un export a été ajouté, modifié ou
+    supprimé (taille et date de modification), sauf si `force`: les
+    exports ne sont pas relus lorsque le rapport est à jour.
     """
     os.makedirs(REPORTS_DIR, exist_ok=True)
     
-    # Données d'exemple (à remplacer par des données réelles quand disponibles)
-    social_data = {
-        "tiktok": {
-            "followers": 0,
-            "views": 0,
-            "likes": 0,
-            "shares": 0,
-            "comments": 0,
-            "top_performing_content": []
-        }
-    }
+    exports_dir = tiktok_metrics.EXPORTS_DIR
+    inputs = {"exports": tiktok_metrics.exports_fingerprint(exports_dir)}
+    if is_up_to_date('social_media_report.md', inputs, SOCIAL_REPORT_VERSION, force):
+        print(f"Rapport des réseaux sociaux inchangé: {REPORTS_DIR}/social_media_report.md")
+        return
     
-    # Création du rapport en Markdown
-    report_content = f"""# Rapport des Réseaux Sociaux PattesThai
+    with tracing.span('tiktok_metrics', 'analytics'):
+        social_data = {"tiktok": tiktok_metrics.ingest_exports(exports_dir)}
+    
+    path = write_report('social_media_report.md', render_social_media_report(social_data))
+    record_artifact('social_media_report.md', inputs, SOCIAL_REPORT_VERSION)
+    
+    print(f"Rapport des réseaux sociaux généré dans {path}")
+
+def render_social_media_report(social_data, site=None):
+    """
+    Rédige le rapport des réseaux sociaux au format Markdown, pour la
+    campagne entière ou pour un site.
+    """
+    return f"""# Rapport des Réseaux Sociaux PattesThai{f' - {site_title(site)}' if site else ''}
 
 *Généré le {datetime.now().strftime('%d/%m/%Y %H:%M')}*
 
 ## Performance TikTok
 
 - **Abonnés**: {social_data['tiktok']['followers']}
+- **Publications**: {social_data['tiktok']['posts']}
 - **Vues totales**: {social_data['tiktok']['views']}
 - **Likes**: {social_data['tiktok']['likes']}
 - **Partages**: {social_data['tiktok']['shares']}
 - **Commentaires**: {social_data['tiktok']['comments']}
+- **Taux d'engagement**: {social_data['tiktok']['engagement_rate'] * 100:.2f}%
 
 ### Contenu le Plus Performant
 
-*La campagne sur TikTok n'a pas encore démarré. Cette section sera mise à jour automatiquement dès que du contenu sera publié.*
+{_format_top_content(social_data['tiktok'])}
 
 ## Stratégie Recommandée
 
@@ -145,13 +527,87 @@ def generate_social_media_report():
 5. Publier régulièrement (3-5 fois par semaine) pour maintenir l'engagement
 
 """
+
+def _format_expenses_by_site(state):
+    """
+    Tableau Markdown des dépenses par site.
+    """
+    if not state['sites']:
+        return "*Aucune dépense n'est encore rattachée à un site.*"
+    lines = ["| Site | Dépenses | Montant |", "|---|---|---|"]
+    for site, totals in sorted(state['sites'].items()):
+        lines.append(f"| {site_title(site)} | {totals['count']} | {totals['cents'] / 100:.2f} € |")
+    return "\n".join(lines)
+
+def generate_expenses_report(force=False):
+    """
+    Génère le rapport de transparence: utilisation réelle des fonds comparée
+    à la répartition annoncée, à partir des totaux du registre des dépenses
+    (mis à jour en ne lisant que les nouvelles dépenses).
+
+    Le rapport n'est régénéré que si les totaux ont changé, sauf si `force`.
+    """
+    os.makedirs(REPORTS_DIR, exist_ok=True)
     
-    with open(f"{REPORTS_DIR}/social_media_report.md", 'w', encoding='utf-8') as f:
-        f.write(report_content)
+    with tracing.span('expense_ledger', 'analytics'):
+        state = expense_ledger.refresh_ledger()
+    
+    if is_up_to_date('expenses_report.md', state, EXPENSES_REPORT_VERSION, force):
+        print(f"Rapport de transparence inchangé: {REPORTS_DIR}/expenses_report.md")
+        return
+    
+    report_content = f"""# Rapport de Transparence PattesThai
+
+*Généré le {datetime.now().strftime('%d/%m/%Y %H:%M')}*
+
+## Utilisation des Fonds
+
+{expense_ledger.format_allocation(state)}
+
+## Dépenses par Site
+
+{_format_expenses_by_site(state)}
+
+## Méthode
+
+Chaque dépense est enregistrée avec son justificatif dans le registre des dépenses du projet. Les écarts au prévu sont calculés au prorata du total dépensé.
+
+"""
+    path = write_report('expenses_report.md', report_content)
+    record_artifact('expenses_report.md', state, EXPENSES_REPORT_VERSION)
     
-    print(f"Rapport des réseaux sociaux généré dans {REPORTS_DIR}/social_media_report.md")
+    print(f"Rapport de transparence généré dans {path}")
+
+def render_site_expenses_report(expenses, site):
+    """
+    Rédige le rapport des dépenses d'un site au format Markdown, à partir de
+    ses totaux (voir site_reports.site_expense_data).
+    """
+    if expenses['count']:
+        share = expenses['cents'] / expenses['total_cents'] * 100 if expenses['total_cents'] else 0
+        summary = (f"- **Dépenses enregistrées**: {expenses['count']}\n"
+                   f"- **Montant**: {expenses['cents'] / 100:.2f} €\n"
+                   f"- **Part des dépenses de la campagne**: {share:.1f}%")
+    else:
+        summary = "*Aucune dépense n'est encore rattachée à ce site.*"
+    return f"""# Rapport de Transparence PattesThai - {site_title(site)}
+
+*Généré le {datetime.now().strftime('%d/%m/%Y %H:%M')}*
+
+## Dépenses du Site
+
+{summary}
+
+La répartition des fonds par poste est détaillée dans le rapport de transparence de la campagne.
 
-def main():
+"""
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère les rapports analytiques de PattesThai.")
+    parser.add_argument('--force', action='store_true',
+                        help="Régénère tous les rapports, même ceux dont les entrées n'ont pas changé")
+    args = parser.parse_args(argv)
+    
     print("Génération des rapports analytiques...")
     
     # Création des répertoires nécessaires
@@ -159,9 +615,19 @@ def main():
     os.makedirs(DATA_DIR, exist_ok=True)
     
     # Chargement des données et génération des rapports
-    funding_data = load_funding_data()
-    generate_funding_report(funding_data)
-    generate_social_media_report()
+    with tracing.span('load_funding_data', 'stage'):
+        funding_data = load_funding_data()
+    with tracing.span('funding_report', 'stage'):
+        generate_funding_report(funding_data, force=args.force)
+    with tracing.span('social_report', 'stage'):
+        generate_social_media_report(force=args.force)
+    with tracing.span('expenses_report', 'stage'):
+        generate_expenses_report(force=args.force)
+    
+    # Rapports de chaque site, rendus en parallèle dans reports/<site>/
+    from scripts.analytics import site_reports
+    with tracing.span('site_reports', 'stage'):
+        site_reports.generate_site_reports(funding_data, force=args.force)
     
     print("Tous les rapports ont été générés avec succès!")
 
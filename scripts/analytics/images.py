@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Optimisation des images publiées dans la documentation.
+
+Les graphiques des rapports (PNG à 300 DPI) et les photos de la campagne sont
+déclinés en variantes redimensionnées et compressées (WebP et PNG), plus une
+vignette. Le traitement est réparti sur un pool de processus et mis en cache
+d'après l'empreinte du contenu de chaque image: seules les images nouvelles
+ou modifiées sont retraitées. Un manifeste (`images.json`) décrit les
+variantes produites; les générateurs Markdown l'utilisent pour choisir la
+variante à afficher (`picture_html`, `gallery_markdown`).
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import quoteattr
+
+from scripts import tracing
+from scripts.analytics import charts
+
+# Configuration
+PHOTOS_DIR = 'assets/photos'
+PHOTOS_OUTPUT_DIR = 'docs/campaign/photos'
+MANIFEST_FILE = 'images.json'
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+# Variantes produites: nom -> largeur maximale en pixels (sans agrandissement)
+SIZES = {"full": 1200, "thumb": 320}
+# Formats des variantes, par ordre de préférence pour l'affichage
+FORMATS = ('webp', 'png')
+WEBP_QUALITY = int(os.environ.get('IMAGE_QUALITY', '80'))
+MAX_WORKERS = os.cpu_count() or 1
+# Version du traitement: à incrémenter pour forcer la régénération des variantes
+OPTIMIZE_VERSION = 2
+
+
+def _settings():
+    return {"sizes": SIZES, "formats": FORMATS, "quality": WEBP_QUALITY, "version": OPTIMIZE_VERSION}
+
+
+def image_digest(path, chunk_size=1024 * 1024):
+    """
+    Empreinte du contenu d'une image et des paramètres de traitement.
+    """
+    digest = hashlib.sha256(json.dumps(_settings(), sort_keys=True).encode('utf-8'))
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def variant_filename(source, size, fmt):
+    """
+    Nom du fichier d'une variante: `<image>-<extension>-<taille>.<format>`.
+    L'extension distingue `photo.png` de `photo.jpg`.
+    """
+    stem, extension = os.path.splitext(os.path.basename(source))
+    return f"{stem}-{extension.lstrip('.')}-{size}.{fmt}"
+
+
+def optimize_image(source, output_dir, sizes=SIZES, formats=FORMATS, quality=WEBP_QUALITY):
+    """
+    Produit les variantes d'une image dans `output_dir` (écriture atomique).
+    Retourne l'entrée du manifeste, sans l'empreinte.
+    """
+    # Import différé: Pillow n'est chargé que dans les processus de traitement
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.load()
+        width, height = image.size
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+        variants = {}
+        for size, max_width in sizes.items():
+            resized = image
+            if width > max_width:
+                resized = image.resize((max_width, max(1, round(height * max_width / width))), Image.LANCZOS)
+            variants[size] = {}
+            for fmt in formats:
+                filename = variant_filename(source, size, fmt)
+                path = os.path.join(output_dir, filename)
+                tmp_path = path + '.tmp'
+                if fmt == 'webp':
+                    resized.save(tmp_path, format='WEBP', quality=quality, method=6)
+                else:
+                    resized.save(tmp_path, format='PNG', optimize=True)
+                os.replace(tmp_path, path)
+                variants[size][fmt] = {"file": filename, "width": resized.width, "height": resized.height,
+                                       "bytes": os.path.getsize(path)}
+    return {"width": width, "height": height, "bytes": os.path.getsize(source), "variants": variants}
+
+
+def list_images(directory, extensions=SOURCE_EXTENSIONS):
+    """
+    Liste les images d'un répertoire, par ordre alphabétique.
+    """
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.lower().endswith(extensions)]
+
+
+def load_manifest(output_dir):
+    """
+    Charge le manifeste des variantes d'un répertoire ({} s'il n'existe pas).
+    """
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Manifeste des images illisible, traitement complet: {e}")
+    return {}
+
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _variant_files(entry):
+    return [variant['file'] for formats in entry.get('variants', {}).values() for variant in formats.values()]
+
+
+def optimize_images(sources, output_dir, force=False, max_workers=MAX_WORKERS):
+    """
+    Produit les variantes d'un lot d'images, en parallèle sur un pool de
+    processus lorsque plusieurs sont à traiter. Les images dont l'empreinte
+    n'a pas changé (et dont les variantes existent) sont ignorées, sauf si
+    `force`; les variantes des images disparues sont supprimées.
+
+    Retourne un résumé {'optimized', 'cached', 'removed'} (noms des images).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    digests = {os.path.basename(source): image_digest(source) for source in sources}
+    summary = {"optimized": [], "cached": [], "removed": []}
+
+    stale = []
+    for source in sources:
+        name = os.path.basename(source)
+        entry = manifest.get(name)
+        if (not force and entry and entry.get('digest') == digests[name]
+                and all(os.path.exists(os.path.join(output_dir, f)) for f in _variant_files(entry))):
+            summary['cached'].append(name)
+            tracing.count('images.cached')
+        else:
+            stale.append(source)
+
+    results = []
+    with tracing.span('images.optimize', 'images', images=len(stale)):
+        if len(stale) > 1 and max_workers > 1:
+            # Pas de fork: appelé depuis les fils de la chaîne (voir charts)
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(stale)),
+                                     mp_context=multiprocessing.get_context(charts.START_METHOD)) as executor:
+                futures = {executor.submit(optimize_image, source, output_dir): source for source in stale}
+                for future, source in futures.items():
+                    try:
+                        results.append((source, future.result()))
+                    except Exception as e:
+                        print(f"Erreur lors de l'optimisation de l'image {source}: {e}")
+        else:
+            for source in stale:
+                try:
+                    results.append((source, optimize_image(source, output_dir)))
+                except Exception as e:
+                    print(f"Erreur lors de l'optimisation de l'image {source}: {e}")
+
+    for source, entry in results:
+        name = os.path.basename(source)
+        entry['digest'] = digests[name]
+        # Variantes d'un nommage précédent qui ne sont plus produites
+        for filename in set(_variant_files(manifest.get(name, {}))) - set(_variant_files(entry)):
+            path = os.path.join(output_dir, filename)
+            if os.path.exists(path):
+                os.remove(path)
+        manifest[name] = entry
+        summary['optimized'].append(name)
+        tracing.count('images.optimized')
+        tracing.count('images.bytes_saved', entry['bytes'] - entry['variants']['full'][FORMATS[0]]['bytes'])
+
+    for name in sorted(set(manifest) - set(digests)):
+        for filename in _variant_files(manifest.pop(name)):
+            path = os.path.join(output_dir, filename)
+            if os.path.exists(path):
+                os.remove(path)
+        summary['removed'].append(name)
+
+    _save_manifest(output_dir, manifest)
+    return summary
+
+
+def pick_variant(entry, size='full', formats=FORMATS):
+    """
+    Retourne la variante d'une image à la taille demandée, dans le premier
+    format disponible de `formats` (None si aucune).
+    """
+    available = entry.get('variants', {}).get(size, {})
+    for fmt in formats:
+        if fmt in available:
+            return available[fmt]
+    return None
+
+
+def picture_html(entry, alt, size='full', base=''):
+    """
+    Balise <picture> d'une image: WebP pour les navigateurs qui le prennent
+    en charge, PNG sinon, avec ses dimensions pour éviter les décalages de
+    mise en page. `base` est le chemin du répertoire des variantes depuis la page.
+    """
+    prefix = f"{base.rstrip('/')}/" if base else ''
+    fallback = pick_variant(entry, size, ('png',) + FORMATS)
+    if fallback is None:
+        return ''
+    sources = ''.join(
+        f'<source srcset="{prefix}{variant["file"]}" type="image/{fmt}">'
+        for fmt, variant in entry['variants'][size].items() if variant is not fallback
+    )
+    return (f'<picture>{sources}<img src="{prefix}{fallback["file"]}" alt={quoteattr(alt)} '
+            f'width="{fallback["width"]}" height="{fallback["height"]}" loading="lazy"></picture>')
+
+
+def gallery_markdown(manifest, base=''):
+    """
+    Galerie de vignettes, chacune renvoyant vers la variante pleine taille.
+    """
+    prefix = f"{base.rstrip('/')}/" if base else ''
+    items = []
+    for name, entry in sorted(manifest.items()):
+        full = pick_variant(entry, 'full')
+        if full is None:
+            continue
+        alt = os.path.splitext(name)[0].replace('_', ' ').replace('-', ' ')
+        items.append(f'<a href="{prefix}{full["file"]}">{picture_html(entry, alt, "thumb", base)}</a>')
+    return '\n'.join(items)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rapports par site du projet (Khon Kaen, Rayong...).
+
+Chaque combinaison site × type de rapport est une tâche indépendante: les
+tâches dont les entrées ont changé sont rendues en parallèle sur un pool de
+processus et écrites dans `reports/<site>/`, de sorte que la durée totale
+n'augmente pas avec le nombre de villes. Un manifeste hiérarchique
+(`reports/index.json`) décrit les rapports de la campagne et ceux de chaque
+site; l'index de la documentation est construit à partir de ce manifeste.
+
+Les statistiques TikTok d'un site sont lues dans `data/social/tiktok/<site>/`,
+ses dépenses dans les totaux par site du registre des dépenses.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import re
+import json
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts import tracing
+from scripts.analytics import charts
+from scripts.analytics import generate_reports
+from scripts.fundraising import expense_ledger
+from scripts.fundraising import multi_fetch
+from scripts.shelter import animal_registry
+from scripts.social import tiktok_metrics
+
+# Configuration
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+MAX_WORKERS = os.cpu_count() or 1
+# Type de rapport -> (fichier, catégorie de l'index, libellé dans un site)
+REPORT_TYPES = {
+    "funding": ("funding_report.md", "Rapports de Financement", "Financement"),
+    "social": ("social_media_report.md", "Rapports des Réseaux Sociaux", "Réseaux sociaux"),
+    "expenses": ("expenses_report.md", "Rapports de Transparence", "Dépenses"),
+}
+
+
+def site_slug(site):
+    """
+    Nom de répertoire d'un site.
+    """
+    return re.sub(r'[^a-z0-9_-]+', '-', str(site).strip().lower()).strip('-')
+
+
+def list_sites(data, campaigns=None):
+    """
+    Sites connus: ceux des sources de financement et ceux des campagnes
+    configurées (voir multi_fetch.load_campaigns).
+    """
+    if campaigns is None:
+        campaigns = multi_fetch.load_campaigns()
+    sites = {entry.get('site') for entry in (data.get('sources') or {}).values()}
+    sites.update(campaign.get('site') for campaign in campaigns)
+    return sorted({site_slug(site) for site in sites if site and site_slug(site)})
+
+
+def site_funding_data(data, site):
+    """
+    Données de financement restreintes aux sources d'un site.
+    """
+    sources = {key: entry for key, entry in (data.get('sources') or {}).items()
+               if site_slug(entry.get('site') or '') == site}
+    available = [entry for entry in sources.values() if multi_fetch.source_available(entry)]
+    statuses = sorted({entry['status'] for entry in available if entry.get('status')})
+    if statuses:
+        status = ', '.join(statuses)
+    else:
+        status = "Indisponible" if sources else "En attente de lancement"
+    return {
+        "campaign_title": f"{data.get('campaign_title', 'PattesThai')} - {generate_reports.site_title(site)}",
+        "goal_amount": sum(entry.get('goal_amount') or 0 for entry in available),
+        "current_amount": sum(entry.get('current_amount', 0) for entry in available),
+        "donor_count": sum(entry.get('donor_count', 0) for entry in available),
+        "last_updated": data.get('last_updated'),
+        "status": status,
+        "sources": sources
+    }
+
+
+def site_expense_data(state, site):
+    """
+    Totaux des dépenses d'un site (montant et nombre), avec le total de la
+    campagne pour situer la part du site.
+    """
+    totals = [entry for name, entry in state['sites'].items() if site_slug(name) == site]
+    return {
+        "cents": sum(entry['cents'] for entry in totals),
+        "count": sum(entry['count'] for entry in totals),
+        "total_cents": state['total_cents']
+    }
+
+
+def plan_site_reports(data, sites):
+    """
+    Retourne les tâches de rendu (une par site et par type de rapport),
+    avec les entrées qui déterminent si chaque rapport est périmé.
+    """
+    tasks = []
+    # Registres des animaux et des dépenses chargés une fois pour tous les sites
+    registry = animal_registry.load_registry()
+    expenses = expense_ledger.read_ledger()
+    for site in sites:
+        site_data = site_funding_data(data, site)
+        history = generate_reports.load_funding_history(site=site)
+        animals = generate_reports.load_animal_summary(site, registry)
+        exports_dir = os.path.join(tiktok_metrics.EXPORTS_DIR, site)
+        # Empreinte des exports: la lecture elle-même a lieu dans le processus
+        # de rendu, uniquement si le rapport est périmé.
+        tasks.append({"site": site, "kind": "funding", "version": generate_reports.FUNDING_REPORT_VERSION,
+                      "output": f"{site}/{REPORT_TYPES['funding'][0]}",
+                      "inputs": {"data": site_data, "history": history, "animals": animals}})
+        tasks.append({"site": site, "kind": "social", "version": generate_reports.SOCIAL_REPORT_VERSION,
+                      "output": f"{site}/{REPORT_TYPES['social'][0]}",
+                      "inputs": {"exports_dir": exports_dir, "exports": tiktok_metrics.exports_fingerprint(exports_dir)}})
+        tasks.append({"site": site, "kind": "expenses", "version": generate_reports.EXPENSES_REPORT_VERSION,
+                      "output": f"{site}/{REPORT_TYPES['expenses'][0]}",
+                      "inputs": {"expenses": site_expense_data(expenses, site)}})
+    return tasks
+
+
+def render_site_report(task, reports_dir):
+    """
+    Rend et écrit le rapport d'une tâche (exécuté dans un processus de travail).
+    Retourne le chemin du rapport relatif à `reports_dir`.
+    """
+    inputs = task['inputs']
+    if task['kind'] == 'funding':
+        content = generate_reports.render_funding_report(inputs['data'], None, inputs['history'], task['site'],
+                                                         inputs['animals'])
+    elif task['kind'] == 'expenses':
+        content = generate_reports.render_site_expenses_report(inputs['expenses'], task['site'])
+    else:
+        social_data = {"tiktok": tiktok_metrics.ingest_exports(inputs['exports_dir'])}
+        content = generate_reports.render_social_media_report(social_data, task['site'])
+    generate_reports.write_report(task['output'], content, reports_dir)
+    return task['output']
+
+
+def build_index_manifest(sites, reports_dir=None):
+    """
+    Manifeste hiérarchique des rapports existants: rapports de la campagne,
+    puis rapports de chaque site.
+    """
+    reports_dir = reports_dir or generate_reports.REPORTS_DIR
+
+    def existing(prefix):
+        return {kind: f"{prefix}{filename}" for kind, (filename, _, _) in REPORT_TYPES.items()
+                if os.path.exists(os.path.join(reports_dir, f"{prefix}{filename}"))}
+
+    return {
+        "version": INDEX_VERSION,
+        "reports": existing(''),
+        "sites": {site: {"title": generate_reports.site_title(site), "reports": existing(f"{site}/")}
+                  for site in sites}
+    }
+
+
+def load_index_manifest(reports_dir=None):
+    """
+    Charge le manifeste des rapports, ou le reconstruit à partir des rapports
+    de la campagne présents s'il n'existe pas.
+    """
+    reports_dir = reports_dir or generate_reports.REPORTS_DIR
+    path = os.path.join(reports_dir, INDEX_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Manifeste des rapports illisible, index reconstruit: {e}")
+    return build_index_manifest([], reports_dir)
+
+
+def write_index_manifest(sites, reports_dir=None):
+    """
+    Écrit le manifeste des rapports (uniquement s'il a changé) et supprime
+    les rapports des sites qui n'existent plus. Retourne le manifeste.
+    """
+    reports_dir = reports_dir or generate_reports.REPORTS_DIR
+    path = os.path.join(reports_dir, INDEX_FILE)
+    previous = load_index_manifest(reports_dir) if os.path.exists(path) else {}
+    for site in sorted(set(previous.get('sites', {})) - set(sites)):
+        shutil.rmtree(os.path.join(reports_dir, site), ignore_errors=True)
+        print(f"Rapports du site {site} supprimés")
+
+    manifest = build_index_manifest(sites, reports_dir)
+    if manifest != previous:
+        os.makedirs(reports_dir, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    return manifest
+
+
+def generate_site_reports(data, sites=None, force=False, max_workers=MAX_WORKERS):
+    """
+    Génère les rapports périmés de chaque site, en parallèle sur un pool de
+    processus, puis met à jour le manifeste des rapports.
+
+    Retourne un résumé {'sites', 'generated', 'cached'} (chemins des rapports).
+    """
+    sites = list_sites(data) if sites is None else [site_slug(site) for site in sites]
+    reports_dir = generate_reports.REPORTS_DIR
+    tasks = plan_site_reports(data, sites)
+    summary = {"sites": sites, "generated": [], "cached": []}
+    stale = []
+    for task in tasks:
+        if generate_reports.is_up_to_date(task['output'], task['inputs'], task['version'], force):
+            summary['cached'].append(task['output'])
+        else:
+            stale.append(task)
+
+    rendered = []
+    with tracing.span('site_reports.render', 'reports', reports=len(stale)):
+        if len(stale) > 1 and max_workers > 1:
+            # Pas de fork: la chaîne appelle ce module depuis ses fils (voir charts)
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(stale)),
+                                     mp_context=multiprocessing.get_context(charts.START_METHOD)) as executor:
+                futures = {executor.submit(render_site_report, task, reports_dir): task for task in stale}
+                for future, task in futures.items():
+                    try:
+                        future.result()
+                        rendered.append(task)
+                    except Exception as e:
+                        print(f"Erreur lors de la génération du rapport {task['output']}: {e}")
+        else:
+            for task in stale:
+                try:
+                    render_site_report(task, reports_dir)
+                    rendered.append(task)
+                except Exception as e:
+                    print(f"Erreur lors de la génération du rapport {task['output']}: {e}")
+
+    if rendered:
+        generate_reports.record_artifacts([(task['output'], task['inputs'], task['version']) for task in rendered])
+    for task in rendered:
+        summary['generated'].append(task['output'])
+        print(f"Rapport généré: {reports_dir}/{task['output']}")
+    write_index_manifest(sites, reports_dir)
+    return summary
@@ -8,40 +8,190 @@ Note: Ce projet est 100% réel. Toute simulation ou action fictive est stricteme
 """
 
 import os
+import sys
+import json
 import shutil
+import argparse
+import hashlib
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:
+    # Windows: pas de clonage par ioctl, copie classique
+    fcntl = None
+
+# Ajout de la racine du dépôt au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts import tracing
+from scripts.analytics import images
+from scripts.analytics import site_reports
+
 # Configuration
 REPORTS_DIR = 'reports'
 DOCS_REPORTS_DIR = 'docs/reports'
+SYNC_MANIFEST_FILE = '.sync_manifest.json'
+# Les images matricielles ne sont pas copiées telles quelles: leurs variantes
+# optimisées sont produites dans IMAGES_SUBDIR (voir images.py)
+SYNC_EXTENSIONS = ('.md', '.svg')
+IMAGES_SUBDIR = 'images'
+# Fichiers de la documentation qui ne sont jamais supprimés par la synchronisation
+PROTECTED_FILES = {'index.md', 'README.md'}
+# Mode de copie: 'reflink' (clonage si possible, sinon copie), 'hardlink' ou 'copy'
+LINK_MODE = os.environ.get('PATTESTHAI_LINK_MODE', 'reflink')
+# Requête ioctl Linux de clonage de fichier (FICLONE)
+FICLONE = 0x40049409
+SUMMARY_LABELS = {"added": "+", "updated": "~", "removed": "-"}
 
-def update_documentation_with_reports():
+def _file_digest(path, chunk_size=1024 * 1024):
+    """
+    Calcule l'empreinte SHA-256 d'un fichier par blocs.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _load_sync_manifest():
+    """
+    Charge l'état de la dernière synchronisation (taille, date de modification
+    et empreinte de chaque rapport synchronisé).
     """
-    Copie les rapports générés dans le répertoire de documentation
-    et met à jour l'index des rapports.
+    manifest_file = os.path.join(DOCS_REPORTS_DIR, SYNC_MANIFEST_FILE)
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"État de synchronisation illisible, comparaison complète: {e}")
+    return {}
+
+def _save_sync_manifest(manifest):
+    manifest_file = os.path.join(DOCS_REPORTS_DIR, SYNC_MANIFEST_FILE)
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+def _clone_file(source, destination):
+    """
+    Copie un fichier en privilégiant un clonage léger: reflink (copie à la
+    demande) si le système de fichiers le permet, lien physique si
+    LINK_MODE vaut 'hardlink', et copie classique sinon.
+    La destination est remplacée de manière atomique.
+    """
+    tmp_path = destination + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    if LINK_MODE == 'hardlink':
+        try:
+            os.link(source, tmp_path)
+            os.replace(tmp_path, destination)
+            return
+        except OSError:
+            pass
+
+    if LINK_MODE in ('reflink', 'hardlink') and fcntl is not None:
+        try:
+            with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, tmp_path)
+            os.replace(tmp_path, destination)
+            return
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+def list_reports():
+    """
+    Liste les rapports à synchroniser, sous-répertoires des sites compris,
+    sous forme de chemins relatifs (`rayong/funding_report.md`).
+    """
+    reports = []
+    for directory, dirnames, filenames in os.walk(REPORTS_DIR):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        relative = os.path.relpath(directory, REPORTS_DIR)
+        for filename in filenames:
+            if filename.endswith(SYNC_EXTENSIONS):
+                reports.append(filename if relative == '.' else f"{relative.replace(os.sep, '/')}/{filename}")
+    return sorted(reports)
+
+def sync_reports():
+    """
+    Synchronise les rapports vers la documentation en ne copiant que les
+    fichiers modifiés et en supprimant les rapports qui n'existent plus.
+
+    Un fichier est considéré inchangé si sa taille et sa date de modification
+    correspondent à la dernière synchronisation; sinon les empreintes SHA-256
+    de la source et de la destination sont comparées.
+
+    Retourne un résumé {'added', 'updated', 'removed', 'unchanged'}.
     """
-    # Création du répertoire de rapports dans la documentation s'il n'existe pas
     os.makedirs(DOCS_REPORTS_DIR, exist_ok=True)
+    previous = _load_sync_manifest()
+    manifest = {}
+    summary = {"added": [], "updated": [], "removed": [], "unchanged": []}
+
+    for filename in list_reports():
+        source = os.path.join(REPORTS_DIR, filename)
+        destination = os.path.join(DOCS_REPORTS_DIR, filename)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        stat = os.stat(source)
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        known = previous.get(filename)
+
+        if not os.path.exists(destination):
+            entry['sha256'] = _file_digest(source)
+            _clone_file(source, destination)
+            summary['added'].append(filename)
+            tracing.count('docs.files_copied')
+            tracing.count('docs.bytes_copied', entry['size'])
+        elif (known and known.get('size') == entry['size'] and known.get('mtime_ns') == entry['mtime_ns']
+                and os.path.getsize(destination) == entry['size']):
+            entry['sha256'] = known.get('sha256')
+            summary['unchanged'].append(filename)
+        else:
+            entry['sha256'] = _file_digest(source)
+            if (os.path.getsize(destination) == entry['size']
+                    and _file_digest(destination) == entry['sha256']):
+                summary['unchanged'].append(filename)
+            else:
+                _clone_file(source, destination)
+                summary['updated'].append(filename)
+                tracing.count('docs.files_copied')
+                tracing.count('docs.bytes_copied', entry['size'])
+        manifest[filename] = entry
+
+    # Suppression des rapports synchronisés précédemment qui n'existent plus
+    for filename in sorted(set(previous) - set(manifest)):
+        destination = os.path.join(DOCS_REPORTS_DIR, filename)
+        if filename not in PROTECTED_FILES and os.path.exists(destination):
+            os.remove(destination)
+            summary['removed'].append(filename)
+            # Répertoire d'un site supprimé: retiré une fois vide
+            directory = os.path.dirname(destination)
+            if directory != DOCS_REPORTS_DIR and not os.listdir(directory):
+                os.rmdir(directory)
+
+    _save_sync_manifest(manifest)
+    return summary
+
+def render_reports_index(reports, charts=None, layout=None):
+    """
+    Retourne l'index des rapports de la documentation: rapports de la
+    campagne et de chaque site, classés d'après le manifeste hiérarchique
+    `layout` (voir site_reports.py), suivis des vignettes des graphiques
+    décrits par le manifeste `charts` (voir images.py).
+    """
+    if layout is None:
+        layout = site_reports.load_index_manifest(REPORTS_DIR)
+    available = set(reports)
+    listed = set()
     
-    # Vérification que les rapports existent
-    if not os.path.exists(REPORTS_DIR):
-        print(f"Le répertoire {REPORTS_DIR} n'existe pas. Aucun rapport à copier.")
-        return
-    
-    # Copie des rapports
-    files_copied = []
-    for filename in os.listdir(REPORTS_DIR):
-        if filename.endswith('.md') or filename.endswith('.png'):
-            source = os.path.join(REPORTS_DIR, filename)
-            destination = os.path.join(DOCS_REPORTS_DIR, filename)
-            shutil.copy2(source, destination)
-            files_copied.append(filename)
-    
-    if not files_copied:
-        print("Aucun rapport trouvé à copier.")
-        return
-    
-    # Mise à jour de l'index des rapports
     index_content = f"""# Rapports du Projet PattesThai
 
 *Dernière mise à jour: {datetime.now().strftime('%d/%m/%Y %H:%M')}*
@@ -52,34 +202,40 @@ Cette section contient les rapports générés automatiquement concernant le pro
 
 """
     
-    # Liste des rapports par catégorie
-    funding_reports = [f for f in files_copied if 'funding' in f.lower() and f.endswith('.md')]
-    social_reports = [f for f in files_copied if 'social' in f.lower() and f.endswith('.md')]
-    other_reports = [f for f in files_copied if f.endswith('.md') and f not in funding_reports and f not in social_reports]
-    
-    # Ajout des rapports de financement
-    if funding_reports:
-        index_content += "### Rapports de Financement\n\n"
-        for report in funding_reports:
+    # Rapports de la campagne, par type
+    for kind, (_, category, _) in site_reports.REPORT_TYPES.items():
+        report = layout.get('reports', {}).get(kind)
+        if report in available:
             report_name = report.replace('_', ' ').replace('.md', '').title()
-            index_content += f"- [{report_name}](./{report})\n"
-        index_content += "\n"
+            index_content += f"### {category}\n\n- [{report_name}](./{report})\n\n"
+            listed.add(report)
     
-    # Ajout des rapports de réseaux sociaux
-    if social_reports:
-        index_content += "### Rapports des Réseaux Sociaux\n\n"
-        for report in social_reports:
-            report_name = report.replace('_', ' ').replace('.md', '').title()
-            index_content += f"- [{report_name}](./{report})\n"
-        index_content += "\n"
+    # Rapports de chaque site
+    sites = [(site, entry) for site, entry in sorted(layout.get('sites', {}).items())
+             if any(report in available for report in entry.get('reports', {}).values())]
+    sites_content = "## Rapports par Site\n\n" if sites else ''
+    for site, entry in sites:
+        sites_content += f"### {entry.get('title', site)}\n\n"
+        for kind, (_, _, label) in site_reports.REPORT_TYPES.items():
+            report = entry['reports'].get(kind)
+            if report in available:
+                sites_content += f"- [{label}](./{report})\n"
+                listed.add(report)
+        sites_content += "\n"
     
-    # Ajout des autres rapports
+    # Rapports non décrits par le manifeste
+    other_reports = [f for f in reports if f.endswith('.md') and f not in listed]
     if other_reports:
         index_content += "### Autres Rapports\n\n"
         for report in other_reports:
-            report_name = report.replace('_', ' ').replace('.md', '').title()
+            report_name = os.path.basename(report).replace('_', ' ').replace('.md', '').title()
             index_content += f"- [{report_name}](./{report})\n"
         index_content += "\n"
+    index_content += sites_content
+    
+    # Vignettes des graphiques, renvoyant vers leur variante pleine taille
+    if charts:
+        index_content += f"## Graphiques\n\n{images.gallery_markdown(charts, IMAGES_SUBDIR)}\n\n"
     
     # Informations sur l'automatisation
     index_content += """## À Propos des Rapports
@@ -88,14 +244,70 @@ Tous ces rapports sont générés automatiquement par notre système d'intégrat
 
 Pour toute question ou suggestion concernant ces rapports, veuillez ouvrir une issue sur notre [dépôt GitHub](https://github.com/Casius999/PattesThai).
 """
-    
-    # Écriture du fichier d'index
+    return index_content
+
+def write_reports_index(reports, charts=None, layout=None):
+    """
+    Écrit l'index des rapports dans la documentation (voir render_reports_index).
+    """
     with open(os.path.join(DOCS_REPORTS_DIR, 'index.md'), 'w', encoding='utf-8') as f:
-        f.write(index_content)
+        f.write(render_reports_index(reports, charts, layout))
+
+def update_documentation_with_reports():
+    """
+    Synchronise les rapports générés vers le répertoire de documentation
+    et met à jour l'index des rapports lorsque la liste des rapports change.
+    """
+    # Vérification que les rapports existent
+    if not os.path.exists(REPORTS_DIR):
+        print(f"Le répertoire {REPORTS_DIR} n'existe pas. Aucun rapport à copier.")
+        return None
+    
+    with tracing.span('sync_reports', 'docs'):
+        summary = sync_reports()
+    tracing.count('docs.files_unchanged', len(summary['unchanged']))
+    reports = sorted(summary['added'] + summary['updated'] + summary['unchanged'])
+    
+    # Variantes optimisées des graphiques et des photos de la campagne
+    images_dir = os.path.join(DOCS_REPORTS_DIR, IMAGES_SUBDIR)
+    chart_sources = images.list_images(REPORTS_DIR)
+    if chart_sources or os.path.exists(images_dir):
+        summary['images'] = images.optimize_images(chart_sources, images_dir)
+    else:
+        summary['images'] = {"optimized": [], "cached": [], "removed": []}
+    if os.path.isdir(images.PHOTOS_DIR):
+        summary['photos'] = images.optimize_images(images.list_images(images.PHOTOS_DIR), images.PHOTOS_OUTPUT_DIR)
+    
+    if not reports:
+        print("Aucun rapport trouvé à copier.")
+        return summary
+    
+    # L'index n'est réécrit que si l'ensemble des rapports ou des graphiques a changé
+    if (summary['added'] or summary['removed'] or summary['images']['optimized'] or summary['images']['removed']
+            or not os.path.exists(os.path.join(DOCS_REPORTS_DIR, 'index.md'))):
+        write_reports_index(reports, images.load_manifest(images_dir))
+        summary['index_updated'] = True
+    else:
+        summary['index_updated'] = False
+    
+    print(f"Synchronisation: {len(summary['added'])} ajouté(s), {len(summary['updated'])} mis à jour, "
+          f"{len(summary['removed'])} supprimé(s), {len(summary['unchanged'])} inchangé(s)")
+    for label in ('added', 'updated', 'removed'):
+        for filename in summary[label]:
+            print(f"  {SUMMARY_LABELS[label]} {filename}")
+    for label, key in (('Graphiques', 'images'), ('Photos', 'photos')):
+        if key in summary:
+            print(f"{label}: {len(summary[key]['optimized'])} optimisé(s), {len(summary[key]['cached'])} inchangé(s), "
+                  f"{len(summary[key]['removed'])} supprimé(s)")
+    if summary['index_updated']:
+        print("Index des rapports mis à jour.")
     
-    print(f"Documentation mise à jour avec {len(files_copied)} rapports.")
+    print(f"Documentation à jour avec {len(reports)} rapports.")
+    return summary
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synchronise les rapports générés vers la documentation.")
+    parser.parse_args(argv)
     print("Mise à jour de la documentation avec les rapports...")
     update_documentation_with_reports()
     print("Terminé!")
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mesures de performance de la chaîne rapports -> documentation.
+
+Chaque mesure s'exécute dans un répertoire de travail temporaire alimenté par
+des générateurs de données synthétiques (dons, campagnes, rapports, idées) à
+l'échelle choisie. Les durées (médiane de plusieurs répétitions) et le pic de
+mémoire Python sont enregistrés au format JSON et comparés à une référence:
+la commande échoue si une mesure se dégrade au-delà du seuil toléré.
+
+Ces données synthétiques servent uniquement à mesurer les scripts; elles ne
+sont jamais écrites dans le dépôt ni publiées.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import shutil
+import struct
+import argparse
+import platform
+import tempfile
+import contextlib
+import statistics
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Ajout de la racine du dépôt au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.fundraising import donation_store
+from scripts.fundraising import funding_history
+from scripts.shelter import animal_registry
+
+# Configuration
+BASELINE_FILE = 'benchmarks/baseline.json'
+RESULTS_FILE = 'benchmarks/results.json'
+# Nombre de dons générés pour chaque échelle; les autres volumes en dépendent
+SCALES = {"small": 1000, "medium": 10000, "large": 100000}
+REPEAT = 3
+# Dégradation tolérée par rapport à la référence (0.25 = +25%)
+THRESHOLD = float(os.environ.get('BENCHMARK_THRESHOLD', '0.25'))
+# En dessous de ces écarts absolus, une variation est considérée comme du bruit
+MIN_DELTA_SECONDS = 0.01
+MIN_DELTA_KIB = 256
+SOURCES = ('gofundme', 'leetchi')
+SEED = 42
+
+
+def generate_donations(count, events_dir=donation_store.EVENTS_DIR, seed=SEED):
+    """
+    Écrit `count` dons répartis sur les sources et sur 90 jours,
+    précédés d'un relevé de campagne par source.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    events = [{"type": donation_store.EVENT_CAMPAIGN, "source": source, "campaign_title": "Benchmark",
+               "goal_amount": 10000, "current_amount": 0, "donor_count": 0, "status": "Active",
+               "timestamp": start.isoformat()} for source in SOURCES]
+    for i in range(count):
+        events.append({
+            "type": donation_store.EVENT_DONATION,
+            "source": SOURCES[i % len(SOURCES)],
+            "amount": rng.choice((5, 10, 20, 50, 100)),
+            "donor_id": f"donor-{rng.randrange(max(1, count // 2))}",
+            "timestamp": (start + timedelta(seconds=rng.randrange(90 * 86400))).isoformat()
+        })
+    donation_store.append_events(events, events_dir)
+
+
+def generate_campaigns(count, seed=SEED):
+    """
+    Retourne des données de financement agrégées sur `count` campagnes.
+    """
+    rng = random.Random(seed)
+    sources = {}
+    for i in range(count):
+        sources[f"{SOURCES[i % len(SOURCES)]}:site-{i}"] = {
+            "site": f"site-{i}", "goal_amount": 10000, "current_amount": rng.randrange(10000),
+            "donor_count": rng.randrange(500), "status": "Active"
+        }
+    return {
+        "campaign_title": "Benchmark",
+        "goal_amount": sum(s['goal_amount'] for s in sources.values()),
+        "current_amount": sum(s['current_amount'] for s in sources.values()),
+        "donor_count": sum(s['donor_count'] for s in sources.values()),
+        "last_updated": datetime(2025, 4, 1).isoformat(),
+        "status": "Active",
+        "sources": sources
+    }
+
+
+def _png_bytes(width, height, rng):
+    """
+    Image PNG valide (pixels RGB aléatoires), écrite sans Pillow.
+    """
+    def chunk(kind, payload):
+        return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload))
+
+    rows = b''.join(b'\x00' + rng.randbytes(width * 3) for _ in range(height))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+def generate_history(campaigns, days=90):
+    """
+    Enregistre dans l'historique un relevé quotidien des campagnes sur
+    `days` jours, les montants progressant jusqu'aux valeurs de `campaigns`.
+    """
+    start = datetime(2025, 4, 1) - timedelta(days=days - 1)
+    for day in range(days):
+        ratio = (day + 1) / days
+        sources = {key: dict(entry, current_amount=entry['current_amount'] * ratio)
+                   for key, entry in campaigns['sources'].items()}
+        funding_history.record_snapshot(dict(campaigns, current_amount=campaigns['current_amount'] * ratio,
+                                             sources=sources), start + timedelta(days=day))
+
+
+def generate_animals(count, path=animal_registry.REGISTRY_FILE, seed=SEED):
+    """
+    Écrit dans le registre `count` accueils répartis sur quelques sites et
+    sur un an, suivis d'un changement de statut pour environ la moitié.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 4, 1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            day = start + timedelta(days=365 * i // count)
+            f.write(json.dumps({"event": animal_registry.EVENT_INTAKE, "id": f"animal-{i}", "name": f"Animal {i}",
+                                "species": rng.choice(('chien', 'chat')), "site": f"site-{i % 5}",
+                                "date": day.date().isoformat()}) + '\n')
+            if rng.random() < 0.5:
+                f.write(json.dumps({"event": animal_registry.EVENT_STATUS, "id": f"animal-{i}",
+                                    "status": rng.choice((animal_registry.ADOPTED, animal_registry.FOSTER)),
+                                    "date": (day + timedelta(days=rng.randrange(1, 60))).date().isoformat()}) + '\n')
+
+
+def generate_reports(count, reports_dir='reports', seed=SEED):
+    """
+    Écrit `count` rapports Markdown et autant d'images dans `reports_dir`.
+    """
+    rng = random.Random(seed)
+    os.makedirs(reports_dir, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(reports_dir, f"report_{i:05d}.md"), 'w', encoding='utf-8') as f:
+            f.write(f"# Rapport {i}\n\n" + "Ligne de rapport.\n" * rng.randrange(10, 200))
+        with open(os.path.join(reports_dir, f"chart_{i:05d}.png"), 'wb') as f:
+            f.write(_png_bytes(rng.randrange(400, 1600), rng.randrange(8, 32), rng))
+
+
+def generate_ideas(count):
+    """
+    Génère `count` idées de contenu, à la manière d'un flux de l'API.
+    """
+    for i in range(count):
+        yield {"title": f"Idée {i}", "description": "Description d'une idée de contenu. " * 4,
+               "hashtags": ["#PattesThai", "#Refuge", f"#Idee{i % 50}"],
+               "music_suggestion": "Musique calme", "duration": "30 secondes"}
+
+
+def build_benchmarks(size):
+    """
+    Retourne les mesures disponibles: nom -> (préparation, exécution).
+
+    La préparation n'est pas chronométrée; elle retourne les arguments de
+    l'exécution.
+    """
+    from scripts.analytics import generate_reports as reports_module
+    from scripts.analytics import update_docs_with_reports, charts, images, site_reports
+    from scripts.social import generate_tiktok_content
+
+    def load_setup():
+        # Lecture à froid: l'état est reconstruit à partir de tout le journal
+        path = os.path.join(donation_store.EVENTS_DIR, donation_store.CHECKPOINT_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+        return ()
+
+    def report_setup():
+        return (reports_module.load_funding_data(),)
+
+    def docs_setup():
+        shutil.rmtree(update_docs_with_reports.DOCS_REPORTS_DIR, ignore_errors=True)
+        return ()
+
+    def site_setup():
+        # Campagnes synthétiques réparties sur plusieurs sites
+        with open('docs/campaign/data/funding_data.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return (data, site_reports.list_sites(data, campaigns=[]))
+
+    def chart_setup():
+        data = reports_module.load_funding_data()
+        return (reports_module.build_funding_chart_specs(data, reports_module.load_donation_analytics(data),
+                                                         reports_module.load_funding_history()),)
+
+    return {
+        "load_funding_data": (load_setup, reports_module.load_funding_data),
+        "load_funding_history": (lambda: (), reports_module.load_funding_history),
+        "generate_funding_report": (report_setup,
+                                    lambda data: reports_module.generate_funding_report(data, force=True, chart=False)),
+        "update_documentation_with_reports": (docs_setup, update_docs_with_reports.update_documentation_with_reports),
+        "save_content_ideas": (lambda: (), lambda: generate_tiktok_content.save_content_ideas(generate_ideas(size))),
+        "render_charts": (chart_setup, lambda specs: charts.render_charts(specs, reports_module.REPORTS_DIR, force=True)),
+        "generate_site_reports": (site_setup, lambda data, sites: site_reports.generate_site_reports(data, sites, force=True)),
+        "load_animal_registry": (lambda: (), animal_registry.load_registry),
+        "animal_summary": (lambda: (animal_registry.load_registry(),),
+                           lambda registry: [registry.summary('2025-04-01', site)
+                                             for site in (None,) + tuple(registry.by_site)]),
+        "optimize_images": (lambda: (images.list_images(reports_module.REPORTS_DIR),),
+                            lambda sources: images.optimize_images(sources, 'docs/reports/images', force=True)),
+    }
+
+
+def prepare_workspace(size):
+    """
+    Alimente le répertoire courant avec les données synthétiques de l'échelle.
+    """
+    generate_donations(size)
+    campaigns = generate_campaigns(max(2, size // 100))
+    os.makedirs('docs/campaign/data', exist_ok=True)
+    with open('docs/campaign/data/funding_data.json', 'w', encoding='utf-8') as f:
+        json.dump(campaigns, f)
+    generate_history(campaigns)
+    generate_animals(size)
+    generate_reports(max(1, size // 100))
+
+
+def measure(setup, func, repeat=REPEAT):
+    """
+    Chronomètre `func` sur `repeat` exécutions, puis mesure son pic de
+    mémoire Python sur une exécution supplémentaire.
+    """
+    timings = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            args = setup()
+            start = time.perf_counter()
+            func(*args)
+            timings.append(time.perf_counter() - start)
+
+        args = setup()
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        "seconds": round(statistics.median(timings), 6),
+        "min_seconds": round(min(timings), 6),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+
+def run_benchmarks(scale='small', only=None, repeat=REPEAT):
+    """
+    Exécute les mesures dans un répertoire temporaire et retourne les résultats.
+    """
+    size = SCALES[scale] if scale in SCALES else int(scale)
+    workspace = tempfile.mkdtemp(prefix='pattesthai-bench-')
+    cwd = os.getcwd()
+    results = {}
+    try:
+        os.chdir(workspace)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            prepare_workspace(size)
+        for name, (setup, func) in build_benchmarks(size).items():
+            if only and name not in only:
+                continue
+            results[name] = measure(setup, func, repeat)
+            print(f"{name}: {results[name]['seconds'] * 1000:.1f} ms, pic {results[name]['peak_kib']:.0f} Kio")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workspace, ignore_errors=True)
+    return {
+        "scale": scale,
+        "size": size,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": datetime.now().isoformat(),
+        "results": results
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Retourne la liste des régressions par rapport à la référence.
+    """
+    regressions = []
+    for name, current in results['results'].items():
+        reference = baseline.get('results', {}).get(name)
+        if not reference:
+            continue
+        for key, min_delta in (('seconds', MIN_DELTA_SECONDS), ('peak_kib', MIN_DELTA_KIB)):
+            before, after = reference.get(key), current.get(key)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + threshold) and after - before > min_delta:
+                change = f"+{(after / before - 1) * 100:.0f}%" if before else "nouveau coût"
+                regressions.append(f"{name} ({key}): {before} -> {after} ({change})")
+    return regressions
+
+
+def load_results(path):
+    """
+    Charge un fichier de résultats, ou None s'il n'existe pas.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    """
+    Enregistre des résultats au format JSON.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure les performances des rapports et de la documentation.")
+    parser.add_argument('--scale', default='small',
+                        help=f"Échelle des données: {', '.join(SCALES)} ou un nombre de dons")
+    parser.add_argument('--only', nargs='+', help="Mesures à exécuter (toutes par défaut)")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="Nombre de répétitions chronométrées")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="Dégradation tolérée par rapport à la référence (0.25 = +25%%)")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Fichier de référence")
+    parser.add_argument('--output', default=RESULTS_FILE, help="Fichier des résultats")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Enregistre les résultats comme nouvelle référence")
+    args = parser.parse_args(argv)
+
+    # Chemins résolus avant le changement de répertoire de travail
+    baseline_path = os.path.abspath(args.baseline)
+    output_path = os.path.abspath(args.output)
+
+    print(f"Mesures de performance (échelle {args.scale})...")
+    results = run_benchmarks(args.scale, args.only, args.repeat)
+    save_results(results, output_path)
+
+    if args.save_baseline:
+        save_results(results, baseline_path)
+        print(f"Référence enregistrée dans {baseline_path}")
+        return 0
+
+    baseline = load_results(baseline_path)
+    if baseline is None:
+        print(f"Aucune référence ({baseline_path}): utilisez --save-baseline pour en créer une.")
+        return 0
+    if baseline.get('scale') != results['scale']:
+        print(f"Référence mesurée à l'échelle {baseline.get('scale')}, comparaison ignorée.")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("Régressions de performance détectées:", file=sys.stderr)
+        for regression in regressions:
+            print(f"- {regression}", file=sys.stderr)
+        return 1
+    print("Aucune régression de performance.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
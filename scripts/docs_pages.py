@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Extension MkDocs: pages de financement et des rapports rendues en mémoire.
+
+Déclarée dans `mkdocs.yml` (section `hooks`), elle ajoute à la construction
+de la documentation, sans écrire ces pages dans `docs/`:
+
+- `campaign/data/funding_status.md`, rendue à partir des dernières données
+  de financement publiées (`funding_data.json`) et du registre des dépenses;
+- les rapports de `reports/` (campagne et sites) sous `reports/`, ainsi que
+  leur index.
+
+Chaque page est associée à l'empreinte de ses entrées (taille et date de
+modification des fichiers lus). D'une construction à l'autre (`mkdocs
+serve`), seules les pages dont les entrées ont changé sont rendues à
+nouveau; avec `mkdocs serve --dirty`, MkDocs ne reconstruit de plus que ces
+pages-là. Une page générée remplace le fichier de même nom présent dans
+`docs/`.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+
+# Ajout de la racine du dépôt au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mkdocs.structure.files import File
+
+from scripts import tracing
+from scripts.analytics import images
+from scripts.analytics import site_reports
+from scripts.analytics import update_docs_with_reports
+from scripts.fundraising import badges
+from scripts.fundraising import expense_ledger
+from scripts.fundraising import update_fundraising_data
+
+# Configuration
+FUNDING_PAGE = 'campaign/data/funding_status.md'
+REPORTS_PAGES_DIR = 'reports'
+# Version du rendu: à incrémenter pour forcer le rendu de toutes les pages
+PAGES_VERSION = 1
+
+log = logging.getLogger('mkdocs.plugins.pattesthai')
+
+# Pages rendues lors des constructions précédentes: chemin -> (empreinte, contenu)
+_rendered = {}
+# Pages de la construction en cours: chemin -> (contenu, modifiée)
+_pending = {}
+
+
+class GeneratedPage(File):
+    """
+    Fichier de la documentation produit par cette extension. Il n'est
+    considéré comme modifié (construction `--dirty`) que si ses entrées ont
+    changé depuis la construction précédente.
+    """
+
+    changed = True
+
+    def is_modified(self):
+        return self.changed or not os.path.isfile(self.abs_dest_path)
+
+
+def _fingerprint(value):
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _file_state(path):
+    # Taille et date de modification, ou None si le fichier n'existe pas
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _render_funding_page():
+    data = update_fundraising_data.load_previous_data()
+    if data is None:
+        return None
+    # Badges de progression affichés par la page, créés s'ils manquent
+    badges.render_funding_badges(data)
+    # Construction de la documentation: registre des dépenses en lecture seule
+    return update_fundraising_data.render_funding_status(data, update_ledger=False)
+
+
+def plan_pages():
+    """
+    Pages à produire: {chemin dans la documentation: (entrées, rendu)}, où
+    `rendu` est une fonction sans argument retournant le contenu Markdown
+    (None pour ne pas produire la page).
+    """
+    output_dir = update_fundraising_data.OUTPUT_DIR
+    ledger_dir = expense_ledger.LEDGER_DIR
+    pages = {
+        FUNDING_PAGE: (
+            {"data": _file_state(os.path.join(output_dir, 'funding_data.json')),
+             "expenses": {name: _file_state(os.path.join(ledger_dir, name))
+                          for name in expense_ledger.list_ledger_files(ledger_dir)},
+             "photos": _file_state(os.path.join(images.PHOTOS_OUTPUT_DIR, images.MANIFEST_FILE))},
+            _render_funding_page
+        )
+    }
+
+    reports_dir = update_docs_with_reports.REPORTS_DIR
+    reports = update_docs_with_reports.list_reports()
+    for report in reports:
+        if report.endswith('.md'):
+            path = os.path.join(reports_dir, report)
+            pages[f"{REPORTS_PAGES_DIR}/{report}"] = (_file_state(path), lambda path=path: _read(path))
+
+    if reports:
+        charts_dir = os.path.join(update_docs_with_reports.DOCS_REPORTS_DIR, update_docs_with_reports.IMAGES_SUBDIR)
+        pages[f"{REPORTS_PAGES_DIR}/index.md"] = (
+            {"reports": reports,
+             "layout": _file_state(os.path.join(reports_dir, site_reports.INDEX_FILE)),
+             "charts": _file_state(os.path.join(charts_dir, images.MANIFEST_FILE))},
+            lambda: update_docs_with_reports.render_reports_index(reports, images.load_manifest(charts_dir))
+        )
+    return pages
+
+
+def render_pages():
+    """
+    Rend les pages dont les entrées ont changé depuis la construction
+    précédente et réutilise les autres.
+
+    Retourne {chemin: (contenu, modifiée)}.
+    """
+    pages = {}
+    for src_uri, (inputs, render) in plan_pages().items():
+        key = _fingerprint({"version": PAGES_VERSION, "inputs": inputs})
+        cached = _rendered.get(src_uri)
+        if cached and cached[0] == key:
+            pages[src_uri] = (cached[1], False)
+            tracing.count('docs.pages_cached')
+            continue
+        try:
+            content = render()
+        except Exception as e:
+            log.warning(f"Page {src_uri} non générée: {e}")
+            continue
+        if content is None:
+            _rendered.pop(src_uri, None)
+            continue
+        _rendered[src_uri] = (key, content)
+        pages[src_uri] = (content, True)
+        tracing.count('docs.pages_rendered')
+    for src_uri in set(_rendered) - set(pages):
+        del _rendered[src_uri]
+    return pages
+
+
+def static_files():
+    """
+    Fichiers des rapports copiés tels quels dans le site (graphiques SVG):
+    {chemin dans la documentation: fichier source}.
+    """
+    return {f"{REPORTS_PAGES_DIR}/{report}": os.path.abspath(os.path.join(update_docs_with_reports.REPORTS_DIR, report))
+            for report in update_docs_with_reports.list_reports() if not report.endswith('.md')}
+
+
+def on_pre_build(config):
+    # Rendu avant l'inventaire de docs/: les badges créés à cette occasion
+    # (voir badges.py) font ainsi partie de la construction.
+    _pending.clear()
+    with tracing.span('docs_pages', 'docs'):
+        _pending.update(render_pages())
+    changed = sum(1 for _, modified in _pending.values() if modified)
+    log.info(f"Pages générées: {changed} rendue(s), {len(_pending) - changed} inchangée(s)")
+
+
+def on_files(files, config):
+    generated = [GeneratedPage.generated(config, src_uri, content=content)
+                 for src_uri, (content, _) in _pending.items()]
+    for page in generated:
+        page.changed = _pending[page.src_uri][1]
+    generated += [File.generated(config, src_uri, abs_src_path=path) for src_uri, path in static_files().items()]
+    for page in generated:
+        existing = files.get_file_from_path(page.src_uri)
+        if existing is not None:
+            files.remove(existing)
+        files.append(page)
+    return files
+
+
+def on_serve(server, config, builder):
+    # Une modification des rapports ou du registre des dépenses relance la construction
+    for directory in (update_docs_with_reports.REPORTS_DIR, expense_ledger.LEDGER_DIR):
+        if os.path.isdir(directory):
+            server.watch(os.path.abspath(directory))
+    return server
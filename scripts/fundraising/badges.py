@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Génération locale des badges et barres de progression du financement.
+
+Les images (SVG, et PNG via Pillow si BADGE_PNG=1) sont écrites dans
+docs/campaign/badges/ et référencées par les pages Markdown, sans dépendre
+d'un service tiers: les pages se chargent plus vite et la documentation se
+construit hors ligne. Le nom de chaque fichier est dérivé du type, du
+pourcentage et du style: une image déjà présente n'est jamais régénérée.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import json
+import hashlib
+from xml.sax.saxutils import escape
+
+from scripts.fundraising import multi_fetch
+
+# Configuration
+BADGES_DIR = 'docs/campaign/badges'
+BADGE_PNG = os.environ.get('BADGE_PNG') == '1'
+
+KIND_BAR = 'bar'
+KIND_BADGE = 'badge'
+
+STYLE = {
+    "label": "financement",
+    "fill": "#4CAF50",
+    "track": "#F5F5F5",
+    "label_color": "#555555",
+    "text_color": "#FFFFFF",
+    "width": 240,
+    "height": 20
+}
+# Largeur moyenne d'un caractère en police 11px, pour dimensionner les badges
+CHAR_WIDTH = 7
+
+
+def progress_percent(current, goal):
+    """
+    Pourcentage entier atteint, borné entre 0 et 100.
+    """
+    if not goal or goal <= 0:
+        return 0
+    return max(0, min(100, int(current * 100 / goal)))
+
+
+def _style_key(style):
+    payload = json.dumps(style, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:8]
+
+
+def badge_filename(kind, percent, style=STYLE, extension='svg'):
+    """
+    Nom du fichier d'un badge: identique pour un même type, pourcentage et style.
+    """
+    return f"{kind}-{percent}-{_style_key(style)}.{extension}"
+
+
+def render_bar_svg(percent, style=STYLE):
+    """
+    Barre de progression horizontale avec le pourcentage au centre.
+    """
+    width, height = style['width'], style['height']
+    filled = round(width * percent / 100)
+    text_color = style['label_color'] if percent < 50 else style['text_color']
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'role="img" aria-label="{percent}%">'
+        f'<rect width="{width}" height="{height}" rx="3" fill="{style["track"]}"/>'
+        f'<rect width="{filled}" height="{height}" rx="3" fill="{style["fill"]}"/>'
+        f'<text x="{width / 2}" y="{height * 0.7:.1f}" fill="{text_color}" text-anchor="middle" '
+        f'font-family="Verdana,DejaVu Sans,sans-serif" font-size="11">{percent}%</text></svg>'
+    )
+
+
+def render_badge_svg(percent, style=STYLE):
+    """
+    Badge en deux parties (libellé | pourcentage), à la manière de shields.io.
+    """
+    label = escape(style['label'])
+    value = f"{percent}%"
+    label_width = len(style['label']) * CHAR_WIDTH + 10
+    value_width = len(value) * CHAR_WIDTH + 10
+    width, height = label_width + value_width, style['height']
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'role="img" aria-label="{label}: {value}">'
+        f'<rect width="{label_width}" height="{height}" fill="{style["label_color"]}"/>'
+        f'<rect x="{label_width}" width="{value_width}" height="{height}" fill="{style["fill"]}"/>'
+        f'<g fill="{style["text_color"]}" text-anchor="middle" '
+        f'font-family="Verdana,DejaVu Sans,sans-serif" font-size="11">'
+        f'<text x="{label_width / 2}" y="{height * 0.7:.1f}">{label}</text>'
+        f'<text x="{label_width + value_width / 2}" y="{height * 0.7:.1f}">{value}</text></g></svg>'
+    )
+
+
+def _render_png(kind, percent, style, path):
+    # Import différé: Pillow n'est nécessaire que pour la sortie PNG
+    from PIL import Image, ImageDraw
+
+    width, height = style['width'], style['height']
+    image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    text = f"{percent}%"
+    if kind == KIND_BAR:
+        draw.rounded_rectangle((0, 0, width - 1, height - 1), radius=3, fill=style['track'])
+        if percent:
+            draw.rounded_rectangle((0, 0, max(6, round(width * percent / 100)) - 1, height - 1),
+                                   radius=3, fill=style['fill'])
+        color = style['label_color'] if percent < 50 else style['text_color']
+        draw.text((width / 2, height / 2), text, fill=color, anchor='mm')
+    else:
+        draw.rectangle((0, 0, width // 2, height), fill=style['label_color'])
+        draw.rectangle((width // 2, 0, width, height), fill=style['fill'])
+        draw.text((width / 4, height / 2), style['label'], fill=style['text_color'], anchor='mm')
+        draw.text((width * 3 / 4, height / 2), text, fill=style['text_color'], anchor='mm')
+    tmp_path = path + '.tmp'
+    image.save(tmp_path, format='PNG', optimize=True)
+    os.replace(tmp_path, path)
+
+
+def ensure_badge(kind, percent, style=STYLE, badges_dir=None, png=None):
+    """
+    Écrit le badge s'il n'existe pas encore et retourne son nom de fichier.
+    """
+    badges_dir = badges_dir or BADGES_DIR
+    png = BADGE_PNG if png is None else png
+    os.makedirs(badges_dir, exist_ok=True)
+    filename = badge_filename(kind, percent, style)
+    path = os.path.join(badges_dir, filename)
+    if not os.path.exists(path):
+        svg = render_bar_svg(percent, style) if kind == KIND_BAR else render_badge_svg(percent, style)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(svg)
+        os.replace(tmp_path, path)
+    if png:
+        png_path = os.path.join(badges_dir, badge_filename(kind, percent, style, 'png'))
+        if not os.path.exists(png_path):
+            try:
+                _render_png(kind, percent, style, png_path)
+            except Exception as e:
+                print(f"Erreur lors de la génération du badge PNG: {e}")
+    return filename
+
+
+def funding_badges(data):
+    """
+    Badges nécessaires à une page de financement: barre de progression
+    globale et badge de chaque source (plateforme, ville).
+    Retourne une liste de couples (type, pourcentage).
+    """
+    badges = {(KIND_BAR, progress_percent(data['current_amount'], data['goal_amount']))}
+    for entry in (data.get('sources') or {}).values():
+        if multi_fetch.source_available(entry):
+            badges.add((KIND_BADGE, progress_percent(entry.get('current_amount', 0), entry.get('goal_amount'))))
+    return sorted(badges)
+
+
+def render_funding_badges(data, badges_dir=None):
+    """
+    Génère les badges manquants pour les données de financement.
+    Retourne les noms de fichiers référencés.
+    """
+    return [ensure_badge(kind, percent, badges_dir=badges_dir) for kind, percent in funding_badges(data)]
+
+
+def badge_link(kind, percent, from_dir, badges_dir=None):
+    """
+    Chemin relatif du badge depuis le répertoire de la page qui l'affiche.
+    """
+    relative = os.path.relpath(badges_dir or BADGES_DIR, from_dir).replace(os.sep, '/')
+    return f"{relative}/{badge_filename(kind, percent)}"
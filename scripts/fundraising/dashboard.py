@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tableau de bord du financement en temps réel.
+
+Un service HTTP local conserve en mémoire l'état courant du financement,
+actualisé périodiquement avec les fonctions de récupération de
+update_fundraising_data, et le diffuse aux navigateurs:
+
+- `/`: page du tableau de bord, mise à jour en direct.
+- `/api/funding`: instantané JSON pré-encodé, avec ETag (réponse 304 si
+  inchangé). Aucun fichier n'est relu à chaque requête.
+- `/events`: flux Server-Sent Events. Chaque visiteur reçoit d'abord
+  l'instantané complet, puis uniquement les champs modifiés. Un visiteur qui
+  se reconnecte (en-tête Last-Event-ID) reçoit les mises à jour manquées.
+
+Utilisation:
+    python scripts/pattesthai.py dashboard --port 8080
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ajout de la racine du dépôt au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.fundraising import donor_sketch
+from scripts.fundraising import update_fundraising_data
+
+# Configuration
+POLL_INTERVAL = float(os.environ.get('DASHBOARD_POLL_INTERVAL', '60'))
+# Intervalle des commentaires de maintien de connexion du flux SSE
+KEEPALIVE_INTERVAL = 15
+# Nombre de mises à jour conservées pour les visiteurs qui se reconnectent
+HISTORY_SIZE = 100
+
+PAGE = """<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>PattesThai - Financement en direct</title>
+<style>
+body { font-family: sans-serif; max-width: 40em; margin: 2em auto; }
+.bar { background: #F5F5F5; border-radius: 4px; height: 1.5em; }
+.bar div { background: #4CAF50; height: 100%; border-radius: 4px; transition: width 0.5s; }
+</style>
+</head>
+<body>
+<h1 id="campaign_title">PattesThai</h1>
+<div class="bar"><div id="progress" style="width: 0%"></div></div>
+<ul>
+<li><strong>Montant actuel</strong>: <span id="current_amount">-</span> €</li>
+<li><strong>Objectif</strong>: <span id="goal_amount">-</span> €</li>
+<li><strong>Donateurs</strong>: <span id="donor_count">-</span></li>
+<li><strong>Statut</strong>: <span id="status">-</span></li>
+</ul>
+<p><small>Dernière mise à jour: <span id="last_updated">-</span></small></p>
+<script>
+var state = {};
+function render() {
+  ["campaign_title", "current_amount", "goal_amount", "status", "last_updated"].forEach(function (key) {
+    if (key in state) { document.getElementById(key).textContent = state[key]; }
+  });
+  document.getElementById("donor_count").textContent =
+    "unique_donor_count" in state ? state.unique_donor_count : state.donor_count;
+  var percent = state.goal_amount > 0 ? Math.min(100, 100 * state.current_amount / state.goal_amount) : 0;
+  document.getElementById("progress").style.width = percent + "%";
+}
+var source = new EventSource("/events");
+source.addEventListener("snapshot", function (e) { state = JSON.parse(e.data); render(); });
+source.addEventListener("update", function (e) { Object.assign(state, JSON.parse(e.data)); render(); });
+</script>
+</body>
+</html>
+""".encode('utf-8')
+
+
+def _encode(data):
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class DashboardState:
+    """
+    État partagé du tableau de bord: instantané pré-encodé, version et
+    historique des dernières modifications, diffusées aux flux SSE.
+    """
+
+    def __init__(self, data=None, history_size=HISTORY_SIZE):
+        self.condition = threading.Condition()
+        self.data = {}
+        self.version = 0
+        self.snapshot = _encode({})
+        self.etag = self._etag(self.snapshot)
+        self.history = deque(maxlen=history_size)
+        self.viewers = 0
+        self.closed = False
+        if data is not None:
+            self.update(data)
+
+    @staticmethod
+    def _etag(body):
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def update(self, data):
+        """
+        Remplace l'état courant. Retourne True et notifie les flux si des
+        champs significatifs ont changé.
+        """
+        with self.condition:
+            # Horodatages et latences, y compris par source, sont ignorés
+            if not update_fundraising_data.has_changed(data, self.data):
+                return False
+            delta = {key: value for key, value in data.items() if self.data.get(key) != value}
+            delta.update({key: None for key in self.data if key not in data})
+            self.data = data
+            self.version += 1
+            self.snapshot = _encode(data)
+            self.etag = self._etag(self.snapshot)
+            self.history.append((self.version, _encode(delta)))
+            self.condition.notify_all()
+            return True
+
+    def events_since(self, version):
+        """
+        Retourne les événements (id, type, données) postérieurs à `version`:
+        les modifications conservées, ou l'instantané complet si elles ne
+        suffisent pas à reconstituer l'état.
+        """
+        with self.condition:
+            if version == self.version:
+                return []
+            oldest = self.history[0][0] if self.history else self.version + 1
+            if version is None or version > self.version or version < oldest - 1:
+                return [(self.version, 'snapshot', self.snapshot)]
+            return [(v, 'update', delta) for v, delta in self.history if v > version]
+
+    def wait(self, version, timeout):
+        """
+        Attend une version postérieure à `version` (ou la fermeture), au plus `timeout` secondes.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version or self.closed, timeout)
+
+    def close(self):
+        """
+        Termine tous les flux en cours.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Pas de journalisation de chaque requête
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path in ('/', '/index.html'):
+            self._send(200, PAGE, {"Content-Type": "text/html; charset=utf-8"})
+        elif path == '/api/funding':
+            self._send_snapshot()
+        elif path == '/events':
+            self._stream_events()
+        else:
+            self._send(404, b'{"error": "not found"}', {"Content-Type": "application/json"})
+
+    do_HEAD = do_GET
+
+    def _send_snapshot(self):
+        state = self.server.state
+        # Lecture cohérente de l'instantané et de son ETag, sans sérialisation
+        with state.condition:
+            body, etag = state.snapshot, state.etag
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+            self._send(304, headers=headers)
+            return
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+        self._send(200, body, headers)
+
+    def _stream_events(self):
+        state = self.server.state
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        last_event_id = self.headers.get('Last-Event-ID')
+        version = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+        with state.condition:
+            state.viewers += 1
+        try:
+            while not state.closed:
+                events = state.events_since(version)
+                if events:
+                    frames = [b'id: %d\nevent: %s\ndata: %s\n\n' % (v, kind.encode('ascii'), data)
+                              for v, kind, data in events]
+                    self.wfile.write(b''.join(frames))
+                    version = events[-1][0]
+                else:
+                    self.wfile.write(b': ping\n\n')
+                self.wfile.flush()
+                state.wait(version, self.server.keepalive)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with state.condition:
+                state.viewers -= 1
+
+
+def fetch_dashboard_data():
+    """
+    Récupère l'état du financement avec les fonctions de update_fundraising_data,
+    complété par le nombre de donateurs distincts déjà calculé. Rien n'est
+    publié (données, journal, esquisses); seul le cache HTTP du client
+    GoFundMe (data/http_cache) est mis à jour par les requêtes.
+    """
+    data = update_fundraising_data.get_fundraising_data()
+    sketches, _ = donor_sketch.load_sketches(
+        os.path.join(update_fundraising_data.OUTPUT_DIR, donor_sketch.SKETCHES_FILE))
+    return donor_sketch.attach_unique_donors(data, donor_sketch.summarize(sketches))
+
+
+def _poll(server, fetch, interval):
+    while not server.state.closed:
+        try:
+            if server.state.update(fetch()):
+                print(f"Tableau de bord mis à jour (version {server.state.version})")
+        except Exception as e:
+            print(f"Erreur lors de l'actualisation du tableau de bord: {e}")
+        with server.state.condition:
+            server.state.condition.wait_for(lambda: server.state.closed, interval)
+
+
+def start_dashboard(host='127.0.0.1', port=0, fetch=fetch_dashboard_data, poll_interval=POLL_INTERVAL,
+                    keepalive=KEEPALIVE_INTERVAL):
+    """
+    Démarre le serveur et l'actualisation périodique dans des threads et
+    retourne le serveur (URL via `server.base_url`, état via `server.state`).
+    Sans fonction `fetch`, l'état n'est modifié que par `server.state.update`.
+    Arrêter avec `stop_dashboard(server)`.
+    """
+    server = ThreadingHTTPServer((host, port), DashboardHandler)
+    server.daemon_threads = True
+    server.state = DashboardState()
+    server.keepalive = keepalive
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    if fetch is not None:
+        threading.Thread(target=_poll, args=(server, fetch, poll_interval), daemon=True).start()
+    return server
+
+
+def stop_dashboard(server):
+    """
+    Ferme les flux en cours et arrête le serveur.
+    """
+    server.state.close()
+    server.shutdown()
+    server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tableau de bord du financement en temps réel.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help="Intervalle d'actualisation des données, en secondes")
+    args = parser.parse_args(argv)
+
+    server = start_dashboard(args.host, args.port, poll_interval=args.interval)
+    print(f"Tableau de bord disponible sur {server.base_url}/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_dashboard(server)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Journal d'événements de dons en ajout seul (append-only).
+
+Les événements (relevés de campagne, dons individuels) sont écrits dans des
+segments NDJSON numérotés. Un point de contrôle (checkpoint) conserve l'état
+agrégé ainsi que la position de lecture dans le journal, ce qui permet de mettre
+à jour les totaux en ne lisant que les événements ajoutés depuis le dernier
+point de contrôle.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import json
+from datetime import datetime
+
+# Configuration
+EVENTS_DIR = 'data/donations'
+SEGMENT_MAX_EVENTS = 10000
+CHECKPOINT_FILE = 'checkpoint.json'
+# Position d'écriture: segment courant, nombre d'événements et taille
+WRITER_FILE = 'writer.json'
+SEGMENT_PREFIX = 'events-'
+SEGMENT_SUFFIX = '.ndjson'
+
+# Types d'événements reconnus
+EVENT_CAMPAIGN = 'campaign'
+EVENT_DONATION = 'donation'
+# Source des événements qui n'en précisent pas (campagne GoFundMe unique)
+DEFAULT_SOURCE = 'gofundme'
+
+
+def _segment_path(events_dir, number):
+    return os.path.join(events_dir, f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}")
+
+
+def list_segments(events_dir=EVENTS_DIR):
+    """
+    Retourne les numéros des segments présents, dans l'ordre.
+    """
+    if not os.path.isdir(events_dir):
+        return []
+    numbers = []
+    for filename in os.listdir(events_dir):
+        if filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX):
+            try:
+                numbers.append(int(filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+            except ValueError:
+                continue
+    return sorted(numbers)
+
+
+def _count_lines(path):
+    with open(path, 'rb') as f:
+        return sum(1 for _ in f)
+
+
+def _segment_count(events_dir, number, path):
+    # Nombre d'événements du segment, repris de la position d'écriture tant
+    # que le segment n'a pas été modifié par ailleurs (même taille)
+    if not os.path.exists(path):
+        return 0
+    try:
+        with open(os.path.join(events_dir, WRITER_FILE), 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved['segment'] == number and saved['size'] == os.path.getsize(path):
+            return saved['events']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return _count_lines(path)
+
+
+def _save_writer_position(events_dir, number, count, path):
+    position = {"segment": number, "events": count, "size": os.path.getsize(path)}
+    writer_path = os.path.join(events_dir, WRITER_FILE)
+    tmp_path = writer_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(position, f)
+    os.replace(tmp_path, writer_path)
+
+
+def append_events(events, events_dir=EVENTS_DIR, segment_max_events=SEGMENT_MAX_EVENTS):
+    """
+    Ajoute des événements à la fin du journal, sans jamais réécrire
+    les segments existants. Un nouveau segment est ouvert lorsque le
+    segment courant atteint `segment_max_events` événements. Le nombre
+    d'événements du segment courant est conservé dans WRITER_FILE, pour ne
+    pas relire le segment à chaque ajout. Les événements reçus ne sont pas
+    modifiés.
+
+    Retourne le nombre d'événements écrits.
+    """
+    os.makedirs(events_dir, exist_ok=True)
+    segments = list_segments(events_dir)
+    number = segments[-1] if segments else 1
+    path = _segment_path(events_dir, number)
+    count = _segment_count(events_dir, number, path)
+
+    written = 0
+    f = open(path, 'a', encoding='utf-8')
+    try:
+        for event in events:
+            if count >= segment_max_events:
+                f.close()
+                number += 1
+                count = 0
+                path = _segment_path(events_dir, number)
+                f = open(path, 'a', encoding='utf-8')
+            event = dict(event)
+            event.setdefault('recorded_at', datetime.now().isoformat())
+            f.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n')
+            count += 1
+            written += 1
+    finally:
+        f.close()
+    _save_writer_position(events_dir, number, count, path)
+    return written
+
+
+def iter_events(events_dir=EVENTS_DIR, position=None):
+    """
+    Parcourt les événements à partir d'une position (segment, offset).
+
+    Génère des couples (événement, position_suivante). Le parcours s'arrête
+    à la première ligne incomplète (écriture en cours ou interrompue), même
+    si des segments suivants existent: la dernière position générée la
+    précède, et la ligne sera relue au prochain passage.
+    """
+    start_segment, start_offset = position or (0, 0)
+    for number in list_segments(events_dir):
+        if number < start_segment:
+            continue
+        offset = start_offset if number == start_segment else 0
+        with open(_segment_path(events_dir, number), 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    return
+                offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError as e:
+                    print(f"Événement illisible ignoré (segment {number}): {e}")
+                    continue
+                yield event, (number, offset)
+
+
+def empty_state():
+    """
+    Retourne l'état agrégé initial, avant tout événement.
+    """
+    return {
+        "campaign_title": "PattesThai - Refuge pour animaux en Thaïlande",
+        "goal_amount": 0,
+        "current_amount": 0,
+        "donor_count": 0,
+        "donation_count": 0,
+        "last_updated": None,
+        "status": "En attente de lancement",
+        "sources": {}
+    }
+
+
+def event_source(event):
+    """
+    Source d'un événement, nommée comme dans les données de financement:
+    `plateforme:campagne` (voir multi_fetch.source_name) si l'événement
+    précise sa campagne (`campaign_id`), sinon la plateforme seule.
+    """
+    source = event.get('source') or DEFAULT_SOURCE
+    if event.get('campaign_id') and ':' not in source:
+        return f"{source}:{event['campaign_id']}"
+    return source
+
+
+def apply_event(state, event):
+    """
+    Applique un événement à l'état agrégé.
+
+    - `campaign`: relevé complet d'une source (montant et donateurs absolus).
+    - `donation`: don individuel, ajouté aux totaux de sa source.
+    """
+    source = event_source(event)
+    totals = state['sources'].setdefault(source, {"current_amount": 0, "donor_count": 0})
+    kind = event.get('type')
+
+    if kind == EVENT_CAMPAIGN:
+        totals['current_amount'] = event.get('current_amount', 0)
+        totals['donor_count'] = event.get('donor_count', 0)
+        if event.get('goal_amount') is not None:
+            totals['goal_amount'] = event['goal_amount']
+        for key in ('campaign_title', 'status'):
+            if event.get(key) is not None:
+                state[key] = event[key]
+    elif kind == EVENT_DONATION:
+        totals['current_amount'] += event.get('amount', 0)
+        totals['donor_count'] += 1 if event.get('new_donor', True) else 0
+        state['donation_count'] += 1
+    else:
+        return state
+
+    state['goal_amount'] = sum(s.get('goal_amount', 0) for s in state['sources'].values())
+    state['current_amount'] = sum(s['current_amount'] for s in state['sources'].values())
+    state['donor_count'] = sum(s['donor_count'] for s in state['sources'].values())
+    state['last_updated'] = event.get('timestamp') or event.get('recorded_at') or state['last_updated']
+    return state
+
+
+def load_checkpoint(events_dir=EVENTS_DIR):
+    """
+    Charge le dernier point de contrôle, ou un état vide s'il n'existe pas.
+    """
+    path = os.path.join(events_dir, CHECKPOINT_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            checkpoint['position'] = tuple(checkpoint['position'])
+            return checkpoint
+        except Exception as e:
+            print(f"Point de contrôle illisible, reconstruction complète: {e}")
+    return {"state": empty_state(), "position": (0, 0), "events_applied": 0}
+
+
+def save_checkpoint(checkpoint, events_dir=EVENTS_DIR):
+    """
+    Enregistre le point de contrôle de manière atomique.
+    """
+    os.makedirs(events_dir, exist_ok=True)
+    path = os.path.join(events_dir, CHECKPOINT_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def refresh_state(events_dir=EVENTS_DIR):
+    """
+    Met à jour l'état agrégé à partir du dernier point de contrôle en ne lisant
+    que les nouveaux événements, puis enregistre un nouveau point de contrôle.
+
+    Retourne l'état agrégé courant.
+    """
+    checkpoint = load_checkpoint(events_dir)
+    state = checkpoint['state']
+    position = checkpoint['position']
+    applied = 0
+
+    for event, position in iter_events(events_dir, position):
+        apply_event(state, event)
+        applied += 1
+
+    if applied:
+        checkpoint['state'] = state
+        checkpoint['position'] = position
+        checkpoint['events_applied'] += applied
+        save_checkpoint(checkpoint, events_dir)
+    return state
+
+
+def has_events(events_dir=EVENTS_DIR):
+    """
+    Indique si le journal contient au moins un segment.
+    """
+    return bool(list_segments(events_dir))
+
+
+def has_donations(events_dir=EVENTS_DIR):
+    """
+    Indique si le journal contient au moins un don individuel: les relevés de
+    campagne seuls ne suffisent pas. Le compteur `donation_count` de l'état
+    agrégé est mis à jour depuis le dernier point de contrôle (voir
+    refresh_state), sans relire le journal entier.
+    """
+    return has_events(events_dir) and refresh_state(events_dir)['donation_count'] > 0
+
+
+def record_campaign_snapshot(data, source=DEFAULT_SOURCE, events_dir=EVENTS_DIR):
+    """
+    Ajoute au journal un relevé de campagne issu d'une plateforme.
+    """
+    event = {
+        "type": EVENT_CAMPAIGN,
+        "source": source,
+        "campaign_title": data.get('campaign_title'),
+        "goal_amount": data.get('goal_amount', 0),
+        "current_amount": data.get('current_amount', 0),
+        "donor_count": data.get('donor_count', 0),
+        "status": data.get('status'),
+        "timestamp": data.get('last_updated') or datetime.now().isoformat()
+    }
+    return append_events([event], events_dir)
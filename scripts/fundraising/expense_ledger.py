@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Registre des dépenses et comparaison avec la répartition annoncée des fonds.
+
+Les dépenses (justificatifs) sont déposées dans data/expenses/ sous forme de
+fichiers CSV ou NDJSON, complétés par ajout en fin de fichier:
+
+    date,amount,category,description,site
+    2025-02-03,"120,50",soins vétérinaires,Stérilisation de deux chats,rayong
+
+Les fichiers sont lus en flux, ligne par ligne. Seuls les totaux courants
+(montant et nombre de dépenses par catégorie, par site et au total) sont
+conservés. Un point de contrôle enregistre ces totaux et la position de
+lecture dans chaque fichier: une mise à jour ne lit que les lignes ajoutées
+depuis, quelle que soit la taille du registre. La répartition réelle est
+ensuite comparée à la répartition prévue (ALLOCATION) à partir de ces seuls
+totaux.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import io
+import os
+import csv
+import json
+import hashlib
+import unicodedata
+
+# Configuration
+LEDGER_DIR = 'data/expenses'
+CHECKPOINT_FILE = 'checkpoint.json'
+LEDGER_EXTENSIONS = ('.csv', '.ndjson', '.jsonl')
+# Taille de l'en-tête d'un fichier utilisée pour détecter sa réécriture
+HEAD_BYTES = 1024
+
+# Répartition annoncée des fonds: catégorie -> (libellé, part prévue)
+ALLOCATION = {
+    "veterinary": ("Soins vétérinaires", 0.40),
+    "food": ("Nourriture et fournitures", 0.30),
+    "logistics": ("Logistique et transport", 0.20),
+    "admin": ("Administration et communication", 0.10),
+}
+OTHER_CATEGORY = 'other'
+OTHER_LABEL = "Non classé"
+
+# Noms de catégories rencontrés dans les justificatifs (sans accents, en minuscules)
+CATEGORY_ALIASES = {
+    'veterinary': 'veterinary', 'vet': 'veterinary', 'veterinaire': 'veterinary', 'soins': 'veterinary',
+    'soins veterinaires': 'veterinary', 'sante': 'veterinary', 'medicaments': 'veterinary',
+    'food': 'food', 'nourriture': 'food', 'fournitures': 'food', 'nourriture et fournitures': 'food',
+    'alimentation': 'food', 'supplies': 'food',
+    'logistics': 'logistics', 'logistique': 'logistics', 'transport': 'logistics',
+    'logistique et transport': 'logistics', 'carburant': 'logistics',
+    'admin': 'admin', 'administration': 'admin', 'communication': 'admin',
+    'administration et communication': 'admin', 'frais bancaires': 'admin',
+}
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(text.strip().lower().replace('_', ' ').replace('-', ' ').split())
+
+
+def category_key(value):
+    """
+    Catégorie de la répartition correspondant au libellé d'une dépense.
+    """
+    return CATEGORY_ALIASES.get(_normalize(value), OTHER_CATEGORY)
+
+
+def parse_amount(value):
+    """
+    Convertit un montant ('1 234,50', '1234.50 €', 12) en centimes.
+    """
+    if isinstance(value, (int, float)):
+        return int(round(value * 100))
+    text = str(value or '').replace('€', '').replace(' ', '').replace('\xa0', '').replace('\u202f', '').strip()
+    if ',' in text and '.' in text:
+        # Séparateur de milliers: celui qui apparaît en premier
+        text = text.replace('.', '').replace(',', '.') if text.index('.') < text.index(',') else text.replace(',', '')
+    else:
+        text = text.replace(',', '.')
+    return int(round(float(text) * 100))
+
+
+def empty_state():
+    """
+    Totaux initiaux, avant toute dépense (montants en centimes).
+    """
+    return {"total_cents": 0, "count": 0, "categories": {}, "sites": {},
+            "first_date": None, "last_date": None, "rejected": 0}
+
+
+def apply_expense(state, record):
+    """
+    Ajoute une dépense aux totaux. Une ligne sans montant valide est comptée
+    comme rejetée.
+    """
+    try:
+        cents = parse_amount(record.get('amount', record.get('montant')))
+    except (TypeError, ValueError):
+        state['rejected'] += 1
+        return state
+    category = category_key(record.get('category', record.get('categorie')))
+    site = record.get('site') or None
+    date = str(record.get('date') or '')[:10] or None
+
+    state['total_cents'] += cents
+    state['count'] += 1
+    totals = state['categories'].setdefault(category, {"cents": 0, "count": 0})
+    totals['cents'] += cents
+    totals['count'] += 1
+    if site:
+        site_totals = state['sites'].setdefault(site, {"cents": 0, "count": 0})
+        site_totals['cents'] += cents
+        site_totals['count'] += 1
+    if date:
+        state['first_date'] = min(state['first_date'] or date, date)
+        state['last_date'] = max(state['last_date'] or date, date)
+    return state
+
+
+def list_ledger_files(ledger_dir=None):
+    """
+    Fichiers du registre, par ordre alphabétique.
+    """
+    ledger_dir = ledger_dir or LEDGER_DIR
+    if not os.path.isdir(ledger_dir):
+        return []
+    return sorted(name for name in os.listdir(ledger_dir) if name.lower().endswith(LEDGER_EXTENSIONS))
+
+
+def _head_digest(path, offset):
+    # Empreinte du début déjà lu du fichier, inchangée par les ajouts
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read(min(offset, HEAD_BYTES))).hexdigest()
+
+
+def iter_records(path, offset=0, header=None):
+    """
+    Parcourt les dépenses d'un fichier à partir d'une position en octets.
+
+    Génère des triplets (dépense, position_suivante, en-tête CSV); la ligne
+    d'en-tête d'un CSV produit une dépense None. Un champ CSV entre
+    guillemets peut contenir des retours à la ligne (description d'un
+    justificatif): l'enregistrement s'étend alors sur plusieurs lignes. Un
+    enregistrement incomplet en fin de fichier (écriture en cours) est
+    ignoré et sera relu au prochain passage.
+    """
+    is_csv = path.lower().endswith('.csv')
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        record = b''
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            record += line
+            # Nombre impair de guillemets: un champ entre guillemets continue
+            # sur la ligne suivante (un guillemet échappé est doublé)
+            if is_csv and record.count(b'"') % 2:
+                continue
+            start, offset = offset, offset + len(record)
+            text = record.decode('utf-8-sig' if start == 0 else 'utf-8').strip()
+            record = b''
+            if not text:
+                continue
+            if is_csv:
+                values = next(csv.reader(io.StringIO(text, newline='')))
+                if header is None:
+                    header = [value.strip().lower() for value in values]
+                    yield None, offset, header
+                    continue
+                yield dict(zip(header, values)), offset, header
+            else:
+                try:
+                    yield json.loads(text), offset, header
+                except ValueError as e:
+                    print(f"Dépense illisible ignorée ({os.path.basename(path)}): {e}")
+
+
+def load_checkpoint(ledger_dir=None):
+    """
+    Charge le dernier point de contrôle, ou des totaux vides s'il n'existe pas.
+    """
+    path = os.path.join(ledger_dir or LEDGER_DIR, CHECKPOINT_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Point de contrôle du registre illisible, relecture complète: {e}")
+    return {"state": empty_state(), "files": {}}
+
+
+def save_checkpoint(checkpoint, ledger_dir=None):
+    """
+    Enregistre le point de contrôle de manière atomique.
+    """
+    path = os.path.join(ledger_dir or LEDGER_DIR, CHECKPOINT_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def refresh_ledger(ledger_dir=None, save=True):
+    """
+    Met à jour les totaux en ne lisant que les dépenses ajoutées depuis le
+    dernier point de contrôle, puis enregistre un nouveau point de contrôle
+    (sauf si `save` est faux, voir read_ledger). Un fichier réécrit ou
+    supprimé entraîne une relecture complète.
+
+    Retourne les totaux courants.
+    """
+    ledger_dir = ledger_dir or LEDGER_DIR
+    files = list_ledger_files(ledger_dir)
+    checkpoint = load_checkpoint(ledger_dir)
+    positions = checkpoint['files']
+
+    # Les fichiers du registre ne sont complétés que par ajout: un fichier
+    # raccourci, réécrit ou disparu invalide les totaux accumulés.
+    for name, known in positions.items():
+        path = os.path.join(ledger_dir, name)
+        if (name not in files or os.path.getsize(path) < known['offset']
+                or _head_digest(path, known['offset']) != known['head']):
+            print(f"Fichier de dépenses modifié ({name}), relecture complète du registre")
+            checkpoint = {"state": empty_state(), "files": {}}
+            positions = checkpoint['files']
+            changed = True
+            break
+    else:
+        changed = False
+
+    state = checkpoint['state']
+    for name in files:
+        path = os.path.join(ledger_dir, name)
+        known = positions.get(name, {"offset": 0, "header": None})
+        if os.path.getsize(path) == known['offset']:
+            continue
+        offset, header = known['offset'], known.get('header')
+        for record, offset, header in iter_records(path, offset, header):
+            if record is not None:
+                apply_expense(state, record)
+        if offset != known['offset'] or header != known.get('header'):
+            positions[name] = {"offset": offset, "header": header, "head": _head_digest(path, offset)}
+            changed = True
+
+    if changed and save:
+        save_checkpoint(checkpoint, ledger_dir)
+    return state
+
+
+def read_ledger(ledger_dir=None):
+    """
+    Retourne les totaux courants sans écrire de point de contrôle, pour les
+    lecteurs qui ne doivent rien modifier (construction de la documentation).
+    """
+    return refresh_ledger(ledger_dir, save=False)
+
+
+def reconcile(state, allocation=ALLOCATION):
+    """
+    Compare la répartition réelle des dépenses à la répartition prévue.
+
+    Retourne une ligne par catégorie (celles de la répartition, puis les
+    dépenses non classées): libellé, parts prévue et réelle, montants réel et
+    prévu au prorata du total dépensé, et écart en euros.
+    """
+    total = state['total_cents']
+    rows = []
+    categories = list(allocation) + ([OTHER_CATEGORY] if OTHER_CATEGORY in state['categories'] else [])
+    for category in categories:
+        label, planned_share = allocation.get(category, (OTHER_LABEL, 0.0))
+        spent = state['categories'].get(category, {}).get('cents', 0)
+        planned = total * planned_share
+        rows.append({
+            "category": category,
+            "label": label,
+            "planned_share": planned_share,
+            "actual_share": spent / total if total else 0.0,
+            "spent": spent / 100,
+            "planned": planned / 100,
+            "delta": (spent - planned) / 100,
+            "count": state['categories'].get(category, {}).get('count', 0)
+        })
+    return rows
+
+
+def format_allocation(state=None, allocation=ALLOCATION):
+    """
+    Section Markdown de l'utilisation des fonds: répartition prévue, et
+    répartition réelle dès que des dépenses sont enregistrées.
+    """
+    if not state or not state['count']:
+        lines = [f"- {label}: {share * 100:.0f}%" for label, share in allocation.values()]
+        return "Les fonds collectés seront utilisés selon la répartition suivante:\n\n" + "\n".join(lines)
+
+    lines = [
+        f"{state['count']} dépenses enregistrées pour {state['total_cents'] / 100:.2f} € "
+        f"(du {state['first_date']} au {state['last_date']}).",
+        "",
+        "| Poste | Prévu | Réel | Dépensé | Écart au prévu |",
+        "|---|---|---|---|---|"
+    ]
+    for row in reconcile(state, allocation):
+        lines.append(f"| {row['label']} | {row['planned_share'] * 100:.0f}% | {row['actual_share'] * 100:.1f}% "
+                     f"| {row['spent']:.2f} € | {row['delta']:+.2f} € |")
+    if state['rejected']:
+        lines.append("")
+        lines.append(f"*{state['rejected']} ligne(s) sans montant valide ignorée(s).*")
+    return "\n".join(lines)
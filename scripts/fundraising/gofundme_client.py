@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Client HTTP pour l'API de campagne GoFundMe.
+
+Le client repose sur une `requests.Session` partagée (connexions persistantes
+et réutilisées), avec délais d'attente, nouvelles tentatives avec backoff
+exponentiel et requêtes conditionnelles (ETag / If-Modified-Since): une
+campagne inchangée coûte une réponse 304 et aucune nouvelle analyse du JSON.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import copy
+import json
+import tempfile
+import threading
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scripts import tracing
+
+# Configuration
+GOFUNDME_API_URL = os.environ.get('GOFUNDME_API_URL', 'https://api.gofundme.com/v1')
+CACHE_FILE = 'data/http_cache/gofundme.json'
+# Délais d'attente (connexion, lecture) en secondes
+TIMEOUT = (3.05, 10)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+POOL_SIZE = 10
+
+
+def create_session(max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, pool_size=POOL_SIZE):
+    """
+    Crée une session HTTP avec un pool de connexions persistantes et une
+    politique de nouvelles tentatives avec backoff exponentiel.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        "Accept": "application/json",
+        "User-Agent": "PattesThai/0.1 (+https://github.com/Casius999/PattesThai)"
+    })
+    return session
+
+
+def normalize_campaign(payload):
+    """
+    Convertit la réponse de l'API au format interne des données de financement.
+    Une réponse déjà au format interne est retournée sous forme de copie: elle
+    peut provenir du cache du client, que les appelants ne doivent pas modifier.
+    """
+    if 'current_amount' in payload and 'goal_amount' in payload:
+        return copy.deepcopy(payload)
+    campaign = payload.get('campaign', payload)
+    return {
+        "campaign_title": campaign.get('title', ''),
+        "goal_amount": campaign.get('goal', campaign.get('goal_amount', 0)),
+        "current_amount": campaign.get('raised', campaign.get('current_amount', 0)),
+        "donor_count": campaign.get('donations_count', campaign.get('donor_count', 0)),
+        "last_updated": datetime.now().isoformat(),
+        "status": campaign.get('status', 'Active')
+    }
+
+
+class GoFundMeClient:
+    """
+    Client de l'API GoFundMe avec cache de requêtes conditionnelles.
+
+    Le cache conserve, pour chaque URL, l'ETag, la date Last-Modified et les
+    données déjà analysées; il est persisté dans `cache_file` pour profiter
+    des réponses 304 d'une exécution à l'autre. Un même client peut être
+    utilisé depuis plusieurs fils (voir multi_fetch): les accès au cache et
+    son enregistrement sont protégés par un verrou.
+    """
+
+    def __init__(self, api_key, base_url=GOFUNDME_API_URL, session=None, timeout=TIMEOUT,
+                 cache_file=CACHE_FILE):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.session = session or create_session()
+        self.timeout = timeout
+        self.cache_file = cache_file
+        self.cache = self._load_cache()
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "not_modified": 0}
+
+    def _load_cache(self):
+        if self.cache_file and os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Cache HTTP illisible, ignoré: {e}")
+        return {}
+
+    def _save_cache(self):
+        # Appelée sous self._lock; fichier temporaire propre à chaque écriture
+        if not self.cache_file:
+            return
+        directory = os.path.dirname(self.cache_file) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.cache_file), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get_json(self, path):
+        """
+        Effectue une requête GET conditionnelle et retourne le JSON de la réponse,
+        ou les données en cache si le serveur répond 304 Not Modified.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        with self._lock:
+            cached = self.cache.get(url)
+            self.stats['requests'] += 1
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        tracing.count('api.requests')
+        with tracing.span('http.get', 'api', url=url) as span:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            span.set(status=response.status_code)
+        if cached and response.status_code == 304:
+            with self._lock:
+                self.stats['not_modified'] += 1
+            tracing.count('api.not_modified')
+            return cached['data']
+
+        response.raise_for_status()
+        data = response.json()
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._lock:
+                self.cache[url] = {"etag": etag, "last_modified": last_modified, "data": data}
+                self._save_cache()
+        return data
+
+    def get_campaign(self, campaign_id):
+        """
+        Récupère les données d'une campagne au format interne.
+        """
+        return normalize_campaign(self.get_json(f"campaigns/{campaign_id}"))
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Serveur HTTP local imitant l'API de campagne GoFundMe.
+
+Permet de tester et de mesurer le client sans accès réseau. Le serveur gère
+les connexions persistantes (HTTP/1.1), les en-têtes ETag / Last-Modified,
+les requêtes conditionnelles (réponse 304) et peut simuler des erreurs
+temporaires pour vérifier les nouvelles tentatives.
+
+Utilisation:
+    python scripts/fundraising/gofundme_stub.py --port 8765
+    GOFUNDME_API_URL=http://127.0.0.1:8765 GOFUNDME_API_KEY=stub GOFUNDME_CAMPAIGN_ID=pattesthai \\
+        python scripts/fundraising/update_fundraising_data.py
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+Ce serveur sert exclusivement aux tests et aux mesures de performance locales.
+"""
+
+import json
+import hashlib
+import argparse
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CAMPAIGN = {
+    "campaign_title": "PattesThai - Refuge pour animaux en Thaïlande",
+    "goal_amount": 10000,
+    "current_amount": 0,
+    "donor_count": 0,
+    "status": "En préparation"
+}
+
+
+class StubState:
+    """
+    État partagé du serveur: campagnes servies, compteurs et erreurs à injecter.
+    """
+
+    def __init__(self, campaigns=None, failures=0, latency=0.0):
+        self.lock = threading.Lock()
+        self.campaigns = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.failures = failures
+        self.latency = latency
+        self.connections = set()
+        for campaign_id, data in (campaigns or {"pattesthai": DEFAULT_CAMPAIGN}).items():
+            self.set_campaign(campaign_id, data)
+
+    def set_campaign(self, campaign_id, data):
+        """
+        Publie (ou met à jour) une campagne; son ETag et sa date changent avec son contenu.
+        """
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        with self.lock:
+            self.campaigns[campaign_id] = {
+                "body": body,
+                "etag": '"' + hashlib.sha1(body).hexdigest() + '"',
+                "last_modified": formatdate(usegmt=True)
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Pas de journalisation de chaque requête
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.server.state
+        with state.lock:
+            state.requests += 1
+            state.connections.add(self.client_address)
+            fail = state.failures > 0
+            if fail:
+                state.failures -= 1
+        if state.latency:
+            threading.Event().wait(state.latency)
+        if fail:
+            self._send(503, b'{"error": "unavailable"}', {"Content-Type": "application/json"})
+            return
+
+        parts = self.path.strip('/').split('/')
+        campaign = None
+        if len(parts) >= 2 and parts[-2] == 'campaigns':
+            campaign = state.campaigns.get(parts[-1])
+        if campaign is None:
+            self._send(404, b'{"error": "not found"}', {"Content-Type": "application/json"})
+            return
+
+        headers = {"ETag": campaign['etag'], "Last-Modified": campaign['last_modified']}
+        if self._not_modified(campaign):
+            with state.lock:
+                state.not_modified += 1
+            self._send(304, headers=headers)
+            return
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+        self._send(200, campaign['body'], headers)
+
+    def _not_modified(self, campaign):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return campaign['etag'] in [tag.strip() for tag in if_none_match.split(',')]
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(campaign['last_modified']) <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+def start_stub_server(host='127.0.0.1', port=0, **state_options):
+    """
+    Démarre le serveur dans un thread et le retourne. L'URL de base est
+    disponible via `server.base_url`; arrêter avec `server.shutdown()`.
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(**state_options)
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur local imitant l'API GoFundMe.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--failures', type=int, default=0,
+                        help="Nombre de réponses 503 à renvoyer avant de répondre normalement")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.state = StubState(failures=args.failures)
+    print(f"Serveur GoFundMe local sur http://{args.host}:{args.port}/campaigns/pattesthai")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
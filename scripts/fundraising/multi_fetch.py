@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Récupération concurrente de plusieurs campagnes sur plusieurs plateformes.
+
+Les campagnes (GoFundMe, Leetchi, une par ville...) sont interrogées en même
+temps avec asyncio, dans la limite d'un nombre de requêtes simultanées par
+hôte. Les résultats sont fusionnés en un agrégat au format des données de
+financement, utilisable directement par `update_documentation`, avec la
+latence mesurée pour chaque source.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import json
+import time
+import asyncio
+from datetime import datetime
+from urllib.parse import urlparse
+
+# Configuration
+CAMPAIGNS_FILE = 'data/campaigns.json'
+HOST_CONCURRENCY = 4
+
+# Plateformes prises en charge: variables d'environnement de l'URL et de la clé d'API
+PLATFORMS = {
+    'gofundme': {
+        "url_env": 'GOFUNDME_API_URL',
+        "key_env": 'GOFUNDME_API_KEY',
+        "default_url": 'https://api.gofundme.com/v1'
+    },
+    'leetchi': {
+        "url_env": 'LEETCHI_API_URL',
+        "key_env": 'LEETCHI_API_KEY',
+        "default_url": 'https://api.leetchi.com/v1'
+    }
+}
+
+
+def load_campaigns(campaigns_file=CAMPAIGNS_FILE):
+    """
+    Charge la liste des campagnes à suivre, par exemple:
+
+        [{"platform": "gofundme", "campaign_id": "pattesthai-khon-kaen", "site": "khon-kaen"},
+         {"platform": "leetchi", "campaign_id": "pattesthai-rayong", "site": "rayong"}]
+
+    Retourne une liste vide si le fichier n'existe pas.
+    """
+    if not os.path.exists(campaigns_file):
+        return []
+    with open(campaigns_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def source_name(campaign):
+    """
+    Identifiant stable d'une source: plateforme et identifiant de campagne.
+    """
+    return f"{campaign['platform']}:{campaign['campaign_id']}"
+
+
+def source_available(entry):
+    """
+    Indique si une source fournit des montants: interrogée avec succès, ou en
+    erreur mais complétée par ses derniers montants connus (`stale`).
+    """
+    return 'error' not in entry or bool(entry.get('stale'))
+
+
+def create_clients(campaigns, pool_size=HOST_CONCURRENCY):
+    """
+    Crée un client par plateforme utilisée, configuré depuis l'environnement.
+    """
+    from scripts.fundraising.gofundme_client import GoFundMeClient, create_session
+
+    clients = {}
+    for platform in {c['platform'] for c in campaigns}:
+        if platform not in PLATFORMS:
+            raise ValueError(f"Plateforme inconnue: {platform}")
+        config = PLATFORMS[platform]
+        api_key = os.environ.get(config['key_env'])
+        if not api_key:
+            raise ValueError(f"Clé API manquante pour {platform} ({config['key_env']})")
+        base_url = os.environ.get(config['url_env'], config['default_url'])
+        # Le client REST est commun aux plateformes; seul son cache diffère
+        clients[platform] = GoFundMeClient(api_key, base_url=base_url,
+                                           session=create_session(pool_size=pool_size),
+                                           cache_file=f"data/http_cache/{platform}.json")
+    return clients
+
+
+async def _fetch_one(campaign, client, semaphore):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            data = await asyncio.to_thread(client.get_campaign, campaign['campaign_id'])
+            error = None
+        except Exception as e:
+            data, error = None, str(e)
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+    return campaign, data, latency_ms, error
+
+
+async def fetch_campaigns_async(campaigns, clients, host_concurrency=HOST_CONCURRENCY):
+    """
+    Interroge toutes les campagnes en parallèle, avec au plus
+    `host_concurrency` requêtes simultanées par hôte.
+
+    Retourne une liste de tuples (campagne, données, latence_ms, erreur).
+    """
+    semaphores = {}
+    tasks = []
+    for campaign in campaigns:
+        client = clients[campaign['platform']]
+        host = urlparse(client.base_url).netloc
+        semaphore = semaphores.setdefault(host, asyncio.Semaphore(host_concurrency))
+        tasks.append(_fetch_one(campaign, client, semaphore))
+    return await asyncio.gather(*tasks)
+
+
+def merge_results(results, previous=None):
+    """
+    Fusionne les résultats par source en un agrégat au format des données
+    de financement. Les sources en erreur sont conservées avec leur message;
+    leurs derniers montants connus (`previous`, données publiées
+    précédemment) entrent dans les totaux, pour qu'une panne passagère d'une
+    plateforme ne se traduise pas par une baisse de la collecte.
+    """
+    previous_sources = (previous or {}).get('sources') or {}
+    aggregate = {
+        "campaign_title": "PattesThai - Refuge pour animaux en Thaïlande",
+        "goal_amount": 0,
+        "current_amount": 0,
+        "donor_count": 0,
+        "last_updated": datetime.now().isoformat(),
+        "status": "En attente de lancement",
+        "sources": {}
+    }
+    statuses = []
+    for campaign, data, latency_ms, error in results:
+        entry = {
+            "platform": campaign['platform'],
+            "campaign_id": campaign['campaign_id'],
+            "site": campaign.get('site'),
+            "latency_ms": latency_ms
+        }
+        if error is not None:
+            entry['error'] = error
+            last = previous_sources.get(source_name(campaign)) or {}
+            if 'current_amount' in last:
+                # Derniers montants connus, signalés comme non actualisés
+                data = last
+                entry['stale'] = True
+        if data is not None:
+            for key in ('campaign_title', 'goal_amount', 'current_amount', 'donor_count', 'status'):
+                entry[key] = data.get(key)
+            aggregate['goal_amount'] += data.get('goal_amount', 0)
+            aggregate['current_amount'] += data.get('current_amount', 0)
+            aggregate['donor_count'] += data.get('donor_count', 0)
+            statuses.append(data.get('status'))
+        aggregate['sources'][source_name(campaign)] = entry
+
+    if statuses:
+        # Une seule campagne active suffit pour que la collecte soit active
+        aggregate['status'] = 'Active' if 'Active' in statuses else statuses[0]
+    return aggregate
+
+
+def fetch_all_campaigns(campaigns, clients=None, host_concurrency=HOST_CONCURRENCY, previous=None):
+    """
+    Récupère toutes les campagnes en parallèle et retourne l'agrégat fusionné
+    (voir merge_results pour `previous`). Lève une erreur si aucune source
+    n'a pu être interrogée.
+    """
+    clients = clients or create_clients(campaigns, pool_size=host_concurrency)
+    results = asyncio.run(fetch_campaigns_async(campaigns, clients, host_concurrency))
+    for campaign, _, latency_ms, error in results:
+        state = f"erreur: {error}" if error else "ok"
+        print(f"  {source_name(campaign)}: {latency_ms} ms ({state})")
+    if results and all(error is not None for _, _, _, error in results):
+        raise RuntimeError("Aucune campagne n'a pu être récupérée")
+    return merge_results(results, previous)
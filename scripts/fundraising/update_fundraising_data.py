@@ -10,45 +10,195 @@ Note: Ce projet est 100% réel. Toute simulation ou action fictive est stricteme
 import os
 import json
 import sys
+import time
+import argparse
 from datetime import datetime
 
+# Ajout de la racine du dépôt au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts import tracing
+from scripts.analytics import images
+from scripts.fundraising import badges
+from scripts.fundraising import donation_store
+from scripts.fundraising import donor_sketch
+from scripts.fundraising import expense_ledger
+from scripts.fundraising import funding_history
+from scripts.fundraising import multi_fetch
+
 # Configuration
 OUTPUT_DIR = 'docs/campaign/data'
+# Mode surveillance: intervalle court pendant les vagues de dons, allongé au repos
+WATCH_MIN_INTERVAL = 30
+WATCH_MAX_INTERVAL = 30 * 60
+WATCH_BACKOFF = 2.0
+# Champs qui changent à chaque relevé sans modifier l'état du financement
+VOLATILE_FIELDS = {'last_updated', 'latency_ms'}
 
-def get_fundraising_data():
+# Client partagé: la session HTTP et ses connexions sont réutilisées entre les appels
+_client = None
+
+def get_gofundme_client(api_key):
+    """
+    Retourne le client GoFundMe partagé, créé au premier appel.
+    """
+    global _client
+    # Import différé: requests n'est nécessaire que lorsque l'API est configurée
+    from scripts.fundraising.gofundme_client import GoFundMeClient
+
+    base_url = os.environ.get('GOFUNDME_API_URL', 'https://api.gofundme.com/v1')
+    if _client is None or _client.api_key != api_key or _client.base_url != base_url.rstrip('/'):
+        _client = GoFundMeClient(api_key, base_url=base_url)
+    return _client
+
+def fetch_gofundme_data():
+    """
+    Récupère les données de la campagne GoFundMe via l'API.
+
+    Sans clé API (GOFUNDME_API_KEY) ou identifiant de campagne
+    (GOFUNDME_CAMPAIGN_ID), retourne l'état d'une campagne non lancée.
     """
-    Récupère les données de financement de la campagne GoFundMe.
+    api_key = os.environ.get('GOFUNDME_API_KEY')
+    campaign_id = os.environ.get('GOFUNDME_CAMPAIGN_ID')
+    
+    if not api_key or api_key == 'placeholder' or not campaign_id:
+        print("Clé API GoFundMe non configurée. Campagne considérée comme non lancée.")
+        return {
+            "campaign_title": "PattesThai - Refuge pour animaux en Thaïlande",
+            "goal_amount": 10000,
+            "current_amount": 0,
+            "donor_count": 0,
+            "last_updated": datetime.now().isoformat(),
+            "status": "En attente de lancement"
+        }
     
-    Dans cette version initiale, utilise des données de démonstration.
-    À remplacer par l'intégration API réelle une fois la campagne lancée.
+    return get_gofundme_client(api_key).get_campaign(campaign_id)
+
+def get_fundraising_data():
+    """
+    Récupère les données de financement: toutes les campagnes déclarées dans
+    data/campaigns.json en parallèle, ou à défaut la campagne GoFundMe unique.
     """
     print("Récupération des données de financement...")
-    
-    # Données de démonstration
-    return {
-        "campaign_title": "PattesThai - Refuge pour animaux en Thaïlande",
-        "goal_amount": 10000,
-        "current_amount": 0,
-        "donor_count": 0,
-        "last_updated": datetime.now().isoformat(),
-        "status": "En préparation"
-    }
+    campaigns = multi_fetch.load_campaigns()
+    if campaigns:
+        return multi_fetch.fetch_all_campaigns(campaigns, previous=load_previous_data())
+    return fetch_gofundme_data()
 
-def update_documentation(data):
+def record_funding_data(data):
     """
-    Met à jour la documentation avec les données de financement.
+    Ajoute au journal de dons un relevé par source de financement.
     """
-    print("Mise à jour de la documentation...")
+    sources = data.get('sources')
+    if not sources:
+        donation_store.record_campaign_snapshot(data)
+    else:
+        for name, entry in sources.items():
+            if 'error' in entry:
+                continue
+            snapshot = dict(entry, campaign_title=data['campaign_title'], last_updated=data['last_updated'])
+            donation_store.record_campaign_snapshot(snapshot, source=name)
+
+def attach_unique_donors(data):
+    """
+    Complète les données avec le nombre de donateurs distincts, à partir des
+    esquisses enregistrées à côté de funding_data.json (sans effet tant
+    qu'aucun don individuel n'est importé, voir donor_sketch).
+    """
+    sketches = donor_sketch.update_sketches(os.path.join(OUTPUT_DIR, donor_sketch.SKETCHES_FILE))
+    return donor_sketch.attach_unique_donors(data, donor_sketch.summarize(sketches))
+
+def meaningful_fields(data):
+    """
+    Retourne les données sans les champs volatils (horodatages, latences),
+    y compris dans le détail par source.
+    """
+    if isinstance(data, dict):
+        return {key: meaningful_fields(value) for key, value in data.items() if key not in VOLATILE_FIELDS}
+    return data
+
+def load_previous_data():
+    """
+    Charge les dernières données publiées, ou None.
+    """
+    path = os.path.join(OUTPUT_DIR, 'funding_data.json')
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Données publiées illisibles, elles seront réécrites: {e}")
+        return None
+
+def has_changed(data, previous):
+    """
+    Indique si les données diffèrent des précédentes sur un champ significatif.
+    """
+    return previous is None or meaningful_fields(data) != meaningful_fields(previous)
+
+def _write_atomic(path, content):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def _format_sources(data):
+    """
+    Retourne le détail par source (plateforme, ville) au format Markdown,
+    ou une chaîne vide pour une campagne unique.
+    """
+    sources = data.get('sources')
+    if not sources:
+        return ''
+    lines = ["", "### Détail par source", "",
+             "| Source | Site | Montant | Progression | Donateurs | Donateurs uniques | Statut |",
+             "|---|---|---|---|---|---|---|"]
+    for name, entry in sorted(sources.items()):
+        if not multi_fetch.source_available(entry):
+            lines.append(f"| {name} | {entry.get('site') or '-'} | - | - | - | - | Indisponible |")
+        else:
+            percent = badges.progress_percent(entry['current_amount'], entry.get('goal_amount'))
+            status = f"{entry['status']} (non actualisé)" if entry.get('stale') else entry['status']
+            badge = f"![{percent}%]({badges.badge_link(badges.KIND_BADGE, percent, OUTPUT_DIR)})"
+            lines.append(f"| {name} | {entry.get('site') or '-'} | {entry['current_amount']} € | {badge} "
+                         f"| {entry['donor_count']} | {entry.get('unique_donor_count', '-')} | {status} |")
+    return "\n".join(lines) + "\n"
+
+def _format_unique_donors(data):
+    """
+    Ligne Markdown du nombre de donateurs distincts, si connu.
+    """
+    if 'unique_donor_count' not in data:
+        return ''
+    return f"- **Donateurs uniques (toutes plateformes)**: {donor_sketch.format_unique_donors(data)}\n"
+
+def render_funding_status(data, update_ledger=True):
+    """
+    Retourne la page Markdown de l'état du financement. Si `update_ledger`
+    est faux, le registre des dépenses est lu sans enregistrer de point de
+    contrôle.
+    """
+    # Barre de progression générée localement (voir badges.py)
+    percent = badges.progress_percent(data['current_amount'], data['goal_amount'])
+    progress_bar = badges.badge_link(badges.KIND_BAR, percent, OUTPUT_DIR)
     
-    # S'assurer que le répertoire existe
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # Dépenses enregistrées, comparées à la répartition annoncée
+    expenses = None
+    try:
+        expenses = expense_ledger.refresh_ledger() if update_ledger else expense_ledger.read_ledger()
+    except Exception as e:
+        print(f"Erreur lors de la lecture du registre des dépenses: {e}")
     
-    # Enregistrer les données brutes au format JSON
-    with open(f"{OUTPUT_DIR}/funding_data.json", 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # Photos de la campagne, dans les variantes produites par images.py
+    photos = ''
+    photos_manifest = images.load_manifest(images.PHOTOS_OUTPUT_DIR)
+    if photos_manifest:
+        base = os.path.relpath(images.PHOTOS_OUTPUT_DIR, OUTPUT_DIR).replace(os.sep, '/')
+        photos = f"\n## Photos de la Campagne\n\n{images.gallery_markdown(photos_manifest, base)}\n"
     
-    # Créer une page Markdown pour la visualisation
-    markdown = f"""# État du Financement
+    # Page Markdown pour la visualisation
+    return f"""# État du Financement
 
 *Dernière mise à jour: {datetime.now().strftime('%d/%m/%Y %H:%M')}*
 
@@ -57,37 +207,116 @@ def update_documentation(data):
 - **Objectif**: {data['goal_amount']} €
 - **Montant actuel**: {data['current_amount']} €
 - **Nombre de donateurs**: {data['donor_count']}
-- **Statut**: {data['status']}
-
+{_format_unique_donors(data)}- **Statut**: {data['status']}
+{_format_sources(data)}
 ## Progression
 
-![Progression](https://progress-bar.dev/{int((data['current_amount'] / data['goal_amount']) * 100) if data['goal_amount'] > 0 else 0})
-
+![Progression {percent}%]({progress_bar})
+{photos}
 ## Utilisation des Fonds
 
-Les fonds collectés seront utilisés selon la répartition suivante:
-
-- Soins vétérinaires: 40%
-- Nourriture et fournitures: 30%
-- Logistique et transport: 20% 
-- Administration et communication: 10%
+{expense_ledger.format_allocation(expenses)}
 
 Des rapports détaillés sur l'utilisation des fonds seront publiés régulièrement.
 """
+
+def update_documentation(data):
+    """
+    Met à jour la documentation avec les données de financement.
+    """
+    print("Mise à jour de la documentation...")
     
-    with open(f"{OUTPUT_DIR}/funding_status.md", 'w', encoding='utf-8') as f:
-        f.write(markdown)
+    # S'assurer que le répertoire existe
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    
+    # Enregistrer les données brutes au format JSON
+    _write_atomic(f"{OUTPUT_DIR}/funding_data.json", json.dumps(data, ensure_ascii=False, indent=2))
+    
+    markdown = render_funding_status(data)
+    _write_atomic(f"{OUTPUT_DIR}/funding_status.md", markdown)
+    if tracing.enabled:
+        tracing.count('bytes_written', os.path.getsize(f"{OUTPUT_DIR}/funding_status.md"))
     
     print(f"Documentation mise à jour avec succès - {datetime.now().strftime('%d/%m/%Y %H:%M')}")
 
-def main():
+# Nom attendu par les tests et les scripts existants
+update_funding_documentation = update_documentation
+
+def publish_funding_data(data):
+    """
+    Ajoute le relevé à l'historique du financement, puis enregistre et publie
+    les données uniquement si un champ significatif a changé depuis la
+    dernière publication. Retourne True si elles ont été écrites.
+    """
+    attach_unique_donors(data)
+    # Chaque nouvelle période alimente l'historique, même sans changement
+    # significatif; une période déjà à jour n'est pas réécrite.
     try:
-        data = get_fundraising_data()
+        funding_history.record_snapshot(data)
+    except Exception as e:
+        print(f"Erreur lors de l'enregistrement de l'historique du financement: {e}")
+    if not has_changed(data, load_previous_data()):
+        print("Données de financement inchangées, aucune écriture.")
+        return False
+    badges.render_funding_badges(data)
+    with tracing.span('record_funding_data', 'stage'):
+        record_funding_data(data)
+    with tracing.span('update_documentation', 'stage'):
         update_documentation(data)
+    return True
+
+def watch(min_interval=WATCH_MIN_INTERVAL, max_interval=WATCH_MAX_INTERVAL, backoff=WATCH_BACKOFF,
+          iterations=None, sleep=time.sleep):
+    """
+    Surveille le financement en continu. Après un changement, l'intervalle
+    revient au minimum (vague de dons); sans changement, il est multiplié par
+    `backoff` jusqu'au maximum. Retourne le nombre de publications.
+    """
+    interval = min_interval
+    published = 0
+    polls = 0
+    while iterations is None or polls < iterations:
+        polls += 1
+        try:
+            with tracing.span('fetch', 'stage'):
+                data = get_fundraising_data()
+            if publish_funding_data(data):
+                published += 1
+                interval = min_interval
+            else:
+                interval = min(interval * backoff, max_interval)
+        except Exception as e:
+            print(f"Erreur: {e}", file=sys.stderr)
+            interval = min(interval * backoff, max_interval)
+        if iterations is None or polls < iterations:
+            print(f"Prochaine vérification dans {interval:.0f} s")
+            sleep(interval)
+    return published
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Récupère les données de financement et met à jour la documentation.")
+    parser.add_argument('--watch', action='store_true',
+                        help="Surveille le financement en continu avec un intervalle adaptatif")
+    parser.add_argument('--min-interval', type=float, default=WATCH_MIN_INTERVAL,
+                        help="Intervalle minimal entre deux vérifications, en secondes")
+    parser.add_argument('--max-interval', type=float, default=WATCH_MAX_INTERVAL,
+                        help="Intervalle maximal entre deux vérifications, en secondes")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        try:
+            watch(args.min_interval, args.max_interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    try:
+        with tracing.span('fetch', 'stage'):
+            data = get_fundraising_data()
+        publish_funding_data(data)
         return 0
     except Exception as e:
         print(f"Erreur: {e}", file=sys.stderr)
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Point d'entrée unique des scripts d'automatisation PattesThai.
+
+Utilisation:
+    python scripts/pattesthai.py fetch [--watch]
+    python scripts/pattesthai.py reports [--force]
+    python scripts/pattesthai.py docs
+    python scripts/pattesthai.py social [--batch]
+    python scripts/pattesthai.py pipeline [--force]
+    python scripts/pattesthai.py dashboard [--port 8080]
+    python scripts/pattesthai.py animals intake|status|summary ...
+    python scripts/pattesthai.py bench [--scale small|medium|large] [--save-baseline]
+
+Chaque sous-commande n'importe son module qu'au moment de son exécution, et
+les bibliothèques lourdes (matplotlib, pandas...) ne sont chargées que sur les
+chemins de code qui en ont besoin, afin de garder un démarrage rapide.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import sys
+import argparse
+import importlib
+
+# Ajout de la racine du dépôt au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Sous-commande -> (module, description); la fonction main de chaque module
+# reçoit les arguments restants et les analyse avec son propre argparse
+COMMANDS = {
+    'fetch': ('scripts.fundraising.update_fundraising_data',
+              "Récupère les données de financement et met à jour la documentation"),
+    'reports': ('scripts.analytics.generate_reports',
+                "Génère les rapports analytiques"),
+    'docs': ('scripts.analytics.update_docs_with_reports',
+             "Synchronise les rapports vers la documentation"),
+    'social': ('scripts.social.generate_tiktok_content',
+               "Génère des idées de contenu TikTok"),
+    'pipeline': ('scripts.pipeline',
+                 "Exécute fetch, rapports et documentation en un seul processus"),
+    'dashboard': ('scripts.fundraising.dashboard',
+                  "Sert le tableau de bord du financement en temps réel"),
+    'animals': ('scripts.shelter.animal_registry',
+                "Enregistre les accueils et adoptions d'animaux"),
+    'bench': ('scripts.benchmark',
+              "Mesure les performances et les compare à la référence"),
+}
+
+
+def build_parser():
+    """
+    Construit l'analyseur de la ligne de commande.
+    """
+    parser = argparse.ArgumentParser(prog='pattesthai',
+                                     description="Scripts d'automatisation du projet PattesThai.")
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMANDE')
+    subparsers.required = True
+    for name, (_, help_text) in COMMANDS.items():
+        # Les options propres à chaque sous-commande sont analysées par son module
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def run(command, args=None):
+    """
+    Importe le module de la sous-commande et exécute sa fonction main.
+    Retourne le code de sortie.
+    """
+    module_name, _ = COMMANDS[command]
+    module = importlib.import_module(module_name)
+    result = module.main(args or [])
+    return result if isinstance(result, int) else 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    options, args = parser.parse_known_args(argv)
+    return run(options.command, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Exécution en un seul processus de la chaîne fetch -> rapports -> documentation.
+
+Les étapes forment un graphe orienté acyclique: chaque étape reçoit en mémoire
+les résultats des étapes dont elle dépend, et les étapes indépendantes (rapport
+des réseaux sociaux, graphique de financement...) s'exécutent en parallèle.
+Le résultat et l'empreinte des entrées de chaque étape réussie sont conservés,
+de sorte qu'une nouvelle exécution reprend à la première étape périmée.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import sys
+import json
+import argparse
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Ajout de la racine du dépôt au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts import tracing
+
+# Configuration
+PIPELINE_STATE_FILE = 'data/pipeline_state.json'
+MAX_WORKERS = 4
+
+
+def _fingerprint(value):
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class Stage:
+    """
+    Étape de la chaîne.
+
+    - `func` reçoit un dictionnaire {nom_dépendance: résultat} et retourne un
+      résultat sérialisable en JSON.
+    - `always_run` force l'exécution à chaque passage (source de données externe).
+    - `fingerprint` extrait du résultat les champs qui déterminent si les étapes
+      suivantes sont périmées (par défaut, le résultat complet).
+    - `version` est à incrémenter lorsque le comportement de l'étape change.
+    """
+
+    def __init__(self, name, func, deps=(), always_run=False, fingerprint=None, version=1):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.always_run = always_run
+        self.fingerprint = fingerprint or (lambda result: result)
+        self.version = version
+
+
+class Pipeline:
+    """
+    Ordonnanceur des étapes avec cache par étape.
+    """
+
+    def __init__(self, state_file=PIPELINE_STATE_FILE, max_workers=MAX_WORKERS):
+        self.stages = {}
+        self.state_file = state_file
+        self.max_workers = max_workers
+
+    def add(self, name, func, deps=(), **options):
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Dépendance inconnue pour l'étape {name}: {dep}")
+        self.stages[name] = Stage(name, func, deps, **options)
+        return self
+
+    def _load_state(self):
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"État de la chaîne illisible, exécution complète: {e}")
+        return {}
+
+    def _save_state(self, state):
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, self.state_file)
+
+    def run(self, force=False):
+        """
+        Exécute la chaîne et retourne un dictionnaire {étape: statut}, où le
+        statut vaut 'run', 'cached', 'failed' ou 'skipped'.
+        """
+        state = self._load_state()
+        results = {}
+        fingerprints = {}
+        statuses = {}
+        pending = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Lancement de toutes les étapes dont les dépendances sont prêtes
+                for name, stage in list(pending.items()):
+                    if any(statuses.get(dep) in ('failed', 'skipped') for dep in stage.deps):
+                        statuses[name] = 'skipped'
+                        print(f"[{name}] ignorée (dépendance en échec)")
+                        del pending[name]
+                        continue
+                    if not all(dep in fingerprints for dep in stage.deps):
+                        continue
+                    del pending[name]
+
+                    key = _fingerprint({
+                        "version": stage.version,
+                        "inputs": {dep: fingerprints[dep] for dep in stage.deps}
+                    })
+                    cached = state.get(name)
+                    if not (force or stage.always_run) and cached and cached.get('key') == key:
+                        results[name] = cached.get('result')
+                        fingerprints[name] = cached.get('fingerprint')
+                        statuses[name] = 'cached'
+                        tracing.count('pipeline.cached_stages')
+                        print(f"[{name}] à jour, résultat en cache réutilisé")
+                        continue
+
+                    inputs = {dep: results[dep] for dep in stage.deps}
+                    running[executor.submit(_run_stage, stage, inputs)] = (stage, key)
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        statuses[stage.name] = 'failed'
+                        state.pop(stage.name, None)
+                        print(f"[{stage.name}] erreur: {e}", file=sys.stderr)
+                        continue
+                    results[stage.name] = result
+                    fingerprints[stage.name] = _fingerprint(stage.fingerprint(result))
+                    statuses[stage.name] = 'run'
+                    state[stage.name] = {
+                        "key": key,
+                        "fingerprint": fingerprints[stage.name],
+                        "result": result
+                    }
+                    print(f"[{stage.name}] terminée")
+                # L'état est enregistré au fil de l'eau pour permettre la reprise
+                self._save_state(state)
+
+        return statuses
+
+
+def _run_stage(stage, inputs):
+    # Chaque étape est un intervalle de la chronologie et peut être profilée
+    with tracing.span(stage.name, 'stage'), tracing.profile(stage.name):
+        return stage.func(inputs)
+
+
+def _fetch_stage(inputs):
+    from scripts.fundraising import update_fundraising_data
+
+    data = update_fundraising_data.get_fundraising_data()
+    update_fundraising_data.publish_funding_data(data)
+    return data
+
+
+def _funding_fingerprint(data):
+    from scripts.fundraising import update_fundraising_data
+
+    # Horodatages et latences ne justifient pas de régénérer les rapports
+    return update_fundraising_data.meaningful_fields(data)
+
+
+def build_pipeline(force=False, state_file=PIPELINE_STATE_FILE):
+    """
+    Construit la chaîne standard fetch -> rapports -> documentation.
+    """
+    from scripts.analytics import generate_reports, site_reports, update_docs_with_reports
+
+    def outputs(*filenames):
+        # Les entrées du manifeste changent avec le contenu des rapports,
+        # ce qui rend l'étape de documentation périmée quand il le faut.
+        manifest = generate_reports.load_manifest()
+        return {"outputs": {name: manifest.get(name) for name in filenames}}
+
+    def donation_analytics(inputs):
+        # Calculés une fois pour le rapport et les graphiques, exécutés en parallèle
+        return generate_reports.load_donation_analytics(inputs['fetch'])
+
+    def funding_report(inputs):
+        generate_reports.generate_funding_report(inputs['fetch'], force=force, chart=False,
+                                                 analytics=inputs['donation_analytics'])
+        return outputs('funding_report.md')
+
+    def funding_chart(inputs):
+        return {"outputs": generate_reports.generate_funding_chart(inputs['fetch'], force=force,
+                                                                   analytics=inputs['donation_analytics'])}
+
+    def social_report(inputs):
+        generate_reports.generate_social_media_report(force=force)
+        return outputs('social_media_report.md')
+
+    def expenses_report(inputs):
+        generate_reports.generate_expenses_report(force=force)
+        return outputs('expenses_report.md')
+
+    def site_report(inputs):
+        summary = site_reports.generate_site_reports(inputs['fetch'], force=force)
+        manifest = generate_reports.load_manifest()
+        return {"sites": summary['sites'],
+                "outputs": {name: manifest.get(name) for name in summary['generated'] + summary['cached']}}
+
+    def docs(inputs):
+        summary = update_docs_with_reports.update_documentation_with_reports() or {}
+        return {k: v for k, v in summary.items() if k != 'unchanged'}
+
+    pipeline = Pipeline(state_file=state_file)
+    pipeline.add('fetch', _fetch_stage, always_run=True, fingerprint=_funding_fingerprint)
+    # Toujours exécutée: les dons individuels du journal ne passent pas par fetch
+    pipeline.add('donation_analytics', donation_analytics, deps=['fetch'], always_run=True)
+    # Les rapports lisent aussi des fichiers hors de la chaîne (registre des
+    # animaux, historique, exports TikTok, registre des dépenses): ils sont
+    # toujours exécutés et s'appuient sur le manifeste des empreintes
+    # d'entrées de chaque artefact (generate_reports.is_up_to_date).
+    pipeline.add('funding_report', funding_report, deps=['fetch', 'donation_analytics'], always_run=True)
+    pipeline.add('funding_chart', funding_chart, deps=['fetch', 'donation_analytics'], always_run=True)
+    pipeline.add('social_report', social_report, always_run=True)
+    pipeline.add('expenses_report', expenses_report, always_run=True)
+    # Après les rapports de la campagne, que le manifeste des rapports recense
+    pipeline.add('site_reports', site_report, deps=['fetch', 'funding_report', 'social_report', 'expenses_report'],
+                 always_run=True)
+    pipeline.add('docs', docs, deps=['funding_report', 'funding_chart', 'social_report',
+                                     'expenses_report', 'site_reports'])
+    return pipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exécute la chaîne complète fetch -> rapports -> documentation.")
+    parser.add_argument('--force', action='store_true',
+                        help="Réexécute toutes les étapes, même celles dont les entrées n'ont pas changé")
+    args = parser.parse_args(argv)
+
+    print("Exécution de la chaîne PattesThai...")
+    statuses = build_pipeline(force=args.force).run(force=args.force)
+    failed = [name for name, status in statuses.items() if status in ('failed', 'skipped')]
+    if failed:
+        print(f"Étapes en échec ou ignorées: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    print("Chaîne terminée avec succès!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
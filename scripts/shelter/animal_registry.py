@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Registre des animaux accueillis par les refuges du projet.
+
+Chaque animal est décrit par un enregistrement compact (`Animal`, à
+`__slots__`): identifiant, nom, espèce, site, statut, date d'accueil et date
+du dernier changement de statut. Le registre est persisté dans un journal en
+ajout seul (data/animals/registry.ndjson), une ligne par événement:
+
+    {"event": "intake", "id": "kk-0001", "name": "Mali", "species": "chat", "site": "khon-kaen", "date": "2025-03-02"}
+    {"event": "status", "id": "kk-0001", "status": "adopted", "date": "2025-04-18"}
+
+Au chargement, le journal est rejoué pour construire les enregistrements et
+des index secondaires:
+
+- par site, par espèce et par statut (ensembles d'identifiants), complétés
+  des effectifs de chaque combinaison de ces critères, tenus à jour à
+  chaque événement: les effectifs s'obtiennent en temps constant;
+- par date d'accueil et par date du changement de statut, pour chaque site
+  et pour l'ensemble des sites (listes triées): une requête par période
+  (« adoptions ce mois-ci », « animaux en soins à Khon Kaen depuis plus de
+  30 jours ») est une recherche dichotomique, sans parcourir le registre.
+
+Les dates sont conservées sous forme de numéros de jour (date.toordinal()).
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import re
+import sys
+import json
+import bisect
+import argparse
+from datetime import date, datetime
+
+# Configuration
+REGISTRY_FILE = 'data/animals/registry.ndjson'
+# Durée de séjour au-delà de laquelle un animal en soins est signalé dans les rapports
+LONG_STAY_DAYS = 30
+
+EVENT_INTAKE = 'intake'
+EVENT_STATUS = 'status'
+
+# Statuts: clé -> libellé
+IN_CARE = 'in_care'
+FOSTER = 'foster'
+ADOPTED = 'adopted'
+TRANSFERRED = 'transferred'
+DECEASED = 'deceased'
+STATUS_LABELS = {
+    IN_CARE: "En soins",
+    FOSTER: "En famille d'accueil",
+    ADOPTED: "Adopté",
+    TRANSFERRED: "Transféré",
+    DECEASED: "Décédé",
+}
+
+# Clé des index couvrant l'ensemble des sites
+ALL_SITES = None
+
+
+def _slug(value):
+    return re.sub(r'[^a-z0-9_-]+', '-', str(value).strip().lower()).strip('-')
+
+
+def to_day(value):
+    """
+    Numéro de jour d'une date (date, datetime, 'AAAA-MM-JJ' ou numéro de jour).
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+def format_day(day):
+    """
+    Date ISO (AAAA-MM-JJ) d'un numéro de jour.
+    """
+    return date.fromordinal(day).isoformat()
+
+
+def month_range(day):
+    """
+    Premier jour du mois d'un numéro de jour et premier jour du mois suivant.
+    """
+    current = date.fromordinal(day)
+    start = current.replace(day=1)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start.toordinal(), end.toordinal()
+
+
+class Animal:
+    """
+    Enregistrement d'un animal du registre.
+    """
+
+    __slots__ = ('animal_id', 'name', 'species', 'site', 'status', 'intake_day', 'status_day')
+
+    def __init__(self, animal_id, name, species, site, intake_day, status=IN_CARE, status_day=None):
+        self.animal_id = animal_id
+        self.name = name
+        self.species = species
+        self.site = site
+        self.status = status
+        self.intake_day = intake_day
+        self.status_day = intake_day if status_day is None else status_day
+
+    def days_in_status(self, today):
+        """
+        Nombre de jours depuis le dernier changement de statut.
+        """
+        return to_day(today) - self.status_day
+
+    def to_dict(self):
+        return {"id": self.animal_id, "name": self.name, "species": self.species, "site": self.site,
+                "status": self.status, "intake_date": format_day(self.intake_day),
+                "status_date": format_day(self.status_day)}
+
+
+def _timeline_insert(timelines, key, day, animal_id):
+    bisect.insort(timelines.setdefault(key, []), (day, animal_id))
+
+
+def _timeline_remove(timelines, key, day, animal_id):
+    timeline = timelines.get(key)
+    index = bisect.bisect_left(timeline, (day, animal_id))
+    del timeline[index]
+
+
+def _timeline_range(timeline, start=None, end=None):
+    # Bornes [start, end) d'une liste triée de (jour, identifiant)
+    if not timeline:
+        return 0, 0
+    lo = 0 if start is None else bisect.bisect_left(timeline, (to_day(start),))
+    hi = len(timeline) if end is None else bisect.bisect_left(timeline, (to_day(end),))
+    return lo, max(lo, hi)
+
+
+class AnimalRegistry:
+    """
+    Registre en mémoire et ses index. Les méthodes `intake` et `set_status`
+    ajoutent l'événement au journal lorsque le registre en a un (`path`).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.animals = {}
+        self.by_site = {}
+        self.by_species = {}
+        self.by_status = {}
+        # (site, espèce, statut) -> effectif, chaque critère pouvant valoir None (tous)
+        self._counts = {}
+        # (site ou ALL_SITES) -> [(jour d'accueil, identifiant)] trié
+        self._intakes = {}
+        # (site ou ALL_SITES, statut) -> [(jour du changement de statut, identifiant)] trié
+        self._statuses = {}
+
+    def __len__(self):
+        return len(self.animals)
+
+    def __contains__(self, animal_id):
+        return animal_id in self.animals
+
+    def get(self, animal_id):
+        return self.animals.get(animal_id)
+
+    def _append(self, event):
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False, sort_keys=True) + '\n')
+
+    def _update_counts(self, animal, statuses, delta):
+        for site in (None, animal.site):
+            for species in (None, animal.species):
+                for status in statuses:
+                    key = (site, species, status)
+                    self._counts[key] = self._counts.get(key, 0) + delta
+
+    def _index_status(self, animal):
+        self.by_status.setdefault(animal.status, set()).add(animal.animal_id)
+        self._update_counts(animal, (animal.status,), 1)
+        for site in (ALL_SITES, animal.site):
+            _timeline_insert(self._statuses, (site, animal.status), animal.status_day, animal.animal_id)
+
+    def _unindex_status(self, animal):
+        self.by_status[animal.status].discard(animal.animal_id)
+        self._update_counts(animal, (animal.status,), -1)
+        for site in (ALL_SITES, animal.site):
+            _timeline_remove(self._statuses, (site, animal.status), animal.status_day, animal.animal_id)
+
+    def apply(self, event):
+        """
+        Applique un événement du journal au registre et à ses index.
+        """
+        animal_id = str(event['id'])
+        if event.get('event') == EVENT_INTAKE:
+            if animal_id in self.animals:
+                raise ValueError(f"Animal déjà enregistré: {animal_id}")
+            animal = Animal(animal_id, event.get('name') or animal_id, _slug(event.get('species') or 'inconnu'),
+                            _slug(event['site']), to_day(event['date']))
+            self.animals[animal_id] = animal
+            self.by_site.setdefault(animal.site, set()).add(animal_id)
+            self.by_species.setdefault(animal.species, set()).add(animal_id)
+            self._update_counts(animal, (None,), 1)
+            for site in (ALL_SITES, animal.site):
+                _timeline_insert(self._intakes, site, animal.intake_day, animal_id)
+            self._index_status(animal)
+        elif event.get('event') == EVENT_STATUS:
+            animal = self.animals.get(animal_id)
+            if animal is None:
+                raise ValueError(f"Animal inconnu: {animal_id}")
+            if event['status'] not in STATUS_LABELS:
+                raise ValueError(f"Statut inconnu: {event['status']}")
+            status_day = to_day(event['date'])
+            self._unindex_status(animal)
+            animal.status = event['status']
+            animal.status_day = status_day
+            self._index_status(animal)
+        else:
+            raise ValueError(f"Événement inconnu: {event.get('event')}")
+        return animal
+
+    def intake(self, animal_id, name, species, site, when=None):
+        """
+        Enregistre l'accueil d'un animal (en soins à cette date).
+        """
+        event = {"event": EVENT_INTAKE, "id": str(animal_id), "name": name, "species": species,
+                 "site": site, "date": format_day(to_day(when or date.today()))}
+        animal = self.apply(event)
+        self._append(event)
+        return animal
+
+    def set_status(self, animal_id, status, when=None):
+        """
+        Enregistre le changement de statut d'un animal (adoption, famille d'accueil...).
+        """
+        event = {"event": EVENT_STATUS, "id": str(animal_id), "status": status,
+                 "date": format_day(to_day(when or date.today()))}
+        animal = self.apply(event)
+        self._append(event)
+        return animal
+
+    def _matching_sets(self, site, species, status):
+        # Ensembles d'identifiants des critères donnés, du plus petit au plus grand
+        sets = []
+        if site is not None:
+            sets.append(self.by_site.get(_slug(site), set()))
+        if species is not None:
+            sets.append(self.by_species.get(_slug(species), set()))
+        if status is not None:
+            sets.append(self.by_status.get(status, set()))
+        return sorted(sets, key=len)
+
+    def count(self, site=None, species=None, status=None):
+        """
+        Nombre d'animaux correspondant à tous les critères donnés, en temps constant.
+        """
+        key = (None if site is None else _slug(site), None if species is None else _slug(species), status)
+        return self._counts.get(key, 0)
+
+    def select(self, site=None, species=None, status=None):
+        """
+        Enregistrements correspondant à tous les critères donnés.
+        """
+        sets = self._matching_sets(site, species, status)
+        if not sets:
+            return list(self.animals.values())
+        return [self.animals[animal_id] for animal_id in sorted(sets[0])
+                if all(animal_id in other for other in sets[1:])]
+
+    def _status_timeline(self, status, site):
+        return self._statuses.get((ALL_SITES if site is None else _slug(site), status))
+
+    def count_status_between(self, status, site=None, start=None, end=None):
+        """
+        Nombre d'animaux passés au statut `status` dans [start, end) et qui
+        l'ont toujours (par exemple les adoptions du mois). Temps logarithmique.
+        """
+        lo, hi = _timeline_range(self._status_timeline(status, site), start, end)
+        return hi - lo
+
+    def in_status_between(self, status, site=None, start=None, end=None):
+        """
+        Enregistrements correspondants à count_status_between, par date croissante.
+        """
+        timeline = self._status_timeline(status, site)
+        lo, hi = _timeline_range(timeline, start, end)
+        return [self.animals[animal_id] for _, animal_id in timeline[lo:hi]]
+
+    def count_in_status_since(self, status, days, today=None, site=None):
+        """
+        Nombre d'animaux au statut `status` depuis au moins `days` jours
+        (par exemple en soins depuis plus de 30 jours). Temps logarithmique.
+        """
+        return self.count_status_between(status, site, end=to_day(today or date.today()) - days + 1)
+
+    def count_intakes(self, site=None, start=None, end=None):
+        """
+        Nombre d'animaux accueillis dans [start, end). Temps logarithmique.
+        """
+        lo, hi = _timeline_range(self._intakes.get(ALL_SITES if site is None else _slug(site)), start, end)
+        return hi - lo
+
+    def summary(self, today=None, site=None, long_stay_days=LONG_STAY_DAYS):
+        """
+        Indicateurs utilisés par les rapports, pour l'ensemble des sites ou pour un site.
+        """
+        today = to_day(today or date.today())
+        month_start, month_end = month_range(today)
+        species = {key: self.count(site=site, species=key, status=IN_CARE) for key in sorted(self.by_species)}
+        return {
+            "total": self.count(site=site),
+            "statuses": {status: self.count(site=site, status=status) for status in STATUS_LABELS},
+            "in_care_species": {key: value for key, value in species.items() if value},
+            "long_stay": self.count_in_status_since(IN_CARE, long_stay_days, today, site),
+            "long_stay_days": long_stay_days,
+            "intakes_month": self.count_intakes(site, month_start, month_end),
+            "adoptions_month": self.count_status_between(ADOPTED, site, month_start, month_end),
+        }
+
+
+def iter_events(path):
+    """
+    Parcourt les événements du journal. Une ligne illisible, ou incomplète
+    en fin de fichier (écriture en cours), est ignorée.
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            text = line.decode('utf-8').strip()
+            if not text:
+                continue
+            try:
+                yield json.loads(text)
+            except ValueError as e:
+                print(f"Événement illisible du registre des animaux ignoré: {e}")
+
+
+def load_registry(path=None):
+    """
+    Reconstruit le registre en rejouant son journal. Les événements
+    invalides sont signalés et ignorés.
+    """
+    path = path or REGISTRY_FILE
+    registry = AnimalRegistry(path)
+    if not os.path.exists(path):
+        return registry
+    for number, event in enumerate(iter_events(path), 1):
+        try:
+            registry.apply(event)
+        except (KeyError, ValueError) as e:
+            print(f"Événement {number} du registre des animaux ignoré: {e}")
+    return registry
+
+
+def format_summary(summary):
+    """
+    Phrase de synthèse d'un résumé (voir AnimalRegistry.summary).
+    """
+    statuses = summary['statuses']
+    details = [f"{count} {name}" for name, count in summary['in_care_species'].items()]
+    details.append(f"{summary['long_stay']} depuis plus de {summary['long_stay_days']} jours")
+    return (f"{statuses[IN_CARE]} animaux en soins ({', '.join(details)}) et {statuses[FOSTER]} en famille "
+            f"d'accueil. Ce mois-ci: {summary['intakes_month']} accueil(s) et {summary['adoptions_month']} "
+            f"adoption(s), pour {statuses[ADOPTED]} adoption(s) depuis le début du projet.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registre des animaux accueillis par PattesThai.")
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    intake = subparsers.add_parser('intake', help="Enregistre l'accueil d'un animal")
+    intake.add_argument('id')
+    intake.add_argument('--name', required=True)
+    intake.add_argument('--species', required=True, help="Espèce (chien, chat...)")
+    intake.add_argument('--site', required=True, help="Site d'accueil (khon-kaen, rayong...)")
+    intake.add_argument('--date', help="Date d'accueil (AAAA-MM-JJ, aujourd'hui par défaut)")
+    status = subparsers.add_parser('status', help="Enregistre le changement de statut d'un animal")
+    status.add_argument('id')
+    status.add_argument('status', choices=sorted(STATUS_LABELS))
+    status.add_argument('--date', help="Date du changement (AAAA-MM-JJ, aujourd'hui par défaut)")
+    summary = subparsers.add_parser('summary', help="Affiche la synthèse du registre")
+    summary.add_argument('--site', help="Restreint la synthèse à un site")
+    args = parser.parse_args(argv)
+
+    registry = load_registry()
+    try:
+        if args.action == 'intake':
+            animal = registry.intake(args.id, args.name, args.species, args.site, args.date)
+            print(f"Accueil enregistré: {animal.name} ({animal.species}, {animal.site})")
+        elif args.action == 'status':
+            animal = registry.set_status(args.id, args.status, args.date)
+            print(f"{animal.name}: {STATUS_LABELS[animal.status]} depuis le {format_day(animal.status_day)}")
+        else:
+            print(format_summary(registry.summary(site=args.site)))
+    except ValueError as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
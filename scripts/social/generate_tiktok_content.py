@@ -8,20 +8,54 @@ Note: Ce projet est 100% réel. Toute simulation ou action fictive est stricteme
 """
 
 import os
+import sys
 import json
-import requests
+import argparse
 from datetime import datetime
 
+# Ajout de la racine du dépôt au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts import tracing
+from scripts.social import openai_cache
+from scripts.social import idea_batch
+
 # Configuration
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 OUTPUT_DIR = 'output/social'
+WRITE_BUFFER_SIZE = 64 * 1024
+# Point de contrôle des idées enregistrées: nombre, taille du JSONL et index de déduplication
+CHECKPOINT_FILE = 'tiktok_ideas.checkpoint.json'
+
+def build_ideas_payload():
+    """
+    Construit la requête chat completions de génération d'idées TikTok.
+    """
+    return {
+        "model": "gpt-4",
+        "messages": [
+            {
+                "role": "system",
+                "content": "Vous êtes un expert en marketing sur TikTok pour des organisations à but non lucratif dédiées aux animaux."
+            },
+            {
+                "role": "user",
+                "content": "Générez 5 idées de contenu TikTok pour notre projet PattesThai, un refuge pour chiens et chats errants en Thaïlande. Pour chaque idée, fournissez un titre, une description, des hashtags suggérés, des suggestions musicales et une durée optimale. Concentrez-vous sur du contenu qui peut devenir viral tout en sensibilisant à notre cause et en encourageant les dons. N'oubliez pas que ce projet est 100% réel et que nous mettons l'accent sur la transparence et l'authenticité. Formatez votre réponse en JSON."
+            }
+        ],
+        "temperature": 0.7
+    }
 
 def generate_tiktok_ideas():
     """
     Génère des idées de contenu TikTok à l'aide de l'API d'OpenAI.
     À adapter en fonction des besoins spécifiques du projet.
+
+    Les réponses de l'API sont mises en cache sur disque (voir openai_cache);
+    avec OPENAI_CACHE_MODE=replay, seules les réponses en cache sont utilisées.
     """
-    if not OPENAI_API_KEY or OPENAI_API_KEY == 'placeholder':
+    replay = os.environ.get('OPENAI_CACHE_MODE') == openai_cache.MODE_REPLAY
+    if (not OPENAI_API_KEY or OPENAI_API_KEY == 'placeholder') and not replay:
         print("Clé API OpenAI non configurée. Utilisation de suggestions par défaut.")
         # Suggestions de contenu par défaut
         ideas = [
@@ -65,29 +99,8 @@ def generate_tiktok_ideas():
     
     # Si l'API est configurée, utiliser OpenAI pour générer des suggestions
     try:
-        url = "https://api.openai.com/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "Vous êtes un expert en marketing sur TikTok pour des organisations à but non lucratif dédiées aux animaux."
-                },
-                {
-                    "role": "user",
-                    "content": "Générez 5 idées de contenu TikTok pour notre projet PattesThai, un refuge pour chiens et chats errants en Thaïlande. Pour chaque idée, fournissez un titre, une description, des hashtags suggérés, des suggestions musicales et une durée optimale. Concentrez-vous sur du contenu qui peut devenir viral tout en sensibilisant à notre cause et en encourageant les dons. N'oubliez pas que ce projet est 100% réel et que nous mettons l'accent sur la transparence et l'authenticité. Formatez votre réponse en JSON."
-                }
-            ],
-            "temperature": 0.7
-        }
-        
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        content = response.json()['choices'][0]['message']['content']
+        response = openai_cache.chat_completion(build_ideas_payload(), OPENAI_API_KEY)
+        content = response['choices'][0]['message']['content']
         
         # Extraire le JSON de la réponse
         if content.startswith("```json"):
@@ -113,27 +126,10 @@ def generate_tiktok_ideas():
         ]
         return ideas
 
-def save_content_ideas(ideas):
-    """
-    Sauvegarde les idées de contenu générées dans des fichiers
-    """
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    # Sauvegarde au format JSON
-    with open(f"{OUTPUT_DIR}/tiktok_ideas.json", 'w', encoding='utf-8') as f:
-        json.dump(ideas, f, ensure_ascii=False, indent=2)
-    
-    # Création d'un fichier Markdown plus lisible
-    markdown_content = f"""# Idées de Contenu TikTok pour PattesThai
-
-*Généré le {datetime.now().strftime('%d/%m/%Y %H:%M')}*
-
-"""
-    
-    for i, idea in enumerate(ideas, 1):
-        markdown_content += f"""## {i}. {idea['title']}
+def _format_idea_markdown(number, idea):
+    return f"""## {number}. {idea['title']}
 
-**Description:** {idea['description']}
+**Description:** {idea.get('description', 'N/A')}
 
 **Hashtags:** {', '.join(idea.get('hashtags', []))}
 
@@ -144,17 +140,122 @@ def save_content_ideas(ideas):
 ---
 
 """
+
+def _index_saved_ideas(path, deduplicator):
+    """
+    Ajoute à l'index de déduplication les idées déjà enregistrées en JSONL.
+    Retourne le nombre de lignes du fichier.
+    """
+    count = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            count += 1
+            try:
+                deduplicator.is_duplicate(json.loads(line))
+            except ValueError:
+                continue
+    return count
+
+def _load_checkpoint(path, jsonl_path):
+    """
+    Retourne le point de contrôle s'il décrit le fichier JSONL actuel (même
+    taille) et contient l'index de déduplication borné, sinon None.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    index = checkpoint.get('index')
+    if not isinstance(index, dict) or 'entries' not in index or checkpoint.get('size') != os.path.getsize(jsonl_path):
+        return None
+    return checkpoint
+
+def _save_checkpoint(path, count, jsonl_path, deduplicator=None):
+    checkpoint = {"count": count, "size": os.path.getsize(jsonl_path),
+                  "index": deduplicator.to_dict() if deduplicator is not None else None}
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def save_content_ideas(ideas, append=False):
+    """
+    Sauvegarde les idées de contenu générées dans des fichiers, au fil de l'eau:
+    chaque idée de l'itérable (liste ou générateur) est écrite immédiatement en
+    JSONL (une idée par ligne) et en Markdown via des fichiers tamponnés, sans
+    conserver la liste complète en mémoire.
+
+    Avec `append`, les idées sont ajoutées à la fin des fichiers existants,
+    sans les réécrire; la numérotation reprend là où elle s'était arrêtée et
+    les idées quasi identiques à l'une des idées enregistrées récemment
+    (voir idea_batch.DEDUP_INDEX_SIZE) sont écartées.
+    Le nombre d'idées et l'index de déduplication sont conservés dans un
+    point de contrôle: le JSONL n'est relu que s'il a changé depuis (ou
+    lors du premier ajout après une écriture complète, qui n'indexe pas ses
+    idées pour garder une mémoire constante).
+
+    Retourne le nombre d'idées écrites.
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    jsonl_path = f"{OUTPUT_DIR}/tiktok_ideas.jsonl"
+    markdown_path = f"{OUTPUT_DIR}/tiktok_ideas.md"
+    checkpoint_path = f"{OUTPUT_DIR}/{CHECKPOINT_FILE}"
     
-    with open(f"{OUTPUT_DIR}/tiktok_ideas.md", 'w', encoding='utf-8') as f:
-        f.write(markdown_content)
+    append = append and os.path.exists(jsonl_path) and os.path.exists(markdown_path)
+    start = 0
+    deduplicator = None
+    if append:
+        checkpoint = _load_checkpoint(checkpoint_path, jsonl_path)
+        if checkpoint is not None:
+            start = checkpoint['count']
+            deduplicator = idea_batch.IdeaDeduplicator.from_dict(checkpoint['index'])
+        else:
+            deduplicator = idea_batch.IdeaDeduplicator()
+            start = _index_saved_ideas(jsonl_path, deduplicator)
+        ideas = deduplicator.filter(ideas)
+    mode = 'a' if append else 'w'
+    count = 0
     
-    print(f"Idées de contenu TikTok sauvegardées dans {OUTPUT_DIR}")
+    with open(jsonl_path, mode, encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as jsonl_file, \
+            open(markdown_path, mode, encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as markdown_file:
+        if not append:
+            markdown_file.write(f"""# Idées de Contenu TikTok pour PattesThai
 
-def main():
+*Généré le {datetime.now().strftime('%d/%m/%Y %H:%M')}*
+
+""")
+        for idea in ideas:
+            count += 1
+            jsonl_file.write(json.dumps(idea, ensure_ascii=False) + '\n')
+            markdown_file.write(_format_idea_markdown(start + count, idea))
+    _save_checkpoint(checkpoint_path, start + count, jsonl_path, deduplicator)
+    
+    tracing.count('ideas_written', count)
+    if tracing.enabled:
+        tracing.count('bytes_written', os.path.getsize(jsonl_path) + os.path.getsize(markdown_path))
+    print(f"{count} idées de contenu TikTok sauvegardées dans {OUTPUT_DIR}")
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère des idées de contenu TikTok pour PattesThai.")
+    parser.add_argument('--batch', action='store_true',
+                        help="Génère des idées pour plusieurs thèmes en parallèle")
+    parser.add_argument('--themes', nargs='+', help="Thèmes à utiliser en mode --batch")
+    parser.add_argument('--append', action='store_true',
+                        help="Ajoute les idées aux fichiers existants au lieu de les remplacer")
+    parser.add_argument('--count', type=int, default=idea_batch.IDEAS_PER_PROMPT,
+                        help="Nombre d'idées demandées par thème en mode --batch")
+    args = parser.parse_args(argv)
+    
     print("Génération d'idées de contenu TikTok...")
-    ideas = generate_tiktok_ideas()
+    if args.batch:
+        ideas = idea_batch.generate_ideas_batch(args.themes, OPENAI_API_KEY, count=args.count)
+    else:
+        ideas = idea_batch.IdeaDeduplicator().filter(generate_tiktok_ideas())
     print("Sauvegarde des idées de contenu...")
-    save_content_ideas(ideas)
+    with tracing.span('save_content_ideas', 'stage'):
+        save_content_ideas(ideas, append=args.append)
     print("Terminé!")
 
 if __name__ == "__main__":
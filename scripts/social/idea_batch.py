@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Génération d'idées TikTok par lots, en parallèle et sous limite de débit.
+
+Plusieurs requêtes (une par thème) sont envoyées en même temps dans la limite
+de requêtes et de jetons par minute autorisés par l'API. Les réponses sont
+lues en flux (streaming) et analysées au fil de l'eau: chaque idée est
+disponible dès que son objet JSON est complet. Les idées quasi identiques
+sont éliminées grâce à un index d'empreintes des titres et hashtags.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import re
+import json
+import time
+import queue
+import hashlib
+import threading
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts import tracing
+from scripts.social import openai_cache
+
+# Configuration
+THEMES = [
+    "sauvetages d'animaux errants",
+    "soins vétérinaires",
+    "adoptions et familles d'accueil",
+    "bénévoles et vie au refuge",
+    "transparence sur l'utilisation des dons",
+    "sensibilisation à la stérilisation",
+]
+IDEAS_PER_PROMPT = 10
+MAX_WORKERS = 4
+MAX_TOKENS = 2000
+REQUESTS_PER_MINUTE = int(os.environ.get('OPENAI_RPM', '60'))
+TOKENS_PER_MINUTE = int(os.environ.get('OPENAI_TPM', '90000'))
+# Proportion minimale de mots communs entre deux titres partageant les mêmes hashtags
+TITLE_SIMILARITY = 0.5
+# Nombre d'idées récentes conservées dans l'index de déduplication
+DEDUP_INDEX_SIZE = 5000
+
+
+class RateLimiter:
+    """
+    Double seau à jetons (requêtes et jetons par minute), partagé entre threads.
+    """
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.capacity = {"requests": float(requests_per_minute), "tokens": float(tokens_per_minute)}
+        self.available = dict(self.capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        elapsed = now - self.updated
+        self.updated = now
+        for name, capacity in self.capacity.items():
+            self.available[name] = min(capacity, self.available[name] + capacity * elapsed / 60.0)
+
+    def acquire(self, tokens):
+        """
+        Bloque jusqu'à ce qu'une requête consommant `tokens` jetons soit autorisée.
+        """
+        tokens = min(float(tokens), self.capacity['tokens'])
+        while True:
+            with self.lock:
+                self._refill()
+                if self.available['requests'] >= 1 and self.available['tokens'] >= tokens:
+                    self.available['requests'] -= 1
+                    self.available['tokens'] -= tokens
+                    return
+                wait = max(
+                    (1 - self.available['requests']) * 60.0 / self.capacity['requests'],
+                    (tokens - self.available['tokens']) * 60.0 / self.capacity['tokens'],
+                    0.01
+                )
+            self.sleep(wait)
+
+
+class IncrementalIdeaParser:
+    """
+    Analyseur JSON incrémental: extrait les objets d'idées (possédant un
+    champ `title`) dès qu'ils sont complets dans le texte reçu, quel que soit
+    l'emballage autour (tableau, objet {"ideas": [...]}, bloc Markdown).
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.starts = []
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, text):
+        """
+        Ajoute un fragment de texte et retourne la liste des idées complétées.
+        """
+        ideas = []
+        for char in text:
+            self.buffer.append(char)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.starts.append(len(self.buffer) - 1)
+            elif char == '}' and self.starts:
+                start = self.starts.pop()
+                try:
+                    obj = json.loads(''.join(self.buffer[start:]))
+                except ValueError:
+                    continue
+                if isinstance(obj, dict) and 'title' in obj:
+                    ideas.append(obj)
+            if not self.starts and not self.in_string:
+                # Rien à conserver en dehors d'un objet ouvert
+                self.buffer = []
+        return ideas
+
+
+def _normalize_words(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return [word for word in re.findall(r'[a-z0-9]+', text) if len(word) > 2]
+
+
+class IdeaDeduplicator:
+    """
+    Index d'empreintes pour éliminer les idées quasi identiques.
+
+    Deux idées sont considérées identiques si leurs titres normalisés
+    (sans accents, casse ni ponctuation, mots triés) ont la même empreinte,
+    ou si elles ont le même ensemble de hashtags et des titres proches.
+    Seules les `max_entries` idées les plus récentes sont indexées: la
+    mémoire et la taille de l'index enregistré restent bornées.
+    """
+
+    def __init__(self, max_entries=DEDUP_INDEX_SIZE):
+        self.max_entries = max_entries
+        self.titles = set()
+        self.hashtags = {}
+        # Idées indexées, de la plus ancienne à la plus récente
+        self.entries = deque()
+
+    @staticmethod
+    def _digest(values):
+        return hashlib.sha1('\x1f'.join(values).encode('utf-8')).hexdigest()
+
+    def is_duplicate(self, idea):
+        """
+        Indique si l'idée est un doublon; sinon l'ajoute à l'index.
+        """
+        words = _normalize_words(idea.get('title'))
+        title_key = self._digest(sorted(set(words)))
+        hashtags = sorted({tag.lstrip('#').lower() for tag in idea.get('hashtags', []) if tag})
+        hashtag_key = self._digest(hashtags) if hashtags else None
+
+        if title_key in self.titles:
+            return True
+        word_set = set(words)
+        for other in self.hashtags.get(hashtag_key, []):
+            union = word_set | other
+            if union and len(word_set & other) / len(union) >= TITLE_SIMILARITY:
+                return True
+
+        self._add(title_key, hashtag_key, word_set)
+        return False
+
+    def _add(self, title_key, hashtag_key, word_set):
+        self.titles.add(title_key)
+        if hashtag_key:
+            self.hashtags.setdefault(hashtag_key, []).append(word_set)
+        self.entries.append((title_key, hashtag_key, word_set))
+        if len(self.entries) > self.max_entries:
+            # Oubli de l'idée la plus ancienne, première de son groupe de hashtags
+            old_title, old_hashtags, _ = self.entries.popleft()
+            self.titles.discard(old_title)
+            if old_hashtags:
+                group = self.hashtags[old_hashtags]
+                group.pop(0)
+                if not group:
+                    del self.hashtags[old_hashtags]
+
+    def to_dict(self):
+        """
+        Index sérialisable en JSON (voir from_dict), au plus `max_entries` idées.
+        """
+        return {"entries": [[title_key, hashtag_key, sorted(words)]
+                            for title_key, hashtag_key, words in self.entries]}
+
+    @classmethod
+    def from_dict(cls, payload, max_entries=DEDUP_INDEX_SIZE):
+        """
+        Reconstruit un index enregistré avec to_dict.
+        """
+        deduplicator = cls(max_entries)
+        for title_key, hashtag_key, words in payload['entries']:
+            deduplicator._add(title_key, hashtag_key, set(words))
+        return deduplicator
+
+    def filter(self, ideas):
+        """
+        Génère les idées en écartant les doublons, dans l'ordre d'arrivée.
+        """
+        for idea in ideas:
+            if not self.is_duplicate(idea):
+                yield idea
+
+
+def build_theme_payload(theme, count=IDEAS_PER_PROMPT):
+    """
+    Construit une requête de génération d'idées pour un thème, en mode streaming.
+    """
+    return {
+        "model": "gpt-4",
+        "messages": [
+            {
+                "role": "system",
+                "content": "Vous êtes un expert en marketing sur TikTok pour des organisations à but non lucratif dédiées aux animaux."
+            },
+            {
+                "role": "user",
+                "content": f"Générez {count} idées de contenu TikTok sur le thème « {theme} » pour notre projet PattesThai, un refuge pour chiens et chats errants en Thaïlande. Pour chaque idée, fournissez un objet JSON avec les champs title, description, hashtags (liste), music_suggestion et duration. Ce projet est 100% réel: privilégiez la transparence et l'authenticité. Répondez uniquement par un tableau JSON."
+            }
+        ],
+        "temperature": 0.9,
+        "max_tokens": MAX_TOKENS,
+        "stream": True
+    }
+
+
+def estimate_tokens(payload):
+    """
+    Estimation grossière du nombre de jetons consommés par une requête.
+    """
+    prompt = sum(len(message['content']) for message in payload['messages'])
+    return prompt // 4 + payload.get('max_tokens', MAX_TOKENS)
+
+
+def stream_content(payload, api_key, cache=None, mode=None, before_request=None):
+    """
+    Génère les fragments de texte de la réponse au fil de l'eau.
+
+    La réponse complète est mise en cache (voir openai_cache) et rejouée
+    d'un seul bloc lors des exécutions suivantes. `before_request` est
+    appelée juste avant un appel à l'API, jamais pour une réponse en cache.
+    """
+    mode = mode or os.environ.get('OPENAI_CACHE_MODE', openai_cache.MODE_READ_THROUGH)
+    cache = cache or openai_cache.ResponseCache()
+    key = openai_cache.request_key(payload)
+
+    if mode != openai_cache.MODE_OFF:
+        cached = cache.get(key)
+        tracing.count('openai.cache_hits' if cached is not None else 'openai.cache_misses')
+        if cached is not None:
+            yield cached['choices'][0]['message']['content']
+            return
+        if mode == openai_cache.MODE_REPLAY:
+            raise openai_cache.CacheMiss(f"Réponse absente du cache pour la requête {key[:12]}")
+
+    if before_request is not None:
+        before_request()
+    # Latence jusqu'aux en-têtes de la réponse; le flux est lu ensuite
+    with tracing.span('openai.request', 'api', model=payload.get('model'), stream=True):
+        response = openai_cache.get_session().post(
+            openai_cache.OPENAI_API_URL,
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            json=payload,
+            timeout=openai_cache.TIMEOUT,
+            stream=True
+        )
+        response.raise_for_status()
+    parts = []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        data = line[len('data:'):].strip()
+        if data == '[DONE]':
+            break
+        delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+        if delta:
+            parts.append(delta)
+            yield delta
+
+    if mode != openai_cache.MODE_OFF:
+        cache.put(key, {"choices": [{"message": {"content": ''.join(parts)}}]})
+
+
+def generate_ideas_batch(themes=None, api_key=None, count=IDEAS_PER_PROMPT, limiter=None,
+                         max_workers=MAX_WORKERS, cache=None):
+    """
+    Génère des idées pour chaque thème en parallèle et les retourne au fil de
+    l'eau (générateur), sans doublons. Une erreur sur un thème est signalée
+    sans interrompre les autres.
+    """
+    themes = themes or THEMES
+    limiter = limiter or RateLimiter()
+    # Cache partagé par les threads: sa taille est suivie en mémoire
+    cache = cache or openai_cache.ResponseCache()
+    results = queue.Queue()
+    done = object()
+
+    def worker(theme):
+        try:
+            payload = build_theme_payload(theme, count)
+            parser = IncrementalIdeaParser()
+            # Les réponses en cache ne consomment pas le débit autorisé
+            acquire = lambda: limiter.acquire(estimate_tokens(payload))
+            for fragment in stream_content(payload, api_key, cache, before_request=acquire):
+                for idea in parser.feed(fragment):
+                    idea.setdefault('theme', theme)
+                    results.put(idea)
+        except Exception as e:
+            print(f"Erreur lors de la génération d'idées pour « {theme} »: {e}")
+        finally:
+            results.put(done)
+
+    def drain():
+        remaining = len(themes)
+        while remaining:
+            item = results.get()
+            if item is done:
+                remaining -= 1
+            else:
+                yield item
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for theme in themes:
+            executor.submit(worker, theme)
+        yield from IdeaDeduplicator().filter(drain())
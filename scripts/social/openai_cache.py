@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache disque des réponses de l'API OpenAI (chat completions).
+
+Chaque réponse est enregistrée dans un fichier nommé d'après l'empreinte
+SHA-256 de la requête (modèle, messages, température...). Les entrées expirent
+après une durée de vie (TTL) et le cache est borné en taille: les entrées les
+moins récemment utilisées sont supprimées en premier (LRU).
+
+Modes (variable OPENAI_CACHE_MODE):
+- `read-through` (par défaut): réponse en cache si disponible, sinon appel à l'API.
+- `replay`: uniquement le cache, sans appel réseau (CI, exécution déterministe).
+- `off`: appel systématique à l'API, sans lecture ni écriture du cache.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+
+from scripts import tracing
+
+# Configuration
+OPENAI_API_URL = 'https://api.openai.com/v1/chat/completions'
+CACHE_DIR = 'data/openai_cache'
+CACHE_TTL = 7 * 24 * 3600
+CACHE_MAX_BYTES = 20 * 1024 * 1024
+# Délais d'attente (connexion, lecture) en secondes
+TIMEOUT = (5, 120)
+
+MODE_READ_THROUGH = 'read-through'
+MODE_REPLAY = 'replay'
+MODE_OFF = 'off'
+
+
+class CacheMiss(Exception):
+    """Aucune réponse en cache pour cette requête en mode replay."""
+
+
+def request_key(payload):
+    """
+    Calcule la clé de cache d'une requête: empreinte de sa forme canonique.
+    """
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache disque à durée de vie limitée et taille bornée (éviction LRU).
+
+    La date de modification de chaque fichier sert de date de dernier accès:
+    elle est mise à jour à chaque lecture réussie.
+
+    Une même instance peut être partagée entre threads (génération par
+    lots). La taille du cache est suivie en mémoire après un premier
+    inventaire; le répertoire n'est parcouru à nouveau que lorsqu'elle
+    dépasse la limite. Les fichiers supprimés entre-temps par un autre
+    processus sont ignorés.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # Taille estimée du cache (None tant qu'aucun inventaire n'a été fait)
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """
+        Retourne la réponse en cache, ou None si absente ou expirée.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats['misses'] += 1
+            return None
+
+        if self.ttl is not None and time.time() - entry.get('created', 0) > self.ttl:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Entrée évincée entre-temps: la réponse lue reste valable
+            pass
+        self.stats['hits'] += 1
+        return entry['response']
+
+    def put(self, key, response):
+        """
+        Enregistre une réponse puis applique la limite de taille du cache.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        # Fichier temporaire propre à chaque écriture: deux threads peuvent
+        # enregistrer la même requête en même temps
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=key, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"created": time.time(), "response": response}, f, ensure_ascii=False)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            if self._size is None or self._size > self.max_bytes:
+                self._evict()
+
+    def evict(self):
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à repasser
+        sous la taille maximale.
+        """
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        # Appelée sous self._lock
+        if not os.path.isdir(self.cache_dir):
+            self._size = 0
+            return
+        entries = []
+        total = 0
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, filename))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename))
+            total += stat.st_size
+        for _, size, filename in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, filename))
+                self.stats['evictions'] += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Retourne la session HTTP partagée pour les appels à l'API OpenAI.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                _session = requests.Session()
+    return _session
+
+
+def chat_completion(payload, api_key=None, cache=None, mode=None):
+    """
+    Exécute une requête chat completions en passant par le cache selon le mode.
+
+    Lève CacheMiss en mode replay si la réponse n'est pas en cache.
+    """
+    mode = mode or os.environ.get('OPENAI_CACHE_MODE', MODE_READ_THROUGH)
+    cache = cache or ResponseCache()
+    key = request_key(payload)
+
+    if mode != MODE_OFF:
+        response = cache.get(key)
+        tracing.count('openai.cache_hits' if response is not None else 'openai.cache_misses')
+        if response is not None:
+            return response
+        if mode == MODE_REPLAY:
+            raise CacheMiss(f"Réponse absente du cache pour la requête {key[:12]}")
+
+    with tracing.span('openai.request', 'api', model=payload.get('model')):
+        http_response = get_session().post(
+            OPENAI_API_URL,
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            json=payload,
+            timeout=TIMEOUT
+        )
+        http_response.raise_for_status()
+        response = http_response.json()
+
+    if mode != MODE_OFF:
+        cache.put(key, response)
+    return response
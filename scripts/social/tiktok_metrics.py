@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lecture des exports de statistiques TikTok (CSV, JSON ou JSON Lines).
+
+Les exports déposés dans data/social/tiktok/ et dans ses sous-répertoires
+par site (data/social/tiktok/<site>/) sont lus ligne par ligne: seuls
+les totaux courants (vues, likes, partages, commentaires) et les meilleures
+publications, dans un tas de taille bornée, sont conservés en mémoire, quelle
+que soit la longueur de l'historique des publications.
+
+Chaque publication ne doit figurer que dans un seul export (un fichier par
+période).
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import csv
+import json
+import heapq
+
+# Configuration
+EXPORTS_DIR = 'data/social/tiktok'
+TOP_K = 5
+READ_CHUNK_SIZE = 64 * 1024
+METRICS = ('views', 'likes', 'shares', 'comments')
+
+# Noms de colonnes rencontrés dans les exports TikTok (en minuscules)
+FIELD_ALIASES = {
+    'id': 'id', 'video id': 'id', 'video_id': 'id', 'post id': 'id',
+    'title': 'title', 'video title': 'title', 'description': 'title', 'caption': 'title',
+    'url': 'url', 'link': 'url', 'video link': 'url', 'share_url': 'url',
+    'date': 'published', 'post time': 'published', 'create_time': 'published', 'published': 'published',
+    'views': 'views', 'video views': 'views', 'view_count': 'views', 'play_count': 'views',
+    'likes': 'likes', 'like_count': 'likes',
+    'shares': 'shares', 'share_count': 'shares',
+    'comments': 'comments', 'comment_count': 'comments',
+    'followers': 'followers', 'follower_count': 'followers',
+}
+
+
+def parse_count(value):
+    """
+    Convertit un compteur d'export ('1,234', '1.2K', '3M', 42) en entier.
+    """
+    if value is None or value == '':
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().replace(',', '').replace(' ', '').upper()
+    multiplier = 1
+    if text.endswith('K'):
+        multiplier, text = 1000, text[:-1]
+    elif text.endswith('M'):
+        multiplier, text = 1000000, text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        return 0
+
+
+def normalize_post(row):
+    """
+    Ramène une ligne d'export aux champs communs d'une publication.
+    """
+    post = {}
+    for key, value in row.items():
+        field = FIELD_ALIASES.get(str(key).strip().lower())
+        if field and field not in post:
+            post[field] = value
+    for field in METRICS + ('followers',):
+        post[field] = parse_count(post.get(field))
+    return post
+
+
+def _iter_json_array(f):
+    """
+    Génère les objets d'un tableau JSON lu par blocs, sans charger le
+    fichier entier en mémoire.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        # Objet unique, par exemple {"videos": [...]}: lu en entier
+        payload = json.loads(buffer + f.read()) if buffer else []
+        if isinstance(payload, dict):
+            payload = payload.get('videos', payload.get('data', []))
+        yield from payload
+        return
+
+    position = 1
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer):
+            if buffer[position] == ']':
+                return
+            try:
+                obj, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                yield obj
+                continue
+        elif eof:
+            return
+        # Objet incomplet: on conserve la fin du tampon et on lit le bloc suivant
+        chunk = f.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def iter_posts(path):
+    """
+    Génère les publications d'un fichier d'export, ligne par ligne.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if extension == '.csv':
+            rows = csv.DictReader(f)
+        elif extension == '.jsonl':
+            rows = (json.loads(line) for line in f if line.strip())
+        elif extension == '.json':
+            rows = _iter_json_array(f)
+        else:
+            return
+        for row in rows:
+            yield normalize_post(row)
+
+
+class MetricsAggregator:
+    """
+    Totaux courants et meilleures publications (par nombre de vues).
+    """
+
+    def __init__(self, top_k=TOP_K):
+        self.top_k = top_k
+        self.totals = dict.fromkeys(METRICS, 0)
+        self.posts = 0
+        self.followers = 0
+        self.heap = []
+
+    def add(self, post):
+        for metric in METRICS:
+            self.totals[metric] += post[metric]
+        self.followers = max(self.followers, post['followers'])
+        if not (post.get('id') or post.get('title') or post.get('url')):
+            # Ligne de synthèse (abonnés) sans publication associée
+            return
+        self.posts += 1
+        entry = ((post['views'], post['likes'] + post['shares'] + post['comments']), self.posts,
+                 {key: post.get(key) for key in ('title', 'url', 'published') + METRICS})
+        if len(self.heap) < self.top_k:
+            heapq.heappush(self.heap, entry)
+        elif entry[0] > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def result(self):
+        """
+        Retourne les statistiques agrégées, meilleures publications en tête.
+        """
+        views = self.totals['views']
+        interactions = self.totals['likes'] + self.totals['shares'] + self.totals['comments']
+        return dict(
+            self.totals,
+            followers=self.followers,
+            posts=self.posts,
+            engagement_rate=round(interactions / views, 4) if views else 0.0,
+            top_performing_content=[post for _, _, post in sorted(self.heap, key=lambda e: (e[0], -e[1]), reverse=True)]
+        )
+
+
+def list_exports(exports_dir=EXPORTS_DIR):
+    """
+    Liste les fichiers d'export pris en charge, sous-répertoires des sites
+    compris, par ordre alphabétique des chemins relatifs.
+    """
+    if not os.path.isdir(exports_dir):
+        return []
+    paths = []
+    for root, dirs, names in os.walk(exports_dir):
+        dirs[:] = [name for name in dirs if not name.startswith('.')]
+        paths.extend(os.path.join(root, name) for name in names
+                     if os.path.splitext(name)[1].lower() in ('.csv', '.json', '.jsonl'))
+    return sorted(paths, key=lambda path: os.path.relpath(path, exports_dir).split(os.sep))
+
+
+def exports_fingerprint(exports_dir=EXPORTS_DIR):
+    """
+    Chemin relatif, taille et date de modification de chaque export: une
+    empreinte inchangée permet d'éviter de relire les exports.
+    """
+    fingerprint = []
+    for path in list_exports(exports_dir):
+        stat = os.stat(path)
+        name = os.path.relpath(path, exports_dir).replace(os.sep, '/')
+        fingerprint.append((name, stat.st_size, stat.st_mtime_ns))
+    return fingerprint
+
+
+def ingest_exports(exports_dir=EXPORTS_DIR, top_k=TOP_K):
+    """
+    Agrège tous les exports TikTok disponibles.
+
+    Retourne les statistiques TikTok (compteurs à zéro en l'absence d'export).
+    """
+    aggregator = MetricsAggregator(top_k)
+    for path in list_exports(exports_dir):
+        try:
+            for post in iter_posts(path):
+                aggregator.add(post)
+        except Exception as e:
+            print(f"Erreur lors de la lecture de l'export {path}: {e}")
+    return aggregator.result()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Instrumentation légère des scripts: intervalles (spans) et compteurs.
+
+Désactivée par défaut: `span()` retourne alors un contexte vide partagé et
+`count()` ne fait rien, pour un coût négligeable. Activation:
+
+- `PATTESTHAI_TRACE=trace.json`: enregistre une chronologie au format Chrome
+  trace (à ouvrir dans chrome://tracing ou https://ui.perfetto.dev), écrite
+  à la fin du processus. Les totaux des compteurs (octets écrits, fichiers
+  copiés, succès du cache...) figurent dans `otherData.counters`.
+- `PATTESTHAI_PROFILE=répertoire`: enregistre un profil cProfile par étape
+  (`<étape>.prof`, lisible avec `python -m pstats`). Les étapes profilées
+  s'exécutent alors une à la fois.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+import contextlib
+
+# Configuration
+TRACE_FILE = os.environ.get('PATTESTHAI_TRACE')
+PROFILE_DIR = os.environ.get('PATTESTHAI_PROFILE')
+
+enabled = False
+_events = []
+_counters = {}
+_lock = threading.Lock()
+_profile_lock = threading.Lock()
+_origin = time.perf_counter()
+
+
+class _NullSpan:
+    """Contexte vide utilisé lorsque l'instrumentation est désactivée."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Intervalle chronométré, enregistré comme événement « complet » (ph X)."""
+
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = repr(exc)
+        event = {
+            "name": self.name, "cat": self.category, "ph": "X",
+            "ts": round((self.start - _origin) * 1e6, 3), "dur": round((end - self.start) * 1e6, 3),
+            "pid": os.getpid(), "tid": threading.get_ident(), "args": self.args
+        }
+        with _lock:
+            _events.append(event)
+        return False
+
+    def set(self, **args):
+        """
+        Ajoute des attributs à l'intervalle (taille, statut HTTP...).
+        """
+        self.args.update(args)
+
+
+def span(name, category='pattesthai', **args):
+    """
+    Contexte chronométrant un bloc de code.
+    """
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def count(name, value=1):
+    """
+    Incrémente un compteur et enregistre sa nouvelle valeur dans la chronologie.
+    """
+    if not enabled:
+        return
+    with _lock:
+        total = _counters[name] = _counters.get(name, 0) + value
+        _events.append({"name": name, "ph": "C", "ts": round((time.perf_counter() - _origin) * 1e6, 3),
+                        "pid": os.getpid(), "args": {"value": total}})
+
+
+def counters():
+    """
+    Retourne une copie des totaux des compteurs.
+    """
+    with _lock:
+        return dict(_counters)
+
+
+@contextlib.contextmanager
+def profile(name):
+    """
+    Profile le bloc avec cProfile si PROFILE_DIR est défini.
+    """
+    if not PROFILE_DIR:
+        yield
+        return
+    import cProfile
+
+    # Un seul profileur actif à la fois: les profils des étapes restent distincts
+    with _profile_lock:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(os.path.join(PROFILE_DIR, f"{name}.prof"))
+
+
+def enable(trace_file=None):
+    """
+    Active l'instrumentation; la chronologie sera écrite dans `trace_file`
+    à la fin du processus si le fichier est précisé.
+    """
+    global enabled, TRACE_FILE
+    enabled = True
+    if trace_file:
+        if not TRACE_FILE:
+            atexit.register(_export_at_exit)
+        TRACE_FILE = trace_file
+
+
+def disable():
+    """
+    Désactive l'instrumentation et oublie les événements enregistrés.
+    """
+    global enabled
+    enabled = False
+    with _lock:
+        _events.clear()
+        _counters.clear()
+
+
+def export(path):
+    """
+    Écrit la chronologie au format Chrome trace (JSON).
+    """
+    with _lock:
+        payload = {"traceEvents": list(_events), "displayTimeUnit": "ms",
+                   "otherData": {"counters": dict(_counters)}}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _export_at_exit():
+    import multiprocessing
+    # Les processus de travail (rendu des graphiques...) n'écrasent pas la chronologie
+    if enabled and TRACE_FILE and multiprocessing.parent_process() is None:
+        print(f"Chronologie d'exécution enregistrée dans {export(TRACE_FILE)}")
+
+
+if TRACE_FILE:
+    enabled = True
+    atexit.register(_export_at_exit)
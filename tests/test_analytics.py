@@ -0,0 +1,670 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests unitaires pour les scripts d'analyse et de génération de rapports.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import patch
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+# Ajout du répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.analytics import generate_reports
+from scripts.analytics import update_docs_with_reports
+from scripts.analytics import donation_analytics
+from scripts.analytics import charts
+from scripts.analytics import images
+from scripts.analytics import site_reports
+from scripts import docs_pages
+from scripts.fundraising import badges
+from scripts.fundraising import expense_ledger
+from scripts.fundraising import funding_history
+from scripts.fundraising import update_fundraising_data
+from scripts.social import tiktok_metrics
+from scripts.fundraising import donation_store
+
+
+class TestIncrementalReports(unittest.TestCase):
+    """Tests pour la régénération incrémentale des rapports."""
+
+    def setUp(self):
+        """Préparation d'un répertoire de rapports temporaire."""
+        self.reports_dir = tempfile.mkdtemp()
+        self.patcher = patch.object(generate_reports, 'REPORTS_DIR', self.reports_dir)
+        self.patcher.start()
+        self.data = {
+            "campaign_title": "PattesThai Test Campaign",
+            "goal_amount": 10000,
+            "current_amount": 2500,
+            "donor_count": 15,
+            "last_updated": datetime(2025, 1, 1).isoformat(),
+            "status": "Active"
+        }
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        self.patcher.stop()
+        shutil.rmtree(self.reports_dir, ignore_errors=True)
+
+    def test_unchanged_inputs_are_skipped(self):
+        """Vérifie qu'un rapport et un graphique inchangés ne sont pas régénérés."""
+        with patch.object(charts, 'render_chart', wraps=charts.render_chart) as render, \
+                patch.object(generate_reports, '_write_funding_report',
+                             wraps=generate_reports._write_funding_report) as write:
+            generate_reports.generate_funding_report(self.data)
+            generate_reports.generate_funding_report(self.data)
+            self.assertEqual(write.call_count, 1)
+            self.assertEqual(render.call_count, 1)
+
+            generate_reports.generate_funding_report(self.data, force=True)
+            self.assertEqual(write.call_count, 2)
+            self.assertEqual(render.call_count, 2)
+
+    def test_new_timestamp_alone_is_skipped(self):
+        """Vérifie qu'un relevé qui ne change que l'horodatage (campagne non lancée) ne régénère pas le rapport."""
+        with patch.object(generate_reports, 'generate_funding_chart'), \
+                patch.object(generate_reports, '_write_funding_report',
+                             wraps=generate_reports._write_funding_report) as write:
+            generate_reports.generate_funding_report(self.data)
+            self.data['last_updated'] = datetime(2025, 1, 2).isoformat()
+            generate_reports.generate_funding_report(self.data)
+            self.assertEqual(write.call_count, 1)
+
+    def test_changed_inputs_are_regenerated(self):
+        """Vérifie qu'un changement des données ou du gabarit provoque la régénération."""
+        with patch.object(generate_reports, 'generate_funding_chart'), \
+                patch.object(generate_reports, '_write_funding_report',
+                             wraps=generate_reports._write_funding_report) as write:
+            generate_reports.generate_funding_report(self.data)
+            self.data['current_amount'] = 3000
+            generate_reports.generate_funding_report(self.data)
+            self.assertEqual(write.call_count, 2)
+
+            with patch.object(generate_reports, 'FUNDING_REPORT_VERSION', 99):
+                generate_reports.generate_funding_report(self.data)
+            self.assertEqual(write.call_count, 3)
+
+    def test_unchanged_exports_are_not_reread(self):
+        """Vérifie que les exports TikTok ne sont relus que si l'un d'eux a changé."""
+        exports_dir = os.path.join(self.reports_dir, 'tiktok')
+        os.makedirs(os.path.join(exports_dir, 'rayong'))
+        export = os.path.join(exports_dir, 'rayong', '2025-01.csv')
+        with open(export, 'w', encoding='utf-8') as f:
+            f.write("Video title,Video views\nSauvetage à Rayong,1200\n")
+        with patch.object(tiktok_metrics, 'EXPORTS_DIR', exports_dir), \
+                patch.object(tiktok_metrics, 'ingest_exports', wraps=tiktok_metrics.ingest_exports) as ingest:
+            generate_reports.generate_social_media_report()
+            generate_reports.generate_social_media_report()
+            self.assertEqual(ingest.call_count, 1)
+            with open(export, 'a', encoding='utf-8') as f:
+                f.write("Adoption de Noi,300\n")
+            generate_reports.generate_social_media_report()
+            self.assertEqual(ingest.call_count, 2)
+        with open(os.path.join(self.reports_dir, 'social_media_report.md'), encoding='utf-8') as f:
+            self.assertIn('**Vues totales**: 1500', f.read())
+
+    def test_missing_output_is_regenerated(self):
+        """Vérifie qu'un artefact supprimé est régénéré même si le manifeste est à jour."""
+        generate_reports.generate_social_media_report()
+        os.remove(os.path.join(self.reports_dir, 'social_media_report.md'))
+        generate_reports.generate_social_media_report()
+        self.assertTrue(os.path.exists(os.path.join(self.reports_dir, 'social_media_report.md')))
+
+
+class TestChartRenderer(unittest.TestCase):
+    """Tests pour le rendu des graphiques par lots."""
+
+    def setUp(self):
+        """Préparation d'un répertoire de sortie temporaire et de spécifications."""
+        self.output_dir = tempfile.mkdtemp()
+        self.specs = [
+            {"name": "progress", "kind": "pie", "title": "Progression", "format": "svg",
+             "data": {"labels": ['Collecté', 'Restant'], "values": [2500, 7500]}},
+            {"name": "daily", "kind": "line", "title": "Dons", "format": "svg",
+             "data": {"x": [1, 2, 3], "series": [{"label": "€/jour", "values": [10, 20, 15]}]}},
+            {"name": "sources", "kind": "bar", "title": "Sources", "format": "png", "dpi": 50,
+             "data": {"labels": ['gofundme', 'leetchi'], "values": [2000, 500]}},
+        ]
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_batch_is_rendered_in_parallel(self):
+        """Vérifie le rendu d'un lot de graphiques dans un pool de processus."""
+        rendered = charts.render_charts(self.specs, self.output_dir, max_workers=2)
+        self.assertEqual(set(rendered), {'progress.svg', 'daily.svg', 'sources.png'})
+        with open(os.path.join(self.output_dir, 'progress.svg'), encoding='utf-8') as f:
+            self.assertIn('<svg', f.read())
+        with open(os.path.join(self.output_dir, 'sources.png'), 'rb') as f:
+            self.assertEqual(f.read(8), b'\x89PNG\r\n\x1a\n')
+
+    def test_workers_are_not_forked(self):
+        """Vérifie que le pool de rendu n'utilise pas fork (appelé depuis les fils de la chaîne)."""
+        with patch.object(charts, 'ProcessPoolExecutor', wraps=charts.ProcessPoolExecutor) as pool:
+            charts.render_charts(self.specs, self.output_dir, max_workers=2)
+        self.assertNotEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'fork')
+
+    def test_only_changed_specs_are_rendered(self):
+        """Vérifie que seuls les graphiques dont la spécification a changé sont redessinés."""
+        charts.render_charts(self.specs, self.output_dir, max_workers=1)
+        self.specs[1]['data']['series'][0]['values'] = [10, 20, 30]
+        with patch.object(charts, 'render_chart', wraps=charts.render_chart) as render:
+            charts.render_charts(self.specs, self.output_dir, max_workers=1)
+            self.assertEqual([call.args[0]['name'] for call in render.call_args_list], ['daily'])
+            charts.render_charts(self.specs, self.output_dir, max_workers=1)
+            self.assertEqual(render.call_count, 1)
+            charts.render_charts(self.specs, self.output_dir, force=True, max_workers=1)
+            self.assertEqual(render.call_count, 4)
+
+    def test_svg_output_is_reproducible(self):
+        """Vérifie qu'une même spécification produit un SVG identique."""
+        first = os.path.join(self.output_dir, charts.render_chart(self.specs[0], self.output_dir))
+        with open(first, 'rb') as f:
+            content = f.read()
+        charts.render_chart(self.specs[0], self.output_dir)
+        with open(first, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+
+class TestDocsDeltaSync(unittest.TestCase):
+    """Tests pour la synchronisation incrémentale des rapports vers la documentation."""
+
+    def setUp(self):
+        """Préparation de répertoires source et destination temporaires."""
+        self.root = tempfile.mkdtemp()
+        self.reports_dir = os.path.join(self.root, 'reports')
+        self.docs_dir = os.path.join(self.root, 'docs_reports')
+        os.makedirs(self.reports_dir)
+        self.patchers = [
+            patch.object(update_docs_with_reports, 'REPORTS_DIR', self.reports_dir),
+            patch.object(update_docs_with_reports, 'DOCS_REPORTS_DIR', self.docs_dir),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _write_report(self, filename, content):
+        with open(os.path.join(self.reports_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def test_only_changed_files_are_copied(self):
+        """Vérifie que seuls les rapports modifiés sont copiés et que l'index reste intact."""
+        self._write_report('funding_report.md', '# Financement')
+        self._write_report('social_media_report.md', '# Social')
+        summary = update_docs_with_reports.update_documentation_with_reports()
+        self.assertEqual(summary['added'], ['funding_report.md', 'social_media_report.md'])
+        self.assertTrue(summary['index_updated'])
+
+        self._write_report('funding_report.md', '# Financement mis à jour')
+        summary = update_docs_with_reports.update_documentation_with_reports()
+        self.assertEqual(summary['updated'], ['funding_report.md'])
+        self.assertEqual(summary['unchanged'], ['social_media_report.md'])
+        self.assertFalse(summary['index_updated'])
+        with open(os.path.join(self.docs_dir, 'funding_report.md'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), '# Financement mis à jour')
+
+    def test_hardlinked_docs_change_only_on_sync(self):
+        """Vérifie qu'en mode lien physique, la réécriture d'un rapport ne modifie pas la documentation."""
+        generate_reports.write_report('funding_report.md', '# Financement', self.reports_dir)
+        with patch.object(update_docs_with_reports, 'LINK_MODE', 'hardlink'):
+            update_docs_with_reports.update_documentation_with_reports()
+            destination = os.path.join(self.docs_dir, 'funding_report.md')
+            self.assertTrue(os.path.samefile(destination, os.path.join(self.reports_dir, 'funding_report.md')))
+
+            generate_reports.write_report('funding_report.md', '# Financement mis à jour', self.reports_dir)
+            with open(destination, encoding='utf-8') as f:
+                self.assertEqual(f.read(), '# Financement')
+            summary = update_docs_with_reports.update_documentation_with_reports()
+        self.assertEqual(summary['updated'], ['funding_report.md'])
+        with open(destination, encoding='utf-8') as f:
+            self.assertEqual(f.read(), '# Financement mis à jour')
+
+    def test_identical_content_is_not_copied(self):
+        """Vérifie qu'un rapport réécrit à l'identique n'est pas recopié."""
+        self._write_report('funding_report.md', '# Financement')
+        update_docs_with_reports.update_documentation_with_reports()
+        destination = os.path.join(self.docs_dir, 'funding_report.md')
+        mtime = os.stat(destination).st_mtime_ns
+
+        self._write_report('funding_report.md', '# Financement')
+        os.utime(os.path.join(self.reports_dir, 'funding_report.md'), ns=(0, 0))
+        summary = update_docs_with_reports.update_documentation_with_reports()
+        self.assertEqual(summary['unchanged'], ['funding_report.md'])
+        self.assertEqual(os.stat(destination).st_mtime_ns, mtime)
+
+    def test_stale_reports_are_removed(self):
+        """Vérifie la suppression des rapports disparus et la mise à jour de l'index."""
+        self._write_report('funding_report.md', '# Financement')
+        self._write_report('old_report.md', '# Ancien')
+        update_docs_with_reports.update_documentation_with_reports()
+
+        os.remove(os.path.join(self.reports_dir, 'old_report.md'))
+        summary = update_docs_with_reports.update_documentation_with_reports()
+        self.assertEqual(summary['removed'], ['old_report.md'])
+        self.assertTrue(summary['index_updated'])
+        self.assertFalse(os.path.exists(os.path.join(self.docs_dir, 'old_report.md')))
+        with open(os.path.join(self.docs_dir, 'index.md'), encoding='utf-8') as f:
+            self.assertNotIn('old_report.md', f.read())
+
+    def test_charts_are_published_as_optimized_variants(self):
+        """Vérifie que les graphiques PNG sont publiés en variantes optimisées, référencées par l'index."""
+        from PIL import Image
+
+        self._write_report('funding_report.md', '# Financement')
+        Image.new('RGB', (3000, 1800), '#4CAF50').save(os.path.join(self.reports_dir, 'funding_progress.png'))
+        summary = update_docs_with_reports.update_documentation_with_reports()
+        self.assertEqual(summary['images']['optimized'], ['funding_progress.png'])
+        self.assertFalse(os.path.exists(os.path.join(self.docs_dir, 'funding_progress.png')))
+        self.assertTrue(os.path.exists(os.path.join(self.docs_dir, 'images', 'funding_progress-png-thumb.webp')))
+        with open(os.path.join(self.docs_dir, 'index.md'), encoding='utf-8') as f:
+            index = f.read()
+        self.assertIn('<a href="images/funding_progress-png-full.webp">', index)
+        self.assertIn('src="images/funding_progress-png-thumb.png"', index)
+
+        summary = update_docs_with_reports.update_documentation_with_reports()
+        self.assertEqual(summary['images']['cached'], ['funding_progress.png'])
+        self.assertFalse(summary['index_updated'])
+
+
+class TestDocsPages(unittest.TestCase):
+    """Tests de l'extension MkDocs qui rend les pages en mémoire."""
+
+    def setUp(self):
+        """Préparation des données publiées et des rapports dans un répertoire temporaire."""
+        self.root = tempfile.mkdtemp()
+        self.docs_dir = os.path.join(self.root, 'docs')
+        self.reports_dir = os.path.join(self.root, 'reports')
+        self.output_dir = os.path.join(self.docs_dir, 'campaign', 'data')
+        os.makedirs(os.path.join(self.reports_dir, 'rayong'))
+        os.makedirs(self.output_dir)
+        self.patchers = [
+            patch.object(update_docs_with_reports, 'REPORTS_DIR', self.reports_dir),
+            patch.object(update_docs_with_reports, 'DOCS_REPORTS_DIR', os.path.join(self.docs_dir, 'reports')),
+            patch.object(update_fundraising_data, 'OUTPUT_DIR', self.output_dir),
+            patch.object(expense_ledger, 'LEDGER_DIR', os.path.join(self.root, 'expenses')),
+            patch.object(images, 'PHOTOS_OUTPUT_DIR', os.path.join(self.docs_dir, 'campaign', 'photos')),
+            patch.object(badges, 'BADGES_DIR', os.path.join(self.docs_dir, 'campaign', 'badges')),
+            patch.dict(docs_pages._rendered, clear=True),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        with open(os.path.join(self.output_dir, 'funding_data.json'), 'w', encoding='utf-8') as f:
+            f.write('{"campaign_title": "PattesThai", "goal_amount": 1000, "current_amount": 250, '
+                    '"donor_count": 3, "status": "Active", "last_updated": "2025-01-01T00:00:00"}')
+        self._write_report('funding_report.md', '# Financement')
+        self._write_report('rayong/funding_report.md', '# Financement Rayong')
+        site_reports.write_index_manifest(['rayong'], self.reports_dir)
+        os.makedirs(os.path.join(self.root, 'expenses'))
+        with open(os.path.join(self.root, 'expenses', '2025.csv'), 'w', encoding='utf-8') as f:
+            f.write('date,amount,category,description,site\n2025-02-10,80,nourriture,Croquettes,rayong\n')
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _write_report(self, filename, content):
+        path = os.path.join(self.reports_dir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # Date de modification distincte à chaque écriture
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def _config(self):
+        from mkdocs.config import load_config
+
+        # Configuration réelle: l'extension est chargée comme dans mkdocs.yml
+        config_file = os.path.join(self.root, 'mkdocs.yml')
+        with open(config_file, 'w', encoding='utf-8') as f:
+            f.write(f"site_name: PattesThai\nhooks:\n  - {os.path.abspath(docs_pages.__file__)}\n")
+        config = load_config(config_file, docs_dir=self.docs_dir, site_dir=os.path.join(self.root, 'site'))
+        hooks = list(config.hooks.values())
+        for hook in hooks:
+            patcher = patch.dict(hook._rendered, clear=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return config
+
+    def test_only_changed_pages_are_rendered(self):
+        """Vérifie que seules les pages dont les entrées ont changé sont rendues à nouveau."""
+        pages = docs_pages.render_pages()
+        self.assertEqual(sorted(pages), ['campaign/data/funding_status.md', 'reports/funding_report.md',
+                                         'reports/index.md', 'reports/rayong/funding_report.md'])
+        self.assertTrue(all(changed for _, changed in pages.values()))
+        self.assertIn('- **Montant actuel**: 250 €', pages['campaign/data/funding_status.md'][0])
+        self.assertIn('- [Financement](./rayong/funding_report.md)', pages['reports/index.md'][0])
+        # Registre des dépenses lu sans écrire de point de contrôle
+        self.assertIn('1 dépenses enregistrées pour 80.00 €', pages['campaign/data/funding_status.md'][0])
+        self.assertEqual(os.listdir(os.path.join(self.root, 'expenses')), ['2025.csv'])
+
+        with patch.object(update_docs_with_reports, 'render_reports_index') as render_index:
+            pages = docs_pages.render_pages()
+        render_index.assert_not_called()
+        self.assertFalse(any(changed for _, changed in pages.values()))
+
+        self._write_report('rayong/funding_report.md', '# Financement Rayong mis à jour')
+        pages = docs_pages.render_pages()
+        self.assertEqual([uri for uri, (_, changed) in pages.items() if changed], ['reports/rayong/funding_report.md'])
+        self.assertEqual(pages['reports/rayong/funding_report.md'][0], '# Financement Rayong mis à jour')
+
+        os.remove(os.path.join(self.reports_dir, 'rayong', 'funding_report.md'))
+        pages = docs_pages.render_pages()
+        self.assertNotIn('reports/rayong/funding_report.md', pages)
+        self.assertTrue(pages['reports/index.md'][1])
+
+    def test_generated_pages_replace_docs_files(self):
+        """Vérifie que les pages générées remplacent les fichiers de docs/ et ne sont reconstruites que si besoin."""
+        from mkdocs.structure.files import get_files
+
+        os.makedirs(os.path.join(self.docs_dir, 'reports'))
+        with open(os.path.join(self.docs_dir, 'reports', 'funding_report.md'), 'w', encoding='utf-8') as f:
+            f.write('# Copie périmée')
+        with open(os.path.join(self.reports_dir, 'funding_progress.svg'), 'w', encoding='utf-8') as f:
+            f.write('<svg xmlns="http://www.w3.org/2000/svg"/>')
+        config = self._config()
+
+        config.plugins.on_pre_build(config=config)
+        files = config.plugins.on_files(get_files(config), config=config)
+        report = files.get_file_from_path('reports/funding_report.md')
+        self.assertEqual(report.content_string, '# Financement')
+        self.assertEqual([f.src_uri for f in files if f.src_uri == 'reports/funding_report.md'],
+                         ['reports/funding_report.md'])
+        self.assertIsNotNone(files.get_file_from_path('reports/funding_progress.svg'))
+        # Badge de progression créé avant l'inventaire de docs/
+        self.assertTrue(any(f.src_uri.startswith('campaign/badges/bar-25-') for f in files))
+        self.assertTrue(report.is_modified())
+
+        os.makedirs(os.path.dirname(report.abs_dest_path), exist_ok=True)
+        open(report.abs_dest_path, 'w').close()
+        config.plugins.on_pre_build(config=config)
+        files = config.plugins.on_files(get_files(config), config=config)
+        self.assertFalse(files.get_file_from_path('reports/funding_report.md').is_modified())
+        self.assertTrue(files.get_file_from_path('reports/index.md').is_modified())
+
+
+class TestSiteReports(unittest.TestCase):
+    """Tests pour la génération des rapports par site."""
+
+    def setUp(self):
+        """Redirection des rapports, de l'historique et des exports vers un répertoire temporaire."""
+        self.root = tempfile.mkdtemp()
+        self.reports_dir = os.path.join(self.root, 'reports')
+        self.docs_dir = os.path.join(self.root, 'docs_reports')
+        os.makedirs(os.path.join(self.root, 'tiktok', 'rayong'))
+        with open(os.path.join(self.root, 'tiktok', 'rayong', '2025-01.csv'), 'w', encoding='utf-8') as f:
+            f.write("Video title,Video views,Likes,Shares,Comments\nSauvetage à Rayong,1200,80,5,3\n")
+        os.makedirs(os.path.join(self.root, 'expenses'))
+        with open(os.path.join(self.root, 'expenses', '2025.csv'), 'w', encoding='utf-8') as f:
+            f.write("date,amount,category,description,site\n2025-01-03,150,vet,Vaccins,Rayong\n"
+                    "2025-01-04,50,food,Croquettes,khon-kaen\n")
+        self.patchers = [
+            patch.object(generate_reports, 'REPORTS_DIR', self.reports_dir),
+            patch.object(update_docs_with_reports, 'REPORTS_DIR', self.reports_dir),
+            patch.object(update_docs_with_reports, 'DOCS_REPORTS_DIR', self.docs_dir),
+            patch.object(funding_history, 'HISTORY_DIR', os.path.join(self.root, 'history')),
+            patch.object(tiktok_metrics, 'EXPORTS_DIR', os.path.join(self.root, 'tiktok')),
+            patch.object(expense_ledger, 'LEDGER_DIR', os.path.join(self.root, 'expenses')),
+            patch.object(site_reports.multi_fetch, 'load_campaigns', return_value=[]),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    @staticmethod
+    def _data(rayong_amount=1500):
+        return {
+            "campaign_title": "PattesThai", "goal_amount": 20000, "current_amount": 1000 + rayong_amount,
+            "donor_count": 30, "last_updated": datetime(2025, 1, 1).isoformat(), "status": "Active",
+            "sources": {
+                "gofundme:pattesthai-khon-kaen": {"site": "khon-kaen", "goal_amount": 10000, "current_amount": 1000,
+                                                  "donor_count": 10, "status": "Active"},
+                "leetchi:pattesthai-rayong": {"site": "rayong", "goal_amount": 10000, "current_amount": rayong_amount,
+                                              "donor_count": 20, "status": "Active"}
+            }
+        }
+
+    def test_every_site_and_report_type_is_rendered(self):
+        """Vérifie le rendu parallèle de chaque combinaison site × type de rapport."""
+        summary = site_reports.generate_site_reports(self._data(), max_workers=2)
+        self.assertEqual(summary['sites'], ['khon-kaen', 'rayong'])
+        self.assertEqual(sorted(summary['generated']),
+                         ['khon-kaen/expenses_report.md', 'khon-kaen/funding_report.md',
+                          'khon-kaen/social_media_report.md', 'rayong/expenses_report.md',
+                          'rayong/funding_report.md', 'rayong/social_media_report.md'])
+        with open(os.path.join(self.reports_dir, 'rayong', 'funding_report.md'), encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn('# Rapport de Financement PattesThai - Rayong', report)
+        self.assertIn('**Montant actuel**: 1500 €', report)
+        with open(os.path.join(self.reports_dir, 'rayong', 'social_media_report.md'), encoding='utf-8') as f:
+            self.assertIn('**Vues totales**: 1200', f.read())
+        with open(os.path.join(self.reports_dir, 'rayong', 'expenses_report.md'), encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn('**Montant**: 150.00 €', report)
+        self.assertIn('**Part des dépenses de la campagne**: 75.0%', report)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'expenses', expense_ledger.CHECKPOINT_FILE)))
+
+        manifest = site_reports.load_index_manifest(self.reports_dir)
+        self.assertEqual(manifest['sites']['khon-kaen'],
+                         {"title": "Khon Kaen", "reports": {"funding": "khon-kaen/funding_report.md",
+                                                            "social": "khon-kaen/social_media_report.md",
+                                                            "expenses": "khon-kaen/expenses_report.md"}})
+
+    def test_only_stale_site_reports_are_rendered(self):
+        """Vérifie que seuls les rapports des sites modifiés sont régénérés."""
+        site_reports.generate_site_reports(self._data(), max_workers=1)
+        summary = site_reports.generate_site_reports(self._data(1800), max_workers=1)
+        self.assertEqual(summary['generated'], ['rayong/funding_report.md'])
+        self.assertEqual(len(summary['cached']), 5)
+
+        site_reports.generate_site_reports(self._data(), sites=['rayong'], max_workers=1)
+        self.assertFalse(os.path.exists(os.path.join(self.reports_dir, 'khon-kaen')))
+
+    def test_docs_index_follows_the_manifest(self):
+        """Vérifie la synchronisation des sous-répertoires et l'index hiérarchique de la documentation."""
+        os.makedirs(self.reports_dir)
+        with open(os.path.join(self.reports_dir, 'funding_report.md'), 'w', encoding='utf-8') as f:
+            f.write('# Financement')
+        site_reports.generate_site_reports(self._data(), max_workers=1)
+        summary = update_docs_with_reports.update_documentation_with_reports()
+        self.assertIn('rayong/funding_report.md', summary['added'])
+        self.assertTrue(os.path.exists(os.path.join(self.docs_dir, 'khon-kaen', 'social_media_report.md')))
+        with open(os.path.join(self.docs_dir, 'index.md'), encoding='utf-8') as f:
+            index = f.read()
+        self.assertIn('### Rapports de Financement\n\n- [Funding Report](./funding_report.md)', index)
+        self.assertIn('### Rayong\n\n- [Financement](./rayong/funding_report.md)\n'
+                      '- [Réseaux sociaux](./rayong/social_media_report.md)\n'
+                      '- [Dépenses](./rayong/expenses_report.md)', index)
+        self.assertNotIn('Autres Rapports', index)
+
+        site_reports.generate_site_reports(self._data(), sites=['rayong'], max_workers=1)
+        summary = update_docs_with_reports.update_documentation_with_reports()
+        self.assertIn('khon-kaen/funding_report.md', summary['removed'])
+        self.assertFalse(os.path.exists(os.path.join(self.docs_dir, 'khon-kaen')))
+
+
+class TestImageOptimization(unittest.TestCase):
+    """Tests pour la production des variantes optimisées des images."""
+
+    def setUp(self):
+        """Création d'une image source dans un répertoire temporaire."""
+        from PIL import Image
+
+        self.root = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.root, 'out')
+        self.sources = [os.path.join(self.root, 'chart.png'), os.path.join(self.root, 'photo.jpg')]
+        Image.new('RGBA', (2400, 1200), (76, 175, 80, 255)).save(self.sources[0])
+        Image.new('RGB', (800, 600), '#3F51B5').save(self.sources[1])
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_variants_are_resized_without_upscaling(self):
+        """Vérifie les dimensions des variantes et le contenu du manifeste."""
+        summary = images.optimize_images(self.sources, self.output_dir, max_workers=2)
+        self.assertEqual(sorted(summary['optimized']), ['chart.png', 'photo.jpg'])
+        manifest = images.load_manifest(self.output_dir)
+        chart = manifest['chart.png']
+        self.assertEqual((chart['width'], chart['height']), (2400, 1200))
+        self.assertEqual(images.pick_variant(chart, 'full')['file'], 'chart-png-full.webp')
+        self.assertEqual((images.pick_variant(chart, 'full')['width'], images.pick_variant(chart, 'full')['height']),
+                         (1200, 600))
+        self.assertEqual(images.pick_variant(chart, 'thumb', ('png',))['width'], 320)
+        self.assertEqual(images.pick_variant(manifest['photo.jpg'], 'full')['width'], 800)
+        for entry in manifest.values():
+            for formats in entry['variants'].values():
+                for variant in formats.values():
+                    self.assertTrue(os.path.exists(os.path.join(self.output_dir, variant['file'])))
+
+    def test_only_changed_images_are_processed(self):
+        """Vérifie le cache par empreinte et la suppression des variantes d'une image disparue."""
+        from PIL import Image
+
+        images.optimize_images(self.sources, self.output_dir, max_workers=1)
+        summary = images.optimize_images(self.sources, self.output_dir, max_workers=1)
+        self.assertEqual(summary['optimized'], [])
+        self.assertEqual(sorted(summary['cached']), ['chart.png', 'photo.jpg'])
+
+        Image.new('RGB', (800, 600), '#FF9800').save(self.sources[1])
+        summary = images.optimize_images(self.sources, self.output_dir, max_workers=1)
+        self.assertEqual(summary['optimized'], ['photo.jpg'])
+
+        summary = images.optimize_images(self.sources[:1], self.output_dir, max_workers=1)
+        self.assertEqual(summary['removed'], ['photo.jpg'])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'photo-jpg-full.webp')))
+
+    def test_picture_html_offers_webp_with_png_fallback(self):
+        """Vérifie la balise <picture> produite à partir du manifeste."""
+        images.optimize_images(self.sources[:1], self.output_dir, max_workers=1)
+        html = images.picture_html(images.load_manifest(self.output_dir)['chart.png'], 'Progression', 'thumb', 'img')
+        self.assertIn('<source srcset="img/chart-png-thumb.webp" type="image/webp">', html)
+        self.assertIn('<img src="img/chart-png-thumb.png" alt="Progression" width="320" height="160" loading="lazy">',
+                      html)
+
+    def test_same_stem_with_other_extension_keeps_its_variants(self):
+        """Vérifie que photo.png et photo.jpg produisent des variantes distinctes."""
+        from PIL import Image
+
+        other = os.path.join(self.root, 'photo.png')
+        Image.new('RGB', (640, 480), '#FF9800').save(other)
+        images.optimize_images(self.sources + [other], self.output_dir, max_workers=1)
+        manifest = images.load_manifest(self.output_dir)
+        jpg, png = (images.pick_variant(manifest[name], 'full') for name in ('photo.jpg', 'photo.png'))
+        self.assertNotEqual(jpg['file'], png['file'])
+        self.assertEqual((jpg['width'], png['width']), (800, 640))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, jpg['file'])))
+
+    def test_pool_workers_are_not_forked(self):
+        """Vérifie que le pool de traitement n'utilise pas fork (appelé depuis les fils de la chaîne)."""
+        with patch.object(images, 'ProcessPoolExecutor', wraps=images.ProcessPoolExecutor) as pool:
+            images.optimize_images(self.sources, self.output_dir, max_workers=2)
+        self.assertNotEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'fork')
+
+
+class TestDonationAnalytics(unittest.TestCase):
+    """Tests pour l'analyse des séries temporelles de dons."""
+
+    def setUp(self):
+        """Création d'un journal de dons temporaire."""
+        self.events_dir = tempfile.mkdtemp()
+        # 10 jours de dons: 100 € par jour sur GoFundMe, 50 € un jour sur deux sur Leetchi
+        events = []
+        for day in range(10):
+            timestamp = datetime(2025, 3, 1 + day, 12, tzinfo=timezone.utc).isoformat()
+            events.append({"type": "donation", "source": "gofundme", "amount": 100, "timestamp": timestamp})
+            if day % 2 == 0:
+                events.append({"type": "donation", "source": "leetchi", "amount": 50, "timestamp": timestamp})
+        events.append({"type": "campaign", "source": "gofundme", "goal_amount": 5000})
+        donation_store.append_events(events, self.events_dir)
+        self.today = datetime(2025, 3, 10)
+
+    def tearDown(self):
+        """Suppression du journal temporaire."""
+        shutil.rmtree(self.events_dir, ignore_errors=True)
+
+    def test_indicators(self):
+        """Vérifie la vitesse, la répartition par source et la projection."""
+        analytics = donation_analytics.analyze_donations(5000, 1250, self.events_dir, today=self.today)
+        self.assertEqual(analytics['donation_count'], 15)
+        self.assertEqual(analytics['total_amount'], 1250)
+        self.assertAlmostEqual(analytics['velocity_7d'], (700 + 3 * 50) / 7, places=2)
+        self.assertEqual([s['source'] for s in analytics['sources']], ['gofundme', 'leetchi'])
+        self.assertAlmostEqual(analytics['sources'][0]['share'], 0.8)
+        # 3750 € restants à 121,43 €/jour: 31 jours
+        self.assertEqual(analytics['projected_completion'], '2025-04-10')
+        # 25% collectés pour 10% du temps écoulé
+        self.assertEqual(analytics['pace'], donation_analytics.PACE_AHEAD)
+
+    def test_aggregates_are_incremental(self):
+        """Vérifie que seuls les nouveaux dons sont lus lors du calcul suivant."""
+        donation_analytics.load_daily_aggregates(self.events_dir)
+        donation_store.append_events([{"type": "donation", "source": "gofundme", "amount": 30,
+                                       "timestamp": datetime(2025, 3, 10, 18, tzinfo=timezone.utc).isoformat()}], self.events_dir)
+        with patch.object(donation_analytics, '_aggregate_chunk',
+                          wraps=donation_analytics._aggregate_chunk) as aggregate:
+            daily = donation_analytics.load_daily_aggregates(self.events_dir)
+            self.assertEqual(aggregate.call_count, 1)
+            self.assertEqual(len(aggregate.call_args.args[1]), 1)
+        self.assertEqual(daily['sum'].sum(), 1280)
+        self.assertEqual(daily.loc[(datetime(2025, 3, 10), 'gofundme'), 'sum'], 130)
+
+    def test_naive_timestamps_use_the_history_day(self):
+        """Vérifie qu'un don sans fuseau horaire est compté le même jour que dans l'historique du financement."""
+        timestamp = datetime(2025, 3, 10, 23, 30).isoformat()
+        daily = donation_analytics._aggregate_chunk([timestamp], [10], ['gofundme'])
+        epoch = funding_history.to_epoch(timestamp)
+        day = datetime.fromtimestamp(epoch - epoch % 86400, timezone.utc).replace(tzinfo=None)
+        self.assertEqual(list(daily.index), [(day, 'gofundme')])
+
+    def test_chunks_match_single_pass(self):
+        """Vérifie que l'agrégation par blocs donne le même résultat qu'en une fois."""
+        chunked = donation_analytics.load_daily_aggregates(self.events_dir, chunk_rows=4)
+        os.remove(os.path.join(self.events_dir, donation_analytics.AGGREGATES_FILE))
+        single = donation_analytics.load_daily_aggregates(self.events_dir)
+        self.assertTrue(chunked.sort_index().equals(single.sort_index()))
+
+    def test_concurrent_updates_share_the_aggregates(self):
+        """Vérifie que des calculs simultanés (rapport et graphique) ne se gênent pas."""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: donation_analytics.load_daily_aggregates(self.events_dir),
+                                        range(8)))
+        self.assertTrue(all(daily['sum'].sum() == 1250 for daily in results))
+        self.assertEqual(sorted(name for name in os.listdir(self.events_dir) if name.endswith('.tmp')), [])
+        with patch.object(donation_analytics, '_aggregate_chunk') as aggregate:
+            donation_analytics.load_daily_aggregates(self.events_dir)
+            aggregate.assert_not_called()
+
+    def test_report_uses_real_numbers(self):
+        """Vérifie que la section d'analyse du rapport reprend les indicateurs."""
+        analytics = donation_analytics.analyze_donations(5000, 1250, self.events_dir, today=self.today)
+        text = generate_reports._format_analysis({"current_amount": 1250}, analytics)
+        self.assertIn('en avance', text)
+        self.assertIn('gofundme (80.0%, 10 dons)', text)
+        self.assertIn('2025-04-10', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
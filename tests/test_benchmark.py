@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests unitaires pour les mesures de performance.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Ajout du répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts import benchmark
+from scripts.fundraising import donation_store
+
+
+class TestBenchmark(unittest.TestCase):
+    """Tests pour la suite de mesures de performance."""
+
+    def setUp(self):
+        """Création d'un répertoire temporaire pour les résultats."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.baseline = os.path.join(self.tmp_dir, 'baseline.json')
+        self.output = os.path.join(self.tmp_dir, 'results.json')
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_donation_generator_is_deterministic(self):
+        """Vérifie que les dons synthétiques sont reproductibles."""
+        first = os.path.join(self.tmp_dir, 'a')
+        second = os.path.join(self.tmp_dir, 'b')
+        benchmark.generate_donations(100, first)
+        benchmark.generate_donations(100, second)
+        state = donation_store.refresh_state(first)
+        self.assertEqual(state['donation_count'], 100)
+        self.assertEqual(state, donation_store.refresh_state(second))
+
+    def test_compare_ignores_noise_and_flags_regressions(self):
+        """Vérifie la détection des régressions au-delà du seuil."""
+        baseline = {"results": {"a": {"seconds": 1.0, "peak_kib": 1000},
+                                "b": {"seconds": 0.001, "peak_kib": 10}}}
+        results = {"results": {"a": {"seconds": 1.2, "peak_kib": 2000},
+                               "b": {"seconds": 0.004, "peak_kib": 40},
+                               "c": {"seconds": 9.0, "peak_kib": 1}}}
+        regressions = benchmark.compare(results, baseline, threshold=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('a (peak_kib)'))
+        self.assertEqual(len(benchmark.compare(results, baseline, threshold=0.1)), 2)
+
+    def test_run_saves_baseline_then_fails_on_regression(self):
+        """Vérifie l'enregistrement de la référence et l'échec en cas de régression."""
+        cwd = os.getcwd()
+        args = ['--scale', '200', '--repeat', '1', '--only', 'load_funding_data', 'save_content_ideas',
+                'update_documentation_with_reports', '--baseline', self.baseline, '--output', self.output]
+        self.assertEqual(benchmark.main(args + ['--save-baseline']), 0)
+        self.assertEqual(os.getcwd(), cwd)
+        with open(self.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        self.assertEqual(set(baseline['results']),
+                         {'load_funding_data', 'save_content_ideas', 'update_documentation_with_reports'})
+
+        for result in baseline['results'].values():
+            result['seconds'] = 0.0
+            result['peak_kib'] = 0.0
+        with open(self.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f)
+        with patch.object(benchmark, 'MIN_DELTA_SECONDS', 0), patch.object(benchmark, 'MIN_DELTA_KIB', 0):
+            self.assertEqual(benchmark.main(args), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
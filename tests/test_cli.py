@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du point d'entrée unique et de son temps de démarrage à froid.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import unittest
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CLI = os.path.join(ROOT_DIR, 'scripts', 'pattesthai.py')
+
+sys.path.insert(0, ROOT_DIR)
+
+from scripts import pattesthai
+
+# Budget de démarrage à froid (secondes), ajustable pour les machines lentes
+STARTUP_BUDGET = float(os.environ.get('PATTESTHAI_STARTUP_BUDGET', '1.0'))
+HEAVY_MODULES = ('matplotlib', 'pandas', 'seaborn', 'numpy')
+
+
+class TestCommandLine(unittest.TestCase):
+    """Tests pour la ligne de commande pattesthai."""
+
+    def test_commands_do_not_import_heavy_libraries(self):
+        """Vérifie que le chargement des sous-commandes n'importe aucune bibliothèque lourde."""
+        code = (
+            "import sys; sys.path.insert(0, {root!r}); "
+            "import importlib; from scripts import pattesthai; "
+            "[importlib.import_module(m) for m, _ in pattesthai.COMMANDS.values()]; "
+            "print(','.join(sorted(m for m in {heavy!r} if m in sys.modules)))"
+        ).format(root=ROOT_DIR, heavy=HEAVY_MODULES)
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '')
+
+    def test_cold_start_budget(self):
+        """Vérifie que l'aide de la ligne de commande s'affiche dans le budget de démarrage."""
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, CLI, '--help'], capture_output=True, check=True)
+            timings.append(time.perf_counter() - start)
+        self.assertLess(min(timings), STARTUP_BUDGET,
+                        f"Démarrage à froid trop lent: {min(timings):.3f}s > {STARTUP_BUDGET}s")
+
+    def test_unknown_command_is_rejected(self):
+        """Vérifie qu'une sous-commande inconnue est refusée."""
+        result = subprocess.run([sys.executable, CLI, 'inconnue'], capture_output=True, text=True)
+        self.assertNotEqual(result.returncode, 0)
+
+    def test_subcommand_help_has_no_side_effects(self):
+        """Vérifie que l'aide d'une sous-commande ou un argument inattendu n'exécute pas la commande."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, 'reports'))
+            with open(os.path.join(tmp_dir, 'reports', 'funding_report.md'), 'w', encoding='utf-8') as f:
+                f.write('# Financement')
+            for command in pattesthai.COMMANDS:
+                result = subprocess.run([sys.executable, CLI, command, '--help'], cwd=tmp_dir,
+                                        capture_output=True, text=True)
+                self.assertEqual(result.returncode, 0, command)
+                self.assertIn('usage:', result.stdout)
+            result = subprocess.run([sys.executable, CLI, 'docs', '--inattendu'], cwd=tmp_dir,
+                                    capture_output=True, text=True)
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn('--inattendu', result.stderr)
+            self.assertEqual(os.listdir(tmp_dir), ['reports'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,10 @@ import unittest
 import os
 import sys
 import json
+import shutil
+import tempfile
+import time
+import http.client
 from unittest.mock import patch, MagicMock
 from datetime import datetime
 
@@ -24,6 +28,17 @@ except ImportError:
     # Si le module n'existe pas encore, ce test sera skippé
     pass
 
+from scripts.fundraising import donation_store
+from scripts.fundraising.gofundme_client import GoFundMeClient, create_session
+from scripts.fundraising.gofundme_stub import start_stub_server
+from scripts.fundraising import multi_fetch
+from scripts.fundraising import donor_sketch
+from scripts.fundraising.dashboard import start_dashboard, stop_dashboard
+from scripts.fundraising import update_fundraising_data
+from scripts.fundraising import badges
+from scripts.fundraising import funding_history
+from scripts.fundraising import expense_ledger
+
 class TestFundraising(unittest.TestCase):
     """Tests pour les fonctionnalités liées au financement participatif."""
 
@@ -66,11 +81,13 @@ class TestFundraising(unittest.TestCase):
 
     @unittest.skipIf('scripts.fundraising.update_fundraising_data' not in sys.modules, 
                     "Module de financement non disponible")
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_fetch_gofundme_data_with_api_key(self, mock_get):
         """Test de la récupération des données avec une clé API."""
         # Configuration du mock
         mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
         mock_response.json.return_value = self.test_data
         mock_get.return_value = mock_response
         
@@ -103,5 +120,764 @@ class TestFundraising(unittest.TestCase):
                 self.assertIn(str(self.test_data['goal_amount']), markdown_content)
                 self.assertIn(str(self.test_data['current_amount']), markdown_content)
 
+
+class TestDonationStore(unittest.TestCase):
+    """Tests pour le journal d'événements de dons."""
+
+    def setUp(self):
+        """Création d'un journal temporaire."""
+        self.events_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Suppression du journal temporaire."""
+        shutil.rmtree(self.events_dir, ignore_errors=True)
+
+    def test_append_rotates_segments(self):
+        """Vérifie qu'un nouveau segment est ouvert quand le précédent est plein."""
+        events = [{"type": "donation", "amount": 10} for _ in range(5)]
+        donation_store.append_events(events, self.events_dir, segment_max_events=2)
+        self.assertEqual(donation_store.list_segments(self.events_dir), [1, 2, 3])
+
+    def test_append_keeps_segment_count_and_caller_events(self):
+        """Vérifie que l'ajout ne recompte pas le segment courant et ne modifie pas les événements reçus."""
+        events = [{"type": "donation", "amount": 10} for _ in range(3)]
+        donation_store.append_events(events, self.events_dir, segment_max_events=4)
+        self.assertEqual(events, [{"type": "donation", "amount": 10}] * 3)
+        with patch.object(donation_store, '_count_lines', wraps=donation_store._count_lines) as count_lines:
+            donation_store.append_events(events, self.events_dir, segment_max_events=4)
+            count_lines.assert_not_called()
+        self.assertEqual(donation_store.list_segments(self.events_dir), [1, 2])
+
+        # Un segment complété par ailleurs est recompté
+        with open(donation_store._segment_path(self.events_dir, 2), 'a', encoding='utf-8') as f:
+            f.write('{"type": "donation", "amount": 5}\n' * 2)
+        donation_store.append_events(events[:1], self.events_dir, segment_max_events=4)
+        self.assertEqual(donation_store.list_segments(self.events_dir), [1, 2, 3])
+
+    def test_refresh_state_is_incremental(self):
+        """Vérifie que seuls les nouveaux événements sont appliqués au point de contrôle."""
+        donation_store.record_campaign_snapshot(
+            {"campaign_title": "Test", "goal_amount": 10000, "current_amount": 500,
+             "donor_count": 5, "status": "Active"}, events_dir=self.events_dir)
+        state = donation_store.refresh_state(self.events_dir)
+        self.assertEqual(state['current_amount'], 500)
+
+        donation_store.append_events([{"type": "donation", "amount": 50, "source": "leetchi"}],
+                                     self.events_dir)
+        with patch.object(donation_store, 'apply_event', wraps=donation_store.apply_event) as spy:
+            state = donation_store.refresh_state(self.events_dir)
+            self.assertEqual(spy.call_count, 1)
+        self.assertEqual(state['current_amount'], 550)
+        self.assertEqual(state['donor_count'], 6)
+        self.assertEqual(state['goal_amount'], 10000)
+
+        checkpoint = donation_store.load_checkpoint(self.events_dir)
+        self.assertEqual(checkpoint['events_applied'], 2)
+
+    def test_snapshots_alone_are_not_donations(self):
+        """Vérifie que des relevés de campagne seuls ne comptent pas comme des dons individuels."""
+        self.assertFalse(donation_store.has_donations(self.events_dir))
+        donation_store.record_campaign_snapshot({"goal_amount": 10000, "current_amount": 500},
+                                                events_dir=self.events_dir)
+        self.assertTrue(donation_store.has_events(self.events_dir))
+        self.assertFalse(donation_store.has_donations(self.events_dir))
+        donation_store.append_events([{"type": "donation", "amount": 50}], self.events_dir)
+        self.assertTrue(donation_store.has_donations(self.events_dir))
+
+    def test_partial_line_is_not_consumed(self):
+        """Vérifie qu'une ligne incomplète n'avance pas le point de contrôle."""
+        donation_store.append_events([{"type": "donation", "amount": 20}], self.events_dir)
+        with open(donation_store._segment_path(self.events_dir, 1), 'a', encoding='utf-8') as f:
+            f.write('{"type": "donation", "amo')
+        state = donation_store.refresh_state(self.events_dir)
+        self.assertEqual(state['current_amount'], 20)
+
+        with open(donation_store._segment_path(self.events_dir, 1), 'a', encoding='utf-8') as f:
+            f.write('unt": 30}\n')
+        state = donation_store.refresh_state(self.events_dir)
+        self.assertEqual(state['current_amount'], 50)
+
+    def test_partial_line_stops_before_later_segments(self):
+        """Vérifie qu'une ligne incomplète suivie d'un autre segment est relue une fois complétée."""
+        donation_store.append_events([{"type": "donation", "amount": 20}], self.events_dir)
+        with open(donation_store._segment_path(self.events_dir, 1), 'a', encoding='utf-8') as f:
+            f.write('{"type": "donation", "amo')
+        with open(donation_store._segment_path(self.events_dir, 2), 'w', encoding='utf-8') as f:
+            f.write('{"type": "donation", "amount": 5}\n')
+        self.assertEqual(donation_store.refresh_state(self.events_dir)['current_amount'], 20)
+
+        with open(donation_store._segment_path(self.events_dir, 1), 'a', encoding='utf-8') as f:
+            f.write('unt": 30}\n')
+        self.assertEqual(donation_store.refresh_state(self.events_dir)['current_amount'], 55)
+
+class TestGoFundMeClient(unittest.TestCase):
+    """Tests du client GoFundMe contre le serveur local."""
+
+    def setUp(self):
+        """Démarrage du serveur local et création d'un cache temporaire."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.tmp_dir, 'gofundme.json')
+        self.campaign = {"campaign_title": "PattesThai", "goal_amount": 10000,
+                         "current_amount": 1200, "donor_count": 8, "status": "Active"}
+        self.server = start_stub_server(campaigns={"pattesthai": self.campaign})
+
+    def tearDown(self):
+        """Arrêt du serveur et nettoyage."""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _client(self, **options):
+        return GoFundMeClient('test_key', base_url=self.server.base_url,
+                              cache_file=self.cache_file, **options)
+
+    def test_unchanged_campaign_returns_not_modified(self):
+        """Vérifie qu'une campagne inchangée est servie par une réponse 304."""
+        client = self._client()
+        self.assertEqual(client.get_campaign('pattesthai'), self.campaign)
+        self.assertEqual(client.get_campaign('pattesthai'), self.campaign)
+        self.assertEqual(self.server.state.not_modified, 1)
+
+        # Le cache est persisté d'une exécution à l'autre
+        other = self._client()
+        other.get_campaign('pattesthai')
+        self.assertEqual(other.stats['not_modified'], 1)
+
+        self.campaign['current_amount'] = 1500
+        self.server.state.set_campaign('pattesthai', self.campaign)
+        self.assertEqual(client.get_campaign('pattesthai')['current_amount'], 1500)
+
+    def test_connections_are_reused(self):
+        """Vérifie que la session réutilise la même connexion."""
+        client = self._client()
+        for _ in range(5):
+            client.get_campaign('pattesthai')
+        self.assertEqual(self.server.state.requests, 5)
+        self.assertEqual(len(self.server.state.connections), 1)
+
+    def test_transient_errors_are_retried(self):
+        """Vérifie les nouvelles tentatives après des erreurs 503."""
+        self.server.state.failures = 2
+        client = self._client(session=create_session(backoff_factor=0))
+        self.assertEqual(client.get_campaign('pattesthai'), self.campaign)
+        self.assertEqual(self.server.state.requests, 3)
+
+    def test_returned_campaign_does_not_alias_the_cache(self):
+        """Vérifie que modifier une campagne retournée ne modifie pas le cache du client."""
+        client = self._client()
+        client.get_campaign('pattesthai')['unique_donor_count'] = 3
+        self.assertNotIn('unique_donor_count', client.get_campaign('pattesthai'))
+        self.assertEqual(self.server.state.not_modified, 1)
+
+class TestMultiCampaignFetch(unittest.TestCase):
+    """Tests de la récupération concurrente de plusieurs campagnes."""
+
+    LATENCY = 0.2
+
+    def setUp(self):
+        """Démarrage d'un serveur local par plateforme."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.gofundme = start_stub_server(latency=self.LATENCY, campaigns={
+            "khon-kaen": {"campaign_title": "Khon Kaen", "goal_amount": 6000,
+                          "current_amount": 1000, "donor_count": 10, "status": "Active"},
+            "rayong": {"campaign_title": "Rayong", "goal_amount": 4000,
+                       "current_amount": 500, "donor_count": 4, "status": "Active"},
+        })
+        self.leetchi = start_stub_server(latency=self.LATENCY, campaigns={
+            "pattesthai": {"campaign_title": "Leetchi", "goal_amount": 2000,
+                           "current_amount": 300, "donor_count": 3, "status": "Active"},
+        })
+        self.campaigns = [
+            {"platform": "gofundme", "campaign_id": "khon-kaen", "site": "khon-kaen"},
+            {"platform": "gofundme", "campaign_id": "rayong", "site": "rayong"},
+            {"platform": "leetchi", "campaign_id": "pattesthai", "site": "khon-kaen"},
+            {"platform": "leetchi", "campaign_id": "inconnue"},
+        ]
+
+    def tearDown(self):
+        """Arrêt des serveurs et nettoyage."""
+        for server in (self.gofundme, self.leetchi):
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _clients(self):
+        return {
+            "gofundme": GoFundMeClient('key', base_url=self.gofundme.base_url, cache_file=None),
+            "leetchi": GoFundMeClient('key', base_url=self.leetchi.base_url, cache_file=None),
+        }
+
+    def test_campaigns_are_merged(self):
+        """Vérifie la fusion des campagnes et la mesure de latence par source."""
+        data = multi_fetch.fetch_all_campaigns(self.campaigns, clients=self._clients())
+        self.assertEqual(data['current_amount'], 1800)
+        self.assertEqual(data['goal_amount'], 12000)
+        self.assertEqual(data['donor_count'], 17)
+        self.assertEqual(data['status'], 'Active')
+        self.assertIn('error', data['sources']['leetchi:inconnue'])
+        self.assertGreaterEqual(data['sources']['gofundme:rayong']['latency_ms'], self.LATENCY * 1000)
+
+    def test_total_time_close_to_slowest_call(self):
+        """Vérifie que les campagnes sont interrogées en parallèle."""
+        start = time.perf_counter()
+        multi_fetch.fetch_all_campaigns(self.campaigns, clients=self._clients())
+        self.assertLess(time.perf_counter() - start, self.LATENCY * 2.5)
+
+    def test_host_concurrency_limit(self):
+        """Vérifie que la limite par hôte sérialise les requêtes vers un même hôte."""
+        start = time.perf_counter()
+        multi_fetch.fetch_all_campaigns(self.campaigns[:2], clients=self._clients(), host_concurrency=1)
+        self.assertGreaterEqual(time.perf_counter() - start, self.LATENCY * 2)
+
+    def test_shared_client_cache_under_concurrency(self):
+        """Vérifie qu'un client partagé enregistre son cache sans conflit entre requêtes simultanées."""
+        cache_file = os.path.join(self.tmp_dir, 'http_cache', 'gofundme.json')
+        campaigns = {f"site-{i}": {"campaign_title": f"Site {i}", "goal_amount": 100, "current_amount": i,
+                                   "donor_count": 1, "status": "Active"} for i in range(24)}
+        server = start_stub_server(campaigns=campaigns)
+        try:
+            client = GoFundMeClient('key', base_url=server.base_url, cache_file=cache_file)
+            data = multi_fetch.fetch_all_campaigns(
+                [{"platform": "gofundme", "campaign_id": name} for name in campaigns],
+                clients={"gofundme": client}, host_concurrency=24)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertFalse([name for name, entry in data['sources'].items() if 'error' in entry])
+        self.assertEqual(data['current_amount'], sum(range(24)))
+        with open(cache_file, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 24)
+        self.assertEqual(os.listdir(os.path.dirname(cache_file)), ['gofundme.json'])
+
+    def test_failed_source_keeps_last_known_amounts(self):
+        """Vérifie qu'une source en erreur garde ses derniers montants publiés dans les totaux."""
+        previous = multi_fetch.fetch_all_campaigns(self.campaigns[:3], clients=self._clients())
+        del self.leetchi.state.campaigns['pattesthai']
+        data = multi_fetch.fetch_all_campaigns(self.campaigns[:3], clients=self._clients(), previous=previous)
+        entry = data['sources']['leetchi:pattesthai']
+        self.assertIn('error', entry)
+        self.assertTrue(entry['stale'])
+        self.assertTrue(multi_fetch.source_available(entry))
+        self.assertEqual(entry['current_amount'], 300)
+        self.assertEqual(data['current_amount'], previous['current_amount'])
+        self.assertIn("| Active (non actualisé) |", update_fundraising_data.render_funding_status(data))
+
+class TestDonorSketch(unittest.TestCase):
+    """Tests pour le comptage des donateurs distincts."""
+
+    def setUp(self):
+        """Création d'un répertoire temporaire."""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_small_sets_are_exact(self):
+        """Vérifie que les petits ensembles sont comptés exactement."""
+        sketch = donor_sketch.DonorSketch()
+        for donor in ['a', 'b', 'a', 'c', 'b']:
+            sketch.add(donor)
+        self.assertTrue(sketch.is_exact)
+        self.assertEqual(sketch.count(), 3)
+
+    def test_large_sets_are_estimated(self):
+        """Vérifie la précision de l'estimation HyperLogLog sur un grand ensemble."""
+        sketch = donor_sketch.DonorSketch()
+        for i in range(50000):
+            sketch.add(f"donor-{i}")
+        self.assertFalse(sketch.is_exact)
+        self.assertLess(abs(sketch.count() - 50000) / 50000, 0.03)
+
+    def test_merge_deduplicates_across_sources(self):
+        """Vérifie que la fusion ne compte qu'une fois les donateurs communs aux plateformes."""
+        gofundme = donor_sketch.DonorSketch(exact_threshold=100)
+        leetchi = donor_sketch.DonorSketch(exact_threshold=100)
+        for i in range(3000):
+            gofundme.add(f"donor-{i}")
+        for i in range(2000, 4000):
+            leetchi.add(f"donor-{i}")
+        summary = donor_sketch.summarize({"gofundme": gofundme, "leetchi": leetchi})
+        self.assertTrue(summary['unique_donor_estimated'])
+        self.assertLess(abs(summary['unique_donor_count'] - 4000) / 4000, 0.03)
+
+        small = donor_sketch.summarize({"a": donor_sketch.DonorSketch(), "b": donor_sketch.DonorSketch()})
+        self.assertEqual(small['unique_donor_count'], 0)
+        self.assertFalse(small['unique_donor_estimated'])
+
+    def test_sketches_are_updated_incrementally_from_events(self):
+        """Vérifie que seules les nouvelles donations sont ajoutées aux esquisses enregistrées."""
+        events_dir = os.path.join(self.tmp_dir, 'events')
+        path = os.path.join(self.tmp_dir, donor_sketch.SKETCHES_FILE)
+        donation_store.append_events([
+            {"type": "donation", "amount": 10, "source": "gofundme", "donor_id": "alice"},
+            {"type": "donation", "amount": 20, "source": "leetchi", "donor_id": "alice"},
+            {"type": "donation", "amount": 5, "source": "leetchi", "donor_id": "bob"},
+        ], events_dir)
+        summary = donor_sketch.summarize(donor_sketch.update_sketches(path, events_dir))
+        self.assertEqual(summary, {"unique_donor_count": 2, "unique_donor_estimated": False,
+                                   "sources": {"gofundme": 1, "leetchi": 2}})
+
+        donation_store.append_events([{"type": "donation", "amount": 7, "source": "gofundme",
+                                       "donor_id": "carol"}], events_dir)
+        with patch.object(donor_sketch.DonorSketch, 'add', autospec=True,
+                          side_effect=donor_sketch.DonorSketch.add) as add:
+            sketches = donor_sketch.update_sketches(path, events_dir)
+            self.assertEqual(add.call_count, 1)
+        self.assertEqual(donor_sketch.summarize(sketches)['unique_donor_count'], 3)
+
+        data = donor_sketch.attach_unique_donors({"sources": {"gofundme": {}}}, donor_sketch.summarize(sketches))
+        self.assertEqual(data['sources']['gofundme']['unique_donor_count'], 2)
+
+    def test_donations_attach_to_their_campaign_source(self):
+        """Vérifie que les dons d'une campagne sont rattachés à la source `plateforme:campagne`."""
+        events_dir = os.path.join(self.tmp_dir, 'events')
+        donation_store.append_events([
+            {"type": "donation", "amount": 10, "source": "gofundme", "campaign_id": "rayong", "donor_id": "alice"},
+            {"type": "donation", "amount": 20, "source": "gofundme:rayong", "donor_id": "bob"},
+            {"type": "donation", "amount": 5, "source": "leetchi", "campaign_id": "khon-kaen", "donor_id": "alice"},
+        ], events_dir)
+        sketches = donor_sketch.update_sketches(os.path.join(self.tmp_dir, donor_sketch.SKETCHES_FILE), events_dir)
+        data = {"sources": {"gofundme:rayong": {}, "leetchi:khon-kaen": {}}}
+        donor_sketch.attach_unique_donors(data, donor_sketch.summarize(sketches))
+        self.assertEqual(data['unique_donor_count'], 2)
+        self.assertEqual(data['sources']['gofundme:rayong']['unique_donor_count'], 2)
+        self.assertEqual(data['sources']['leetchi:khon-kaen']['unique_donor_count'], 1)
+        self.assertEqual(sorted(donation_store.refresh_state(events_dir)['sources']),
+                         ['gofundme:rayong', 'leetchi:khon-kaen'])
+
+class TestWatchMode(unittest.TestCase):
+    """Tests du mode surveillance et des écritures conditionnelles."""
+
+    def setUp(self):
+        """Redirection de la documentation vers un répertoire temporaire."""
+        self.output_dir = tempfile.mkdtemp()
+        self.patchers = [
+            patch.object(update_fundraising_data, 'OUTPUT_DIR', os.path.join(self.output_dir, 'data')),
+            patch.object(badges, 'BADGES_DIR', os.path.join(self.output_dir, 'badges')),
+            patch.object(funding_history, 'HISTORY_DIR', os.path.join(self.output_dir, 'history')),
+            patch.object(update_fundraising_data, 'record_funding_data'),
+            patch.object(update_fundraising_data, 'attach_unique_donors', side_effect=lambda data: data),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    @staticmethod
+    def _data(amount, minute=0):
+        return {"campaign_title": "PattesThai", "goal_amount": 10000, "current_amount": amount,
+                "donor_count": 3, "status": "Active", "last_updated": f"2025-01-01T10:{minute:02d}:00",
+                "sources": {"gofundme": {"current_amount": amount, "donor_count": 3, "status": "Active",
+                                         "latency_ms": 10 + minute}}}
+
+    def test_timestamp_only_changes_are_not_written(self):
+        """Vérifie qu'un nouvel horodatage seul ne provoque aucune écriture."""
+        self.assertTrue(update_fundraising_data.publish_funding_data(self._data(100)))
+        path = os.path.join(self.output_dir, 'data', 'funding_status.md')
+        mtime = os.stat(path).st_mtime_ns
+
+        history = os.path.join(self.output_dir, 'history')
+        history_mtimes = {os.path.join(root, name): os.stat(os.path.join(root, name)).st_mtime_ns
+                          for root, _, names in os.walk(history) for name in names}
+        with patch.object(badges, 'render_funding_badges') as render_badges:
+            self.assertFalse(update_fundraising_data.publish_funding_data(self._data(100, minute=5)))
+            render_badges.assert_not_called()
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+        self.assertEqual({path: os.stat(path).st_mtime_ns for path in history_mtimes}, history_mtimes)
+        self.assertTrue(update_fundraising_data.publish_funding_data(self._data(150, minute=6)))
+        self.assertEqual(update_fundraising_data.record_funding_data.call_count, 2)
+        self.assertEqual(update_fundraising_data.attach_unique_donors.call_count, 3)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.output_dir, 'data'))),
+                         ['funding_data.json', 'funding_status.md'])
+
+    def test_polling_interval_adapts_to_activity(self):
+        """Vérifie que l'intervalle s'allonge au repos et se réduit après un don."""
+        amounts = [100, 100, 100, 100, 120, 140, 140]
+        fetched = iter(self._data(amount, minute) for minute, amount in enumerate(amounts))
+        waits = []
+        with patch.object(update_fundraising_data, 'get_fundraising_data', side_effect=lambda: next(fetched)):
+            published = update_fundraising_data.watch(min_interval=10, max_interval=50, backoff=2,
+                                                      iterations=len(amounts), sleep=waits.append)
+        self.assertEqual(published, 3)
+        self.assertEqual(waits, [10, 20, 40, 50, 10, 10])
+
+class TestFundingHistory(unittest.TestCase):
+    """Tests de l'historique du financement en colonnes."""
+
+    def setUp(self):
+        """Création d'un historique temporaire."""
+        self.history_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.history_dir, ignore_errors=True)
+
+    def _record(self, day, hour, amount):
+        data = {"goal_amount": 10000, "current_amount": amount, "donor_count": amount // 10,
+                "last_updated": f"2025-01-{day:02d}T{hour:02d}:30:00+00:00",
+                "sources": {"gofundme:pattesthai-rayong": {"site": "rayong", "goal_amount": 4000,
+                                                           "current_amount": amount // 2, "donor_count": 1},
+                            "leetchi:pattesthai-rayong": {"site": "rayong", "goal_amount": 6000,
+                                                          "current_amount": amount // 2, "donor_count": 2},
+                            "gofundme:pattesthai-khon-kaen": {"error": "timeout"}}}
+        return funding_history.record_snapshot(data, history_dir=self.history_dir)
+
+    def test_snapshots_are_bucketed_per_period(self):
+        """Vérifie qu'un relevé de la même période remplace la dernière ligne."""
+        for day in range(1, 11):
+            self._record(day, 9, day * 100)
+            self._record(day, 18, day * 100 + 50)
+        with funding_history.open_history(funding_history.DAILY, self.history_dir) as history:
+            self.assertEqual(history.list_series(),
+                             [('gofundme', 'rayong'), ('leetchi', 'rayong'), ('total', 'all')])
+            total = history.series()
+            self.assertEqual(len(total), 10)
+            self.assertEqual(list(total.columns.amount), [day * 100 + 50.0 for day in range(1, 11)])
+        with funding_history.open_history(funding_history.HOURLY, self.history_dir) as history:
+            self.assertEqual(len(history.series()), 20)
+
+    def test_range_queries_are_zero_copy_slices(self):
+        """Vérifie les requêtes par période sur les colonnes projetées en mémoire."""
+        for day in range(1, 31):
+            self._record(day, 12, day * 100)
+        with funding_history.open_history(funding_history.DAILY, self.history_dir) as history:
+            window = history.series().last(7)
+            self.assertIsInstance(window.amount, memoryview)
+            self.assertEqual([funding_history.format_date(t) for t in window.timestamp][0], '2025-01-24')
+            self.assertEqual(list(window.donors), [day * 10 for day in range(24, 31)])
+            rayong = history.select(site='Rayong')
+            self.assertEqual(len(rayong), 2)
+            window = rayong[0].range('2025-01-10T00:00:00+00:00', '2025-01-12T00:00:00+00:00')
+            self.assertEqual(list(window.amount), [500.0, 550.0])
+            self.assertEqual(list(window.goal), [4000.0, 4000.0])
+            del window
+
+    def test_incomplete_rows_are_ignored(self):
+        """Vérifie qu'une ligne écrite partiellement est ignorée puis écrasée."""
+        self._record(1, 12, 100)
+        directory = funding_history.series_dir('total', 'all', funding_history.DAILY, self.history_dir)
+        with open(os.path.join(directory, 'timestamp.bin'), 'ab') as f:
+            f.write(b'\x00' * 8)
+        with funding_history.open_history(funding_history.DAILY, self.history_dir) as history:
+            self.assertEqual(len(history.series()), 1)
+        self._record(2, 12, 200)
+        with funding_history.open_history(funding_history.DAILY, self.history_dir) as history:
+            self.assertEqual(list(history.series().columns.amount), [100.0, 200.0])
+
+    def test_reports_read_the_history(self):
+        """Vérifie que le rapport et les graphiques lisent l'historique."""
+        from scripts.analytics import generate_reports
+
+        for day in (1, 2, 5):
+            self._record(day, 12, day * 100)
+        with patch.object(funding_history, 'HISTORY_DIR', self.history_dir):
+            history = generate_reports.load_funding_history()
+            rayong = generate_reports.load_funding_history(site='rayong')
+        self.assertEqual(history['dates'], ['2025-01-01', '2025-01-02', '2025-01-05'])
+        self.assertEqual(rayong['amounts'], [100.0, 200.0, 500.0])
+        self.assertEqual(rayong['goal'], 10000.0)
+        specs = generate_reports.build_funding_chart_specs({"current_amount": 0, "goal_amount": 10000}, None, history)
+        self.assertEqual(specs[0]['name'], 'funding_history')
+        self.assertEqual(specs[0]['data']['x'], [-4, -3, 0])
+        self.assertIn('+400.00 €', generate_reports._format_history(history))
+
+    def test_naive_timestamps_are_local_time(self):
+        """Vérifie qu'un horodatage sans fuseau est lu en heure locale."""
+        previous = os.environ.get('TZ')
+        os.environ['TZ'] = 'Asia/Bangkok'
+        time.tzset()
+        try:
+            self.assertEqual(funding_history.to_epoch('2025-01-02T05:30:00'),
+                             funding_history.to_epoch('2025-01-01T22:30:00+00:00'))
+            self.assertEqual(funding_history.to_epoch(datetime(2025, 1, 2, 5, 30)),
+                             funding_history.to_epoch('2025-01-01T22:30:00Z'))
+        finally:
+            if previous is None:
+                del os.environ['TZ']
+            else:
+                os.environ['TZ'] = previous
+            time.tzset()
+
+    def test_site_sums_carry_forward_missing_platforms(self):
+        """Vérifie qu'une plateforme sans relevé un jour garde son dernier montant dans la somme du site."""
+        from scripts.analytics import generate_reports
+
+        self._record(1, 12, 100)
+        funding_history.record_snapshot(
+            {"goal_amount": 10000, "current_amount": 260, "donor_count": 4,
+             "sources": {"gofundme:pattesthai-rayong": {"site": "rayong", "goal_amount": 4000,
+                                                        "current_amount": 80, "donor_count": 2},
+                         "leetchi:pattesthai-rayong": {"site": "rayong", "error": "timeout"}}},
+            timestamp='2025-01-02T12:00:00+00:00', history_dir=self.history_dir)
+        self._record(3, 12, 300)
+        with patch.object(funding_history, 'HISTORY_DIR', self.history_dir):
+            rayong = generate_reports.load_funding_history(site='rayong')
+        self.assertEqual(rayong['dates'], ['2025-01-01', '2025-01-02', '2025-01-03'])
+        self.assertEqual(rayong['amounts'], [100.0, 130.0, 300.0])
+        self.assertEqual(rayong['donors'], [3, 4, 3])
+        self.assertEqual(rayong['goal'], 10000.0)
+
+class TestExpenseLedger(unittest.TestCase):
+    """Tests du registre des dépenses et de la comparaison avec la répartition annoncée."""
+
+    def setUp(self):
+        """Création d'un registre temporaire."""
+        self.ledger_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.ledger_dir, '2025.csv')
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write('date,amount,category,description,site\n'
+                    '2025-02-03,"120,50",Soins vétérinaires,Stérilisation,rayong\n'
+                    '2025-02-10,79.50,nourriture,Croquettes,khon-kaen\n'
+                    '2025-03-01,abc,transport,Montant illisible,rayong\n')
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.ledger_dir, ignore_errors=True)
+
+    def _append(self, text):
+        with open(self.csv_path, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_amounts_and_categories_are_normalized(self):
+        """Vérifie la lecture des montants et des catégories des justificatifs."""
+        self.assertEqual(expense_ledger.parse_amount('1 234,50 €'), 123450)
+        self.assertEqual(expense_ledger.parse_amount('1,234.50'), 123450)
+        self.assertEqual(expense_ledger.parse_amount('1.234,50'), 123450)
+        self.assertEqual(expense_ledger.parse_amount(12), 1200)
+        self.assertEqual(expense_ledger.category_key('Soins Vétérinaires'), 'veterinary')
+        self.assertEqual(expense_ledger.category_key('logistique-et-transport'), 'logistics')
+        self.assertEqual(expense_ledger.category_key('Divers'), expense_ledger.OTHER_CATEGORY)
+
+    def test_only_appended_expenses_are_read(self):
+        """Vérifie la reprise depuis le point de contrôle, lignes incomplètes comprises."""
+        state = expense_ledger.refresh_ledger(self.ledger_dir)
+        self.assertEqual((state['count'], state['total_cents'], state['rejected']), (2, 20000, 1))
+
+        self._append('2025-03-05,50,carburant,Trajet,rayong\n2025-03-06,10,admin')
+        with open(os.path.join(self.ledger_dir, 'extra.ndjson'), 'w', encoding='utf-8') as f:
+            f.write('{"date": "2025-03-07", "amount": 30, "category": "communication"}\n')
+        with patch.object(expense_ledger, 'apply_expense', wraps=expense_ledger.apply_expense) as apply:
+            state = expense_ledger.refresh_ledger(self.ledger_dir)
+        self.assertEqual(apply.call_count, 2)
+        self.assertEqual(state['categories']['logistics'], {"cents": 5000, "count": 1})
+        self.assertEqual(state['last_date'], '2025-03-07')
+
+        self._append(',Frais bancaires\n')
+        state = expense_ledger.refresh_ledger(self.ledger_dir)
+        self.assertEqual(state['categories']['admin'], {"cents": 4000, "count": 2})
+        self.assertEqual(state['sites']['rayong'], {"cents": 17050, "count": 2})
+
+    def test_quoted_newlines_stay_in_one_expense(self):
+        """Vérifie qu'une description sur plusieurs lignes produit une seule dépense, même écrite en deux fois."""
+        expense_ledger.refresh_ledger(self.ledger_dir)
+        self._append('2025-03-05,40,vet,"Vaccins\n""rage"" et typhus\n')
+        state = expense_ledger.refresh_ledger(self.ledger_dir)
+        self.assertEqual((state['count'], state['rejected']), (2, 1))
+
+        self._append('",rayong\n')
+        records = list(expense_ledger.iter_records(self.csv_path))
+        self.assertEqual(records[-1][0]['description'], 'Vaccins\n"rage" et typhus\n')
+        state = expense_ledger.refresh_ledger(self.ledger_dir)
+        self.assertEqual((state['count'], state['rejected']), (3, 1))
+        self.assertEqual(state['sites']['rayong'], {"cents": 16050, "count": 2})
+
+    def test_rewritten_file_triggers_full_rebuild(self):
+        """Vérifie qu'un fichier réécrit est relu entièrement."""
+        expense_ledger.refresh_ledger(self.ledger_dir)
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write('date,amount,category\n2025-04-01,10,food\n')
+        state = expense_ledger.refresh_ledger(self.ledger_dir)
+        self.assertEqual((state['count'], state['total_cents']), (1, 1000))
+
+    def test_reconciliation_against_allocation(self):
+        """Vérifie la comparaison entre répartition réelle et répartition prévue."""
+        self._append('2025-03-05,100,Divers,Non classé\n')
+        state = expense_ledger.refresh_ledger(self.ledger_dir)
+        rows = {row['category']: row for row in expense_ledger.reconcile(state)}
+        self.assertEqual(list(rows), ['veterinary', 'food', 'logistics', 'admin', 'other'])
+        self.assertAlmostEqual(rows['veterinary']['actual_share'], 0.4017, places=4)
+        self.assertAlmostEqual(rows['veterinary']['delta'], 0.5)
+        self.assertAlmostEqual(rows['food']['delta'], -10.5)
+        self.assertAlmostEqual(rows['admin']['delta'], -30.0)
+        self.assertEqual(rows['other']['label'], expense_ledger.OTHER_LABEL)
+
+        markdown = expense_ledger.format_allocation(state)
+        self.assertIn('| Soins vétérinaires | 40% | 40.2% | 120.50 € | +0.50 € |', markdown)
+        self.assertIn('1 ligne(s) sans montant valide', markdown)
+        self.assertIn('- Soins vétérinaires: 40%', expense_ledger.format_allocation(None))
+
+    def test_expenses_report(self):
+        """Vérifie le rapport de transparence et sa régénération conditionnelle."""
+        from scripts.analytics import generate_reports
+
+        reports_dir = os.path.join(self.ledger_dir, 'reports')
+        with patch.object(expense_ledger, 'LEDGER_DIR', self.ledger_dir), \
+                patch.object(generate_reports, 'REPORTS_DIR', reports_dir):
+            generate_reports.generate_expenses_report()
+            path = os.path.join(reports_dir, 'expenses_report.md')
+            with open(path, encoding='utf-8') as f:
+                report = f.read()
+            mtime = os.stat(path).st_mtime_ns
+            generate_reports.generate_expenses_report()
+            self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+        self.assertIn('| Nourriture et fournitures | 30% | 39.8% | 79.50 € | +19.50 € |', report)
+        self.assertIn('| Khon Kaen | 1 | 79.50 € |', report)
+
+class TestBadges(unittest.TestCase):
+    """Tests des badges et barres de progression générés localement."""
+
+    def setUp(self):
+        """Création d'un répertoire temporaire."""
+        self.badges_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.badges_dir, ignore_errors=True)
+
+    def test_badges_are_cached_by_percent_and_style(self):
+        """Vérifie qu'un badge existant n'est pas régénéré et qu'un autre style en crée un nouveau."""
+        filename = badges.ensure_badge(badges.KIND_BAR, 42, badges_dir=self.badges_dir, png=False)
+        path = os.path.join(self.badges_dir, filename)
+        with open(path, encoding='utf-8') as f:
+            self.assertIn('42%', f.read())
+        mtime = os.stat(path).st_mtime_ns
+
+        self.assertEqual(badges.ensure_badge(badges.KIND_BAR, 42, badges_dir=self.badges_dir, png=False), filename)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+        other = badges.ensure_badge(badges.KIND_BAR, 42, dict(badges.STYLE, fill='#3F51B5'),
+                                    badges_dir=self.badges_dir, png=False)
+        self.assertNotEqual(other, filename)
+
+    def test_png_variant(self):
+        """Vérifie la génération optionnelle du badge au format PNG."""
+        filename = badges.ensure_badge(badges.KIND_BADGE, 75, badges_dir=self.badges_dir, png=True)
+        with open(os.path.join(self.badges_dir, filename[:-3] + 'png'), 'rb') as f:
+            self.assertEqual(f.read(8), b'\x89PNG\r\n\x1a\n')
+
+    def test_status_page_references_local_badges(self):
+        """Vérifie que la page de financement référence les badges locaux de chaque source."""
+        data = {"campaign_title": "PattesThai", "goal_amount": 20000, "current_amount": 5000, "donor_count": 4,
+                "status": "Active", "last_updated": "2025-01-01T10:00:00",
+                "sources": {"gofundme:bangkok": {"site": "bangkok", "goal_amount": 10000, "current_amount": 4000,
+                                                 "donor_count": 3, "status": "Active"},
+                            "leetchi:chiang-mai": {"error": "timeout"}}}
+        output_dir = os.path.join(self.badges_dir, 'data')
+        with patch.object(badges, 'BADGES_DIR', os.path.join(self.badges_dir, 'badges')), \
+                patch.object(update_fundraising_data, 'OUTPUT_DIR', output_dir):
+            badges.render_funding_badges(data)
+            update_fundraising_data.update_documentation(data)
+        with open(os.path.join(output_dir, 'funding_status.md'), encoding='utf-8') as f:
+            markdown = f.read()
+        self.assertNotIn('progress-bar.dev', markdown)
+        for kind, percent in ((badges.KIND_BAR, 25), (badges.KIND_BADGE, 40)):
+            link = f"../badges/{badges.badge_filename(kind, percent)}"
+            self.assertIn(f"]({link})", markdown)
+            self.assertTrue(os.path.exists(os.path.join(output_dir, link)))
+
+class TestDashboard(unittest.TestCase):
+    """Tests du tableau de bord en temps réel."""
+
+    def setUp(self):
+        """Démarrage du tableau de bord sans actualisation automatique."""
+        self.server = start_dashboard(fetch=None, keepalive=0.2)
+        self.data = {"campaign_title": "PattesThai", "goal_amount": 10000, "current_amount": 1200,
+                     "donor_count": 8, "status": "Active", "last_updated": "2025-01-01T10:00:00"}
+        self.server.state.update(self.data)
+
+    def tearDown(self):
+        """Arrêt du serveur."""
+        stop_dashboard(self.server)
+
+    def _connection(self):
+        host, port = self.server.server_address
+        return http.client.HTTPConnection(host, port, timeout=5)
+
+    def _open_stream(self, last_event_id=None):
+        connection = self._connection()
+        headers = {"Last-Event-ID": str(last_event_id)} if last_event_id is not None else {}
+        connection.request('GET', '/events', headers=headers)
+        response = connection.getresponse()
+        self.addCleanup(connection.close)
+        self.assertEqual(response.getheader('Content-Type'), 'text/event-stream; charset=utf-8')
+        return response
+
+    @staticmethod
+    def _read_event(response):
+        event = {}
+        while True:
+            line = response.fp.readline().decode('utf-8').rstrip('\n')
+            if not line:
+                if 'event' in event:
+                    return event
+                continue
+            if line.startswith(':'):
+                continue
+            field, _, value = line.partition(': ')
+            event[field] = json.loads(value) if field == 'data' else value
+
+    def test_snapshot_is_served_with_etag(self):
+        """Vérifie l'instantané JSON et la réponse 304 lorsqu'il est inchangé."""
+        connection = self._connection()
+        connection.request('GET', '/api/funding')
+        response = connection.getresponse()
+        self.assertEqual(json.loads(response.read()), self.data)
+        etag = response.getheader('ETag')
+
+        connection.request('GET', '/api/funding', headers={"If-None-Match": etag})
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 304)
+
+        # Seul l'horodatage change: pas de nouvelle version
+        self.assertFalse(self.server.state.update(dict(self.data, last_updated="2025-01-01T11:00:00")))
+        self.server.state.update(dict(self.data, current_amount=1300))
+        connection.request('GET', '/api/funding', headers={"If-None-Match": etag})
+        response = connection.getresponse()
+        self.assertEqual(json.loads(response.read())['current_amount'], 1300)
+        connection.close()
+
+    def test_nested_volatile_fields_do_not_bump_version(self):
+        """Vérifie qu'une latence par source ne crée pas de nouvelle version."""
+        source = {"site": "rayong", "current_amount": 1200, "latency_ms": 120.5}
+        self.assertTrue(self.server.state.update(dict(self.data, sources={"gofundme:rayong": source})))
+        version = self.server.state.version
+        self.assertFalse(self.server.state.update(
+            dict(self.data, sources={"gofundme:rayong": dict(source, latency_ms=98.1)})))
+        self.assertEqual(self.server.state.version, version)
+        self.assertTrue(self.server.state.update(
+            dict(self.data, sources={"gofundme:rayong": dict(source, current_amount=1300)})))
+
+    def test_viewers_receive_snapshot_then_changes_only(self):
+        """Vérifie que chaque visiteur reçoit l'instantané puis les seuls champs modifiés."""
+        responses = [self._open_stream() for _ in range(20)]
+        for response in responses:
+            event = self._read_event(response)
+            self.assertEqual(event['event'], 'snapshot')
+            self.assertEqual(event['data'], self.data)
+        while self.server.state.viewers < len(responses):
+            time.sleep(0.01)
+
+        self.server.state.update(dict(self.data, current_amount=1500, donor_count=9))
+        for response in responses:
+            event = self._read_event(response)
+            self.assertEqual(event['event'], 'update')
+            self.assertEqual(event['data'], {"current_amount": 1500, "donor_count": 9})
+
+    def test_reconnecting_viewer_receives_missed_updates(self):
+        """Vérifie qu'un visiteur qui se reconnecte reçoit les mises à jour manquées."""
+        version = self.server.state.version
+        self.server.state.update(dict(self.data, current_amount=1400))
+        self.server.state.update(dict(self.data, current_amount=1400, status="Terminée"))
+
+        response = self._open_stream(last_event_id=version)
+        events = [self._read_event(response), self._read_event(response)]
+        self.assertEqual([event['data'] for event in events], [{"current_amount": 1400}, {"status": "Terminée"}])
+        self.assertEqual(events[-1]['id'], str(self.server.state.version))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests unitaires pour l'exécution de la chaîne fetch -> rapports -> documentation.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import threading
+
+# Ajout du répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.pipeline import Pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    """Tests pour l'ordonnanceur d'étapes."""
+
+    def setUp(self):
+        """Préparation d'un fichier d'état temporaire."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.tmp_dir, 'pipeline_state.json')
+        self.calls = []
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _build(self, amount=100, fail_docs=False):
+        def fetch(inputs):
+            self.calls.append('fetch')
+            return {"current_amount": amount}
+
+        def report(inputs):
+            self.calls.append('report')
+            return {"text": f"{inputs['fetch']['current_amount']} €"}
+
+        def docs(inputs):
+            self.calls.append('docs')
+            if fail_docs:
+                raise RuntimeError("échec de copie")
+            return {"published": inputs['report']['text']}
+
+        pipeline = Pipeline(state_file=self.state_file)
+        pipeline.add('fetch', fetch, always_run=True)
+        pipeline.add('report', report, deps=['fetch'])
+        pipeline.add('docs', docs, deps=['report'])
+        return pipeline
+
+    def test_results_are_passed_in_memory(self):
+        """Vérifie que chaque étape reçoit le résultat de ses dépendances."""
+        statuses = self._build().run()
+        self.assertEqual(statuses, {"fetch": "run", "report": "run", "docs": "run"})
+        self.assertEqual(self.calls, ['fetch', 'report', 'docs'])
+
+    def test_rerun_resumes_from_first_stale_stage(self):
+        """Vérifie la reprise après un échec et la réutilisation des étapes à jour."""
+        statuses = self._build(fail_docs=True).run()
+        self.assertEqual(statuses['docs'], 'failed')
+
+        self.calls.clear()
+        statuses = self._build().run()
+        self.assertEqual(statuses, {"fetch": "run", "report": "cached", "docs": "run"})
+        self.assertEqual(self.calls, ['fetch', 'docs'])
+
+        self.calls.clear()
+        statuses = self._build(amount=200).run()
+        self.assertEqual(self.calls, ['fetch', 'report', 'docs'])
+
+    def test_independent_stages_run_concurrently(self):
+        """Vérifie que deux étapes indépendantes s'exécutent en même temps."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def stage(inputs):
+            barrier.wait()
+            return {}
+
+        pipeline = Pipeline(state_file=self.state_file)
+        pipeline.add('chart', stage)
+        pipeline.add('social', stage)
+        statuses = pipeline.run()
+        self.assertEqual(statuses, {"chart": "run", "social": "run"})
+
+    def test_failed_dependency_skips_dependents(self):
+        """Vérifie que les étapes dépendantes d'une étape en échec sont ignorées."""
+        def broken(inputs):
+            raise ValueError("données invalides")
+
+        pipeline = Pipeline(state_file=self.state_file)
+        pipeline.add('fetch', broken)
+        pipeline.add('report', lambda inputs: {}, deps=['fetch'])
+        statuses = pipeline.run()
+        self.assertEqual(statuses, {"fetch": "failed", "report": "skipped"})
+
+    def test_report_stages_check_their_own_inputs(self):
+        """Vérifie que les rapports lisant des fichiers hors de la chaîne sont toujours exécutés."""
+        from scripts.pipeline import build_pipeline
+
+        pipeline = build_pipeline(state_file=self.state_file)
+        for name in ('funding_report', 'funding_chart', 'site_reports'):
+            self.assertTrue(pipeline.stages[name].always_run, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests unitaires pour le registre des animaux des refuges.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Ajout du répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.shelter import animal_registry
+from scripts.analytics import generate_reports
+from scripts.analytics import site_reports
+
+
+class TestAnimalRegistry(unittest.TestCase):
+    """Tests du registre des animaux, de ses index et de sa persistance."""
+
+    def setUp(self):
+        """Création d'un registre dans un répertoire temporaire."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'animals', 'registry.ndjson')
+        self.registry = animal_registry.AnimalRegistry(self.path)
+        self.registry.intake('kk-1', 'Mali', 'Chat', 'Khon Kaen', '2025-02-20')
+        self.registry.intake('kk-2', 'Tom', 'chien', 'khon-kaen', '2025-04-02')
+        self.registry.intake('kk-3', 'Lek', 'chien', 'khon-kaen', '2025-03-01')
+        self.registry.intake('ry-1', 'Noi', 'chat', 'rayong', '2025-04-05')
+        self.registry.set_status('ry-1', animal_registry.ADOPTED, '2025-04-20')
+        self.registry.set_status('kk-3', animal_registry.FOSTER, '2025-03-15')
+        self.registry.set_status('kk-3', animal_registry.ADOPTED, '2025-03-30')
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_indexes_follow_status_changes(self):
+        """Vérifie les effectifs et les requêtes par période après des changements de statut."""
+        registry = self.registry
+        self.assertEqual(len(registry), 4)
+        self.assertIsInstance(registry.get('kk-1'), animal_registry.Animal)
+        self.assertFalse(hasattr(registry.get('kk-1'), '__dict__'))
+        self.assertEqual(registry.count(site='khon-kaen'), 3)
+        self.assertEqual(registry.count(site='Khon Kaen', status=animal_registry.IN_CARE), 2)
+        self.assertEqual(registry.count(species='chien', status=animal_registry.ADOPTED), 1)
+        self.assertEqual(registry.count(status=animal_registry.FOSTER), 0)
+        self.assertEqual([a.animal_id for a in registry.select(site='khon-kaen', status=animal_registry.IN_CARE)],
+                         ['kk-1', 'kk-2'])
+
+        self.assertEqual(registry.count_status_between(animal_registry.ADOPTED, start='2025-04-01',
+                                                       end='2025-05-01'), 1)
+        self.assertEqual([a.name for a in registry.in_status_between(animal_registry.ADOPTED)], ['Lek', 'Noi'])
+        self.assertEqual(registry.count_in_status_since(animal_registry.IN_CARE, 30, '2025-04-25',
+                                                        site='khon-kaen'), 1)
+        self.assertEqual(registry.count_intakes('khon-kaen', '2025-03-01', '2025-05-01'), 2)
+
+        summary = registry.summary('2025-04-25')
+        self.assertEqual(summary['statuses'][animal_registry.ADOPTED], 2)
+        self.assertEqual(summary['in_care_species'], {'chat': 1, 'chien': 1})
+        self.assertEqual((summary['long_stay'], summary['intakes_month'], summary['adoptions_month']), (1, 2, 1))
+        self.assertIn("2 animaux en soins (1 chat, 1 chien, 1 depuis plus de 30 jours)",
+                      animal_registry.format_summary(summary))
+
+    def test_invalid_events_are_rejected(self):
+        """Vérifie qu'un événement invalide ne modifie ni le registre ni son journal."""
+        with open(self.path, encoding='utf-8') as f:
+            lines = f.readlines()
+        with self.assertRaises(ValueError):
+            self.registry.intake('kk-1', 'Mali', 'chat', 'khon-kaen')
+        with self.assertRaises(ValueError):
+            self.registry.set_status('inconnu', animal_registry.ADOPTED)
+        with self.assertRaises(ValueError):
+            self.registry.set_status('kk-1', 'perdu')
+        with self.assertRaises(ValueError):
+            self.registry.set_status('kk-1', animal_registry.ADOPTED, 'hier')
+        self.assertEqual(self.registry.get('kk-1').status, animal_registry.IN_CARE)
+        self.assertEqual(self.registry.count(status=animal_registry.IN_CARE), 2)
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(f.readlines(), lines)
+
+    def test_registry_is_replayed_from_its_journal(self):
+        """Vérifie que le journal en ajout seul reconstruit le même registre."""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('pas du JSON\n{"event": "status", "id": "inconnu", "status": "adopted", "date": "2025-04-01"}\n')
+            f.write('{"event": "intake", "id": "ry-2"')
+        registry = animal_registry.load_registry(self.path)
+        self.assertEqual(len(registry), 4)
+        self.assertEqual(registry.summary('2025-04-25'), self.registry.summary('2025-04-25'))
+        self.assertEqual(registry.get('kk-3').status_day, animal_registry.to_day('2025-03-30'))
+        self.assertEqual(len(animal_registry.load_registry(os.path.join(self.tmp_dir, 'absent.ndjson'))), 0)
+
+    def test_reports_cite_the_registry(self):
+        """Vérifie que les rapports de financement citent les chiffres du registre."""
+        reports_dir = os.path.join(self.tmp_dir, 'reports')
+        data = {"campaign_title": "PattesThai", "goal_amount": 1000, "current_amount": 100, "donor_count": 2,
+                "last_updated": "2025-04-25T10:00:00", "status": "Active",
+                "sources": {"gofundme:kk": {"site": "khon-kaen", "goal_amount": 1000, "current_amount": 100,
+                                            "donor_count": 2, "status": "Active"}}}
+        with patch.object(animal_registry, 'REGISTRY_FILE', self.path), \
+                patch.object(generate_reports, 'REPORTS_DIR', reports_dir), \
+                patch.object(generate_reports, 'load_funding_history', return_value=None), \
+                patch.object(generate_reports, 'load_donation_analytics', return_value=None):
+            generate_reports.generate_funding_report(data, force=True, chart=False)
+            tasks = site_reports.plan_site_reports(data, ['khon-kaen', 'rayong'])
+        with open(os.path.join(reports_dir, 'funding_report.md'), encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn("- Prise en charge: 2 animaux en soins", report)
+        self.assertIn("pour 2 adoption(s) depuis le début du projet.", report)
+
+        animals = {task['site']: task['inputs']['animals'] for task in tasks if task['kind'] == 'funding'}
+        self.assertEqual(animals['khon-kaen']['statuses'][animal_registry.IN_CARE], 2)
+        self.assertEqual(animals['rayong']['statuses'][animal_registry.ADOPTED], 1)
+        report = generate_reports.render_funding_report(data, history=None, site='khon-kaen',
+                                                        animals=dict(animals['khon-kaen'], long_stay=1))
+        self.assertIn("3. Trouver une famille d'adoption ou d'accueil pour les 1 animaux en soins depuis plus "
+                      "de 30 jours", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests unitaires pour les fonctionnalités de médias sociaux.
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import unittest
+import os
+import sys
+import time
+import shutil
+import json
+import tempfile
+import threading
+import tracemalloc
+from unittest.mock import patch, MagicMock
+
+# Ajout du répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.social import openai_cache
+from scripts.social import idea_batch
+from scripts.social import generate_tiktok_content
+from scripts.social import tiktok_metrics
+
+# Fonction réelle, remplacée par une fausse session dans la plupart des tests
+REAL_GET_SESSION = openai_cache.get_session
+
+
+class TestOpenAICache(unittest.TestCase):
+    """Tests pour le cache des réponses OpenAI."""
+
+    def setUp(self):
+        """Création d'un cache temporaire et d'une fausse session HTTP."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = openai_cache.ResponseCache(self.cache_dir)
+        self.payload = {"model": "gpt-4", "messages": [{"role": "user", "content": "Idées"}],
+                        "temperature": 0.7}
+        self.response = {"choices": [{"message": {"content": "[]"}}]}
+        http_response = MagicMock()
+        http_response.json.return_value = self.response
+        self.session = MagicMock()
+        self.session.post.return_value = http_response
+        self.patcher = patch.object(openai_cache, 'get_session', return_value=self.session)
+        self.patcher.start()
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        self.patcher.stop()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_identical_requests_hit_the_cache(self):
+        """Vérifie qu'une requête identique n'est envoyée qu'une fois."""
+        for _ in range(3):
+            response = openai_cache.chat_completion(self.payload, 'key', cache=self.cache)
+        self.assertEqual(response, self.response)
+        self.assertEqual(self.session.post.call_count, 1)
+        self.assertIsNotNone(self.session.post.call_args.kwargs['timeout'])
+
+        other = dict(self.payload, temperature=0.2)
+        openai_cache.chat_completion(other, 'key', cache=self.cache)
+        self.assertEqual(self.session.post.call_count, 2)
+
+    def test_replay_mode_never_calls_the_api(self):
+        """Vérifie que le mode replay n'utilise que le cache."""
+        with self.assertRaises(openai_cache.CacheMiss):
+            openai_cache.chat_completion(self.payload, cache=self.cache, mode=openai_cache.MODE_REPLAY)
+        openai_cache.chat_completion(self.payload, 'key', cache=self.cache)
+        response = openai_cache.chat_completion(self.payload, cache=self.cache, mode=openai_cache.MODE_REPLAY)
+        self.assertEqual(response, self.response)
+        self.assertEqual(self.session.post.call_count, 1)
+
+    def test_expired_entries_are_refreshed(self):
+        """Vérifie qu'une entrée expirée provoque un nouvel appel."""
+        cache = openai_cache.ResponseCache(self.cache_dir, ttl=0)
+        openai_cache.chat_completion(self.payload, 'key', cache=cache)
+        time.sleep(0.01)
+        openai_cache.chat_completion(self.payload, 'key', cache=cache)
+        self.assertEqual(self.session.post.call_count, 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """Vérifie l'éviction LRU quand le cache dépasse sa taille maximale."""
+        self.cache.put('a', {"value": "x" * 100})
+        self.cache.put('b', {"value": "y" * 100})
+        os.utime(self.cache._path('a'), (time.time() - 20, time.time() - 20))
+        os.utime(self.cache._path('b'), (time.time() - 10, time.time() - 10))
+        self.assertIsNotNone(self.cache.get('a'))
+
+        # Place pour deux entrées seulement
+        self.cache.max_bytes = os.path.getsize(self.cache._path('a')) * 2 + 10
+        self.cache.put('c', {"value": "z" * 100})
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('c'))
+
+    def test_shared_cache_under_concurrent_workers(self):
+        """Vérifie qu'un cache partagé entre threads reste borné sans inventaire à chaque écriture."""
+        self.cache.put('mesure', {"value": "x" * 100})
+        self.cache.max_bytes = os.path.getsize(self.cache._path('mesure')) * 10
+        errors = []
+
+        def worker(number):
+            try:
+                for i in range(25):
+                    self.cache.put(f"{number}-{i % 15}", {"value": "x" * 100})
+                    self.cache.get(f"{number}-{(i * 7) % 15}")
+            except Exception as e:
+                errors.append(e)
+
+        with patch.object(openai_cache.os, 'listdir', wraps=os.listdir) as listdir:
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertLess(listdir.call_count, 8 * 25)
+        sizes = [os.path.getsize(os.path.join(self.cache_dir, name)) for name in os.listdir(self.cache_dir)]
+        self.assertTrue(all(name.endswith('.json') for name in os.listdir(self.cache_dir)))
+        self.assertLessEqual(sum(sizes), self.cache.max_bytes)
+
+    def test_session_is_created_once(self):
+        """Vérifie qu'une seule session HTTP est créée par des appels simultanés."""
+        import requests
+
+        created = []
+
+        def slow_session():
+            time.sleep(0.05)
+            created.append(MagicMock())
+            return created[-1]
+
+        with patch.object(openai_cache, '_session', None), \
+                patch.object(requests, 'Session', side_effect=slow_session):
+            threads = [threading.Thread(target=REAL_GET_SESSION) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertIs(REAL_GET_SESSION(), created[0])
+        self.assertEqual(len(created), 1)
+
+
+class TestIdeaBatch(unittest.TestCase):
+    """Tests pour la génération d'idées par lots."""
+
+    def test_parser_yields_ideas_as_they_complete(self):
+        """Vérifie que chaque idée est disponible dès que son objet JSON est complet."""
+        text = '```json\n{"ideas": [{"title": "Un {jour}", "hashtags": ["#a"]}, {"title": "Deux \\"x\\""}]}\n```'
+        parser = idea_batch.IncrementalIdeaParser()
+        received = []
+        for i, char in enumerate(text):
+            for idea in parser.feed(char):
+                received.append((i, idea['title']))
+        self.assertEqual([title for _, title in received], ['Un {jour}', 'Deux "x"'])
+        self.assertLess(received[0][0], text.index('Deux'))
+
+    def test_near_duplicates_are_removed(self):
+        """Vérifie l'élimination des idées quasi identiques."""
+        ideas = [
+            {"title": "Un jour au refuge", "hashtags": ["#PattesThai", "#Refuge"]},
+            {"title": "Un JOUR au Refuge !", "hashtags": ["#Autre"]},
+            {"title": "Un jour au refuge PattesThai", "hashtags": ["#refuge", "#pattesthai"]},
+            {"title": "Avant/Après sauvetage", "hashtags": ["#PattesThai", "#Refuge"]},
+        ]
+        kept = list(idea_batch.IdeaDeduplicator().filter(ideas))
+        self.assertEqual([idea['title'] for idea in kept], ["Un jour au refuge", "Avant/Après sauvetage"])
+
+    def test_dedup_index_keeps_recent_ideas_only(self):
+        """Vérifie que l'index de déduplication est borné aux idées les plus récentes, même enregistré."""
+        deduplicator = idea_batch.IdeaDeduplicator(max_entries=3)
+        for i in range(10):
+            self.assertFalse(deduplicator.is_duplicate({"title": f"Sauvetage {i:03d}", "hashtags": ["#Refuge"]}))
+        self.assertEqual(len(deduplicator.titles), 3)
+        self.assertEqual([len(group) for group in deduplicator.hashtags.values()], [3])
+        restored = idea_batch.IdeaDeduplicator.from_dict(deduplicator.to_dict(), max_entries=3)
+        self.assertEqual(len(restored.to_dict()['entries']), 3)
+        self.assertTrue(restored.is_duplicate({"title": "Sauvetage 009"}))
+        self.assertFalse(restored.is_duplicate({"title": "Sauvetage 000"}))
+
+    def test_rate_limiter_waits_for_budget(self):
+        """Vérifie que le limiteur attend la reconstitution des requêtes par minute."""
+        now = [0.0]
+        waits = []
+
+        def sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+
+        limiter = idea_batch.RateLimiter(requests_per_minute=2, tokens_per_minute=1000,
+                                         clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.acquire(100)
+        self.assertAlmostEqual(sum(waits), 30.0, places=3)
+
+    def test_batch_generation_with_cached_streams(self):
+        """Vérifie la génération parallèle, le cache et la déduplication entre thèmes."""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        cache = openai_cache.ResponseCache(cache_dir)
+        active = []
+        overlap = threading.Event()
+        lock = threading.Lock()
+
+        def fake_stream(payload, api_key, cache=None, mode=None, before_request=None):
+            theme = payload['messages'][1]['content']
+            with lock:
+                active.append(theme)
+                if len(active) > 1:
+                    overlap.set()
+            overlap.wait(timeout=2)
+            content = json.dumps([{"title": "Idée commune", "hashtags": ["#x"]},
+                                  {"title": f"Idée {len(theme)}", "hashtags": ["#y"]}])
+            for i in range(0, len(content), 7):
+                yield content[i:i + 7]
+
+        with patch.object(idea_batch, 'stream_content', side_effect=fake_stream):
+            ideas = list(idea_batch.generate_ideas_batch(['chats', 'chiens errants'], 'key', cache=cache))
+        self.assertTrue(overlap.is_set())
+        titles = [idea['title'] for idea in ideas]
+        self.assertEqual(len(titles), 3)
+        self.assertEqual(titles.count('Idée commune'), 1)
+        self.assertEqual({idea['theme'] for idea in ideas}, {'chats', 'chiens errants'})
+
+    def test_stream_content_uses_cache(self):
+        """Vérifie que la réponse en flux est mise en cache puis rejouée."""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        cache = openai_cache.ResponseCache(cache_dir)
+        chunks = ['[{"title": ', '"Chats"}]']
+        lines = [f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}" for c in chunks]
+        http_response = MagicMock()
+        http_response.iter_lines.return_value = lines + ['data: [DONE]']
+        session = MagicMock()
+        session.post.return_value = http_response
+        payload = idea_batch.build_theme_payload('chats')
+
+        with patch.object(openai_cache, 'get_session', return_value=session):
+            self.assertEqual(list(idea_batch.stream_content(payload, 'key', cache)), chunks)
+            replay = list(idea_batch.stream_content(payload, None, cache, mode=openai_cache.MODE_REPLAY))
+        self.assertEqual(replay, [''.join(chunks)])
+        self.assertEqual(session.post.call_count, 1)
+
+    def test_cached_themes_do_not_consume_rate_limit(self):
+        """Vérifie que seules les requêtes envoyées à l'API consomment le débit autorisé."""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        cache = openai_cache.ResponseCache(cache_dir)
+        payload = idea_batch.build_theme_payload('chats')
+        cache.put(openai_cache.request_key(payload), {"choices": [{"message": {"content": '[{"title": "Chats"}]'}}]})
+        http_response = MagicMock()
+        delta = {"choices": [{"delta": {"content": '[{"title": "Chiens"}]'}}]}
+        http_response.iter_lines.return_value = [f"data: {json.dumps(delta)}", 'data: [DONE]']
+        session = MagicMock()
+        session.post.return_value = http_response
+        limiter = MagicMock()
+
+        with patch.object(openai_cache, 'get_session', return_value=session):
+            ideas = list(idea_batch.generate_ideas_batch(['chats', 'chiens'], 'key', limiter=limiter, cache=cache))
+        self.assertEqual(sorted(idea['title'] for idea in ideas), ['Chats', 'Chiens'])
+        self.assertEqual(limiter.acquire.call_count, 1)
+        self.assertEqual(session.post.call_count, 1)
+
+
+class TestStreamingIdeaWriter(unittest.TestCase):
+    """Tests pour l'écriture au fil de l'eau des idées de contenu."""
+
+    def setUp(self):
+        """Redirection de la sortie vers un répertoire temporaire."""
+        self.output_dir = tempfile.mkdtemp()
+        self.patcher = patch.object(generate_tiktok_content, 'OUTPUT_DIR', self.output_dir)
+        self.patcher.start()
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        self.patcher.stop()
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    @staticmethod
+    def _ideas(count, prefix='Idée'):
+        for i in range(count):
+            yield {"title": f"{prefix} {i:03d}", "description": "Description", "hashtags": ["#PattesThai"],
+                   "music_suggestion": "Calme", "duration": "30 secondes"}
+
+    def test_append_does_not_rewrite_existing_output(self):
+        """Vérifie que l'ajout conserve le contenu existant et poursuit la numérotation."""
+        generate_tiktok_content.save_content_ideas(self._ideas(2))
+        markdown_path = os.path.join(self.output_dir, 'tiktok_ideas.md')
+        with open(markdown_path, encoding='utf-8') as f:
+            before = f.read()
+
+        generate_tiktok_content.save_content_ideas(self._ideas(2, 'Nouvelle'), append=True)
+        with open(markdown_path, encoding='utf-8') as f:
+            after = f.read()
+        self.assertTrue(after.startswith(before))
+        self.assertIn('## 4. Nouvelle 001', after)
+        with open(os.path.join(self.output_dir, 'tiktok_ideas.jsonl'), encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([idea['title'] for idea in lines], ['Idée 000', 'Idée 001', 'Nouvelle 000', 'Nouvelle 001'])
+
+    def test_append_skips_ideas_already_saved(self):
+        """Vérifie que l'ajout écarte les idées déjà enregistrées."""
+        generate_tiktok_content.save_content_ideas(self._ideas(2))
+        ideas = [{"title": "IDÉE 001 !", "hashtags": ["#Autre"]}, {"title": "Nouvelle 000", "hashtags": []}]
+        self.assertEqual(generate_tiktok_content.save_content_ideas(ideas, append=True), 1)
+        with open(os.path.join(self.output_dir, 'tiktok_ideas.jsonl'), encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['title'] for line in f], ['Idée 000', 'Idée 001', 'Nouvelle 000'])
+        with open(os.path.join(self.output_dir, 'tiktok_ideas.md'), encoding='utf-8') as f:
+            self.assertIn('## 3. Nouvelle 000', f.read())
+
+    def test_append_resumes_from_checkpoint(self):
+        """Vérifie qu'un ajout reprend le nombre d'idées et l'index du point de contrôle sans relire le JSONL."""
+        generate_tiktok_content.save_content_ideas(self._ideas(3))
+        generate_tiktok_content.save_content_ideas(self._ideas(2, 'Nouvelle'), append=True)
+        with patch.object(generate_tiktok_content, '_index_saved_ideas') as index:
+            count = generate_tiktok_content.save_content_ideas(
+                [{"title": "Nouvelle 001 ?", "hashtags": []}, {"title": "Troisième 000", "hashtags": []}],
+                append=True)
+            index.assert_not_called()
+        self.assertEqual(count, 1)
+        with open(os.path.join(self.output_dir, 'tiktok_ideas.md'), encoding='utf-8') as f:
+            self.assertIn('## 6. Troisième 000', f.read())
+
+        # Un JSONL modifié hors de ce script est relu
+        with open(os.path.join(self.output_dir, 'tiktok_ideas.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"title": "Manuelle 000"}) + '\n')
+        generate_tiktok_content.save_content_ideas([{"title": "Manuelle 000"}, {"title": "Dernière 000"}],
+                                                   append=True)
+        with open(os.path.join(self.output_dir, 'tiktok_ideas.md'), encoding='utf-8') as f:
+            self.assertIn('## 8. Dernière 000', f.read())
+
+    def test_memory_stays_flat_for_large_generators(self):
+        """Vérifie que la mémoire ne croît pas avec le nombre d'idées écrites."""
+        tracemalloc.start()
+        try:
+            count = generate_tiktok_content.save_content_ideas(self._ideas(20000))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(count, 20000)
+        self.assertLess(peak, 2 * 1024 * 1024)
+
+
+class TestTikTokMetrics(unittest.TestCase):
+    """Tests pour la lecture des exports de statistiques TikTok."""
+
+    def setUp(self):
+        """Création d'exports CSV et JSON dans un répertoire temporaire."""
+        self.exports_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.exports_dir, '2025-01.csv'), 'w', encoding='utf-8') as f:
+            f.write('Video ID,Video title,Post time,Video views,Likes,Shares,Comments\n')
+            f.write('1,Sauvetage de Mali,2025-01-03,"1,500",120,10,8\n')
+            f.write('2,Un jour au refuge,2025-01-10,1.2K,90,4,3\n')
+        with open(os.path.join(self.exports_dir, '2025-02.json'), 'w', encoding='utf-8') as f:
+            json.dump({"videos": [
+                {"video_id": "3", "caption": "Adoption de Noi", "play_count": 5000, "like_count": 600,
+                 "share_count": 40, "comment_count": 25},
+                {"follower_count": 350}
+            ]}, f)
+        with open(os.path.join(self.exports_dir, 'notes.txt'), 'w', encoding='utf-8') as f:
+            f.write('ignoré')
+
+    def tearDown(self):
+        """Nettoyage après les tests."""
+        shutil.rmtree(self.exports_dir, ignore_errors=True)
+
+    def test_exports_are_aggregated(self):
+        """Vérifie les totaux et le classement des publications, tous formats confondus."""
+        tiktok = tiktok_metrics.ingest_exports(self.exports_dir, top_k=2)
+        self.assertEqual((tiktok['views'], tiktok['likes'], tiktok['shares'], tiktok['comments']),
+                         (7700, 810, 54, 36))
+        self.assertEqual(tiktok['posts'], 3)
+        self.assertEqual(tiktok['followers'], 350)
+        self.assertEqual([post['title'] for post in tiktok['top_performing_content']],
+                         ['Adoption de Noi', 'Sauvetage de Mali'])
+
+    def test_site_exports_are_included(self):
+        """Vérifie que les exports des sous-répertoires des sites entrent dans les totaux de la campagne."""
+        os.makedirs(os.path.join(self.exports_dir, 'rayong'))
+        with open(os.path.join(self.exports_dir, 'rayong', '2025-01.csv'), 'w', encoding='utf-8') as f:
+            f.write('Video title,Video views\nSauvetage à Rayong,300\n')
+        tiktok = tiktok_metrics.ingest_exports(self.exports_dir)
+        self.assertEqual((tiktok['views'], tiktok['posts']), (8000, 4))
+        self.assertEqual([name for name, _, _ in tiktok_metrics.exports_fingerprint(self.exports_dir)],
+                         ['2025-01.csv', '2025-02.json', 'rayong/2025-01.csv'])
+
+    def test_top_k_matches_full_sort_with_bounded_heap(self):
+        """Vérifie que le tas borné donne le même résultat qu'un tri complet."""
+        path = os.path.join(self.exports_dir, 'history.jsonl')
+        views = [(i * 7919) % 10007 for i in range(20000)]
+        with open(path, 'w', encoding='utf-8') as f:
+            for i, count in enumerate(views):
+                f.write(json.dumps({"id": i, "title": f"Vidéo {i}", "views": count}) + '\n')
+
+        aggregator = tiktok_metrics.MetricsAggregator(top_k=10)
+        for post in tiktok_metrics.iter_posts(path):
+            aggregator.add(post)
+            self.assertLessEqual(len(aggregator.heap), 10)
+        top = [post['views'] for post in aggregator.result()['top_performing_content']]
+        self.assertEqual(top, sorted(views, reverse=True)[:10])
+
+    def test_json_arrays_are_read_in_chunks(self):
+        """Vérifie la lecture par blocs d'un tableau JSON."""
+        path = os.path.join(self.exports_dir, 'array.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([{"id": i, "title": "Vidéo, \"spéciale\" ]", "views": i} for i in range(100)], f)
+        with patch.object(tiktok_metrics, 'READ_CHUNK_SIZE', 16):
+            posts = list(tiktok_metrics.iter_posts(path))
+        self.assertEqual([post['views'] for post in posts], list(range(100)))
+
+if __name__ == '__main__':
+    unittest.main()
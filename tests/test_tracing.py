@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests unitaires pour l'instrumentation des scripts (intervalles, compteurs, profils).
+
+Note: Ce projet est 100% réel. Toute simulation ou action fictive est strictement interdite.
+"""
+
+import unittest
+import os
+import sys
+import json
+import time
+import pstats
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Ajout du répertoire parent au chemin d'importation
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts import tracing
+from scripts.pipeline import Pipeline
+from scripts.analytics import update_docs_with_reports
+
+
+class TestTracing(unittest.TestCase):
+    """Tests pour l'instrumentation légère."""
+
+    def setUp(self):
+        """Création d'un répertoire temporaire."""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Désactivation de l'instrumentation et nettoyage."""
+        tracing.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_disabled_instrumentation_records_nothing(self):
+        """Vérifie que l'instrumentation désactivée n'enregistre rien, pour un coût négligeable."""
+        tracing.disable()
+        start = time.perf_counter()
+        for _ in range(100000):
+            with tracing.span('boucle') as span:
+                span.set(taille=1)
+            tracing.count('compteur')
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(tracing.counters(), {})
+
+    def test_chrome_trace_export(self):
+        """Vérifie l'export des intervalles et compteurs au format Chrome trace."""
+        tracing.enable()
+        with tracing.span('rapport', 'stage', fichier='funding_report.md'):
+            tracing.count('bytes_written', 100)
+            tracing.count('bytes_written', 50)
+        with self.assertRaises(ValueError):
+            with tracing.span('erreur'):
+                raise ValueError("échec")
+
+        path = tracing.export(os.path.join(self.tmp_dir, 'trace.json'))
+        with open(path, encoding='utf-8') as f:
+            trace = json.load(f)
+        spans = {event['name']: event for event in trace['traceEvents'] if event['ph'] == 'X'}
+        self.assertEqual(spans['rapport']['args'], {"fichier": "funding_report.md"})
+        self.assertGreaterEqual(spans['rapport']['dur'], 0)
+        self.assertIn('error', spans['erreur']['args'])
+        counters = [event['args']['value'] for event in trace['traceEvents'] if event['ph'] == 'C']
+        self.assertEqual(counters, [100, 150])
+        self.assertEqual(trace['otherData']['counters'], {"bytes_written": 150})
+
+    def test_pipeline_stages_are_traced_and_profiled(self):
+        """Vérifie qu'une étape de la chaîne produit un intervalle et un profil cProfile."""
+        tracing.enable()
+        profile_dir = os.path.join(self.tmp_dir, 'profiles')
+        pipeline = Pipeline(state_file=os.path.join(self.tmp_dir, 'state.json'))
+        pipeline.add('fetch', lambda inputs: {"amount": sum(range(1000))})
+        with patch.object(tracing, 'PROFILE_DIR', profile_dir):
+            pipeline.run()
+        self.assertTrue(any(event['name'] == 'fetch' and event['ph'] == 'X' for event in tracing._events))
+        stats = pstats.Stats(os.path.join(profile_dir, 'fetch.prof'))
+        self.assertGreater(stats.total_calls, 0)
+
+    def test_docs_sync_counts_copied_files(self):
+        """Vérifie les compteurs de la synchronisation de la documentation."""
+        tracing.enable()
+        reports_dir = os.path.join(self.tmp_dir, 'reports')
+        os.makedirs(reports_dir)
+        for name in ('a.md', 'b.md'):
+            with open(os.path.join(reports_dir, name), 'w', encoding='utf-8') as f:
+                f.write('# Rapport\n')
+        with patch.object(update_docs_with_reports, 'REPORTS_DIR', reports_dir), \
+                patch.object(update_docs_with_reports, 'DOCS_REPORTS_DIR', os.path.join(self.tmp_dir, 'docs')):
+            update_docs_with_reports.update_documentation_with_reports()
+            update_docs_with_reports.update_documentation_with_reports()
+        counters = tracing.counters()
+        self.assertEqual(counters['docs.files_copied'], 2)
+        self.assertEqual(counters['docs.bytes_copied'], 20)
+        self.assertEqual(counters['docs.files_unchanged'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()